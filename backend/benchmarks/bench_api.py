@@ -0,0 +1,159 @@
+"""
+Requests per second and tail latency of the API under concurrent load.
+
+Starts the backend with uvicorn on a fresh SQLite database (or uses the server at
+``--url``), creates ``--users`` users with ``--layouts`` report layouts each through the
+API, then for each ``--concurrency`` N keeps N requests in flight for ``--seconds``
+against each scenario:
+- ``layout``: ``GET /report-layouts/{id}`` of a random layout
+- ``list``: ``GET /report-layouts/?limit=20``
+- ``users``: ``GET /users/?limit=20``
+- ``mixed``: 90% layout reads, 10% layout updates
+
+and reports requests per second, p50 / p99 latency and failed requests.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_api --concurrency 1 16 64 256 --seconds 5
+    python -m benchmarks.bench_api --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+SCENARIOS = ("layout", "list", "users", "mixed")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database: str, workers: int):
+    """uvicorn serving ``main:app`` on ``database``, and its URL."""
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{database}"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/users/?limit=1")
+            return process, url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The server did not start")
+
+
+async def seed(client: httpx.AsyncClient, users: int, layouts: int) -> list:
+    """Ids of the layouts created."""
+    ids = []
+    for _ in range(users):
+        response = await client.post("/users/signup", json={
+            "email": f"{uuid.uuid4().hex}@example.com",
+            "password": "benchmark",
+            "full_name": "Benchmark",
+        })
+        response.raise_for_status()
+        user_id = response.json()["id"]
+        created = await asyncio.gather(*(
+            client.post("/report-layouts/", json={
+                "uid": uuid.uuid4().hex,
+                "user_id": user_id,
+                "config": {"title": "Benchmark", "tabs": [{"title": f"Tab {idx}", "rows": []} for idx in range(4)]},
+            })
+            for _ in range(layouts)
+        ))
+        ids += [response.json()["id"] for response in created if response.status_code == 200]
+    return ids
+
+
+def request_of(scenario: str, ids: list):
+    if scenario == "list":
+        return "GET", "/report-layouts/?limit=20", None
+    if scenario == "users":
+        return "GET", "/users/?limit=20", None
+    layout_id = random.choice(ids)
+    if scenario == "mixed" and random.random() < 0.1:
+        return "PUT", f"/report-layouts/{layout_id}", {"config": {"title": "Updated", "tabs": []}}
+    return "GET", f"/report-layouts/{layout_id}", None
+
+
+async def load(client: httpx.AsyncClient, scenario: str, ids: list, concurrency: int, seconds: float):
+    """Requests per second, latencies and failed requests of ``concurrency`` workers."""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            method, path, body = request_of(scenario, ids)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                errors += response.status_code >= 400
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(latencies) / (time.perf_counter() - start), sorted(latencies), errors
+
+
+def quantile(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+async def bench(url: str, args: argparse.Namespace):
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        ids = await seed(client, args.users, args.layouts)
+        print(f"{url}: {len(ids)} layouts of {args.users} users, {args.seconds:g}s per run")
+        print(f"{'scenario':>9} {'conc.':>6} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}")
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                rate, latencies, errors = await load(client, scenario, ids, concurrency, args.seconds)
+                print(
+                    f"{scenario:>9} {concurrency:>6} {rate:>9.1f} {quantile(latencies, 0.5) * 1000:>9.1f} "
+                    f"{quantile(latencies, 0.99) * 1000:>9.1f} {errors:>7}"
+                )
+
+
+def run(args: argparse.Namespace):
+    if args.url is not None:
+        asyncio.run(bench(args.url, args))
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        process, url = start_server(os.path.join(folder, "bench.db"), args.workers)
+        try:
+            asyncio.run(bench(url, args))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Server to load instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--layouts", type=int, default=50, help="Layouts per user")
+    run(parser.parse_args())
@@ -0,0 +1,153 @@
+"""
+Listing report layouts on a large table: offset vs keyset (cursor) pagination.
+
+Fills a SQLite database with ``--layouts`` layouts of ``--users`` users (``--config-bytes``
+of JSON config each; kept at ``--db`` and reused by later runs), then times, best of
+``--repeat``:
+- all layouts, a page of ``--limit`` at each ``--depth``: ``offset(depth)`` on full rows,
+  as ``GET /report-layouts/?skip=`` does, vs the next page after a cursor at that depth
+  (``services.fetch_report_layouts``, ``GET /report-layouts/page``)
+- the layouts of a user: every layout with its config, as ``fetch_report_layouts_by_user``
+  did, vs the first page of its listing, and the cursor page after the middle one
+
+``--baseline`` also times the old queries without the keyset indexes (dropped, then
+rebuilt), as on a table created before them.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_pagination --layouts 1000000 --depth 0 1000 100000 900000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine as create_sync_engine, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Base, create_engine
+from report_layouts import services
+from report_layouts.models import ReportLayout
+from users.models import User
+
+BATCH = 20_000
+
+
+def seed(path: str, layouts: int, users: int, config_bytes: int):
+    engine = create_sync_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        count = conn.scalar(select(func.count()).select_from(ReportLayout))
+        if count >= layouts:
+            return
+        user_ids = list(conn.scalars(select(User.id)))
+        if not user_ids:
+            user_ids = [str(uuid.uuid4()) for _ in range(users)]
+            conn.execute(insert(User), [
+                {"id": user_id, "email": f"{user_id}@example.com", "hashed_password": "-", "created_at": datetime.utcnow()}
+                for user_id in user_ids
+            ])
+        config = {"title": "Benchmark", "tabs": [], "notes": "x" * max(0, config_bytes - 40)}
+        start = datetime(2020, 1, 1)
+        rng = random.Random(count)
+        print(f"Adding {layouts - count} layouts to {path}...")
+        for offset in range(count, layouts, BATCH):
+            conn.execute(insert(ReportLayout), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "uid": uuid.uuid4().hex,
+                    "user_id": rng.choice(user_ids),
+                    "timestamp": start + timedelta(seconds=idx * 60 + rng.random()),
+                    "config": config,
+                }
+                for idx in range(offset, min(layouts, offset + BATCH))
+            ])
+    engine.dispose()
+
+
+async def timed(query, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await query()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def bench(path: str, args: argparse.Namespace):
+    engine = create_engine(f"sqlite:///{path}")
+    ordered = (ReportLayout.timestamp.desc(), ReportLayout.id.desc())
+    async with AsyncSession(engine) as db:
+        for depth in args.depth:
+            async def by_offset():
+                return (await db.scalars(select(ReportLayout).order_by(*ordered).offset(depth).limit(args.limit))).all()
+
+            last = (await db.execute(
+                select(ReportLayout.timestamp, ReportLayout.id).order_by(*ordered).offset(max(0, depth - 1)).limit(1)
+            )).first()
+            cursor = services.encode_cursor(last.timestamp, last.id) if depth and last else None
+
+            async def by_cursor():
+                return await services.fetch_report_layouts(db, cursor=cursor, limit=args.limit)
+
+            offset_s, cursor_s = await timed(by_offset, args.repeat), await timed(by_cursor, args.repeat)
+            print(f"{'all':>6} {depth:>9} {offset_s * 1000:>12.2f} {cursor_s * 1000:>12.2f}")
+
+        user_id, count = (await db.execute(
+            select(ReportLayout.user_id, func.count()).group_by(ReportLayout.user_id).limit(1)
+        )).first()
+        middle = (await db.execute(
+            select(ReportLayout.timestamp, ReportLayout.id).where(ReportLayout.user_id == user_id)
+            .order_by(*ordered).offset(count // 2).limit(1)
+        )).first()
+
+        async def every_layout():
+            return (await db.scalars(select(ReportLayout).where(ReportLayout.user_id == user_id))).all()
+
+        async def first_page():
+            return await services.fetch_report_layouts_by_user(db, user_id, limit=args.limit)
+
+        async def middle_page():
+            cursor = services.encode_cursor(middle.timestamp, middle.id)
+            return await services.fetch_report_layouts_by_user(db, user_id, cursor=cursor, limit=args.limit)
+
+        every_s = await timed(every_layout, args.repeat)
+        first_s, middle_s = await timed(first_page, args.repeat), await timed(middle_page, args.repeat)
+        print(f"{'user':>6} {count:>9} {every_s * 1000:>12.2f} {first_s * 1000:>12.2f} (first page)")
+        print(f"{'user':>6} {count // 2:>9} {'':>12} {middle_s * 1000:>12.2f} (middle page)")
+    await engine.dispose()
+
+
+def run(args: argparse.Namespace):
+    seed(args.db, args.layouts, args.users, args.config_bytes)
+    print(f"{args.layouts} layouts of {args.users} users in {args.db}, pages of {args.limit}, best of {args.repeat}")
+    print(f"{'list':>6} {'depth':>9} {'before (ms)':>12} {'keyset (ms)':>12}")
+    asyncio.run(bench(args.db, args))
+    if args.baseline:
+        engine = create_sync_engine(f"sqlite:///{args.db}")
+        indexes = [index for index in ReportLayout.__table__.indexes if "timestamp" in index.name]
+        for index in indexes:
+            index.drop(engine, checkfirst=True)
+        print("without the keyset indexes:")
+        try:
+            asyncio.run(bench(args.db, args))
+        finally:
+            for index in indexes:
+                index.create(engine, checkfirst=True)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_pagination.db"))
+    parser.add_argument("--layouts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--config-bytes", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depth", type=int, nargs="+", default=[0, 1000, 100_000, 900_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", action="store_true", help="Also time the old queries without the keyset indexes")
+    run(parser.parse_args())
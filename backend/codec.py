@@ -0,0 +1,55 @@
+"""
+orjson based JSON handling for the API, with a stdlib fallback when orjson is not installed.
+
+- ``FastJSONRoute`` parses request bodies with orjson (report layout configs can be large).
+- ``FastJSONResponse`` renders responses of routes without a response model. Routes with
+  a ``response_model`` are left on FastAPI's default path: it serializes the model to
+  JSON bytes in pydantic's core, which is faster than any dict encoder.
+"""
+import json
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRequest(Request):
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI still
+            # reports invalid bodies as validation errors
+            self._json = loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(FastJSONRequest(request.scope, request.receive))
+
+        return route_handler
@@ -15,6 +15,14 @@ class Settings(BaseSettings):
 
     # DATABASE
     DATABASE_URL: str = Field(default="sqlite:///./app.db")
+    # Connections per process, and connections opened beyond it under load
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_S: float = 30
+    DB_POOL_RECYCLE_S: int = 1800
+    # Prepared statements kept per connection, compiled queries kept by SQLAlchemy
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_QUERY_CACHE_SIZE: int = 500
 
     # SECURITY
     SECRET_KEY: str = Field(default="CHANGE_ME_TO_A_RANDOM_SECRET")
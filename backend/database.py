@@ -1,13 +1,148 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""
+Async database engine and sessions.
+
+``DATABASE_URL`` keeps its sync form (``sqlite:///./app.db``); the engine uses the asyncio
+driver of its dialect (aiosqlite, asyncpg, aiomysql) unless the URL names one.
+
+- connections come from a pool of ``DB_POOL_SIZE`` (+ ``DB_MAX_OVERFLOW``) connections,
+  recycled after ``DB_POOL_RECYCLE_S``
+- SQLite runs in WAL mode: readers do not wait for the writer. It takes a single writer,
+  so the write transactions of a process are queued on a lock (one per event loop and
+  engine) rather than on SQLite's busy handler
+- each connection keeps ``DB_STATEMENT_CACHE_SIZE`` prepared statements (sqlite3's
+  statement cache, asyncpg's prepared statement cache), and SQLAlchemy caches the
+  compiled SQL of ``DB_QUERY_CACHE_SIZE`` queries
+"""
+import asyncio
+import weakref
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 from config import settings
 
-# SQLLite
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+# Event loop -> engine -> lock. An asyncio lock belongs to the loop it is used on (the app
+# and the tests run several), and only the sessions of the same database exclude each other
+_write_locks = weakref.WeakKeyDictionary()
+
+
+def async_url(url: str):
+    url = make_url(url)
+    if "+" not in url.drivername and url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.drivername}+{ASYNC_DRIVERS[url.drivername]}")
+    return url
+
+
+def create_engine(url: str = None) -> AsyncEngine:
+    url = async_url(url or settings.DATABASE_URL)
+    options = dict(query_cache_size=settings.DB_QUERY_CACHE_SIZE)
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False, "cached_statements": settings.DB_STATEMENT_CACHE_SIZE}
+    elif url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    if url.database not in (None, "", ":memory:"):
+        # In-memory SQLite gets a single shared connection instead of a pool
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_S,
+            pool_recycle=settings.DB_POOL_RECYCLE_S,
+            pool_pre_ping=url.get_backend_name() != "sqlite",
+        )
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", configure_sqlite)
+    return engine
+
+
+def configure_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.DB_POOL_TIMEOUT_S * 1000)}")
+    cursor.close()
+
+
+def write_lock(bind: AsyncEngine) -> asyncio.Lock:
+    """Lock of the SQLite writers of ``bind`` on the running event loop."""
+    locks = _write_locks.setdefault(asyncio.get_running_loop(), weakref.WeakKeyDictionary())
+    return locks.setdefault(bind, asyncio.Lock())
+
+
+class Session(AsyncSession):
+    """
+    A transaction holds SQLite's write lock from its first write to its end, while the
+    event loop runs other requests: concurrent writers would sleep in the busy handler.
+    On SQLite the session takes ``write_lock`` before its first write (a flush, a commit
+    of pending changes, an INSERT/UPDATE/DELETE statement) and gives it back when the
+    transaction ends (commit, rollback, close).
+    """
+
+    _write_lock = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def _writes_pending(self) -> bool:
+        return bool(self.new or self.dirty or self.deleted)
+
+    async def _begin_write(self):
+        if self._write_lock is None and self.bind.dialect.name == "sqlite":
+            lock = write_lock(self.bind)
+            await lock.acquire()
+            self._write_lock = lock
+
+    def _end_write(self):
+        lock, self._write_lock = self._write_lock, None
+        if lock is not None:
+            lock.release()
+
+    async def execute(self, statement, *args, **kwargs):
+        if getattr(statement, "is_dml", False):
+            await self._begin_write()
+        return await super().execute(statement, *args, **kwargs)
+
+    async def flush(self, objects=None):
+        if self._writes_pending():
+            await self._begin_write()
+        await super().flush(objects)
+
+    async def commit(self):
+        if self._writes_pending():
+            await self._begin_write()
+        try:
+            await super().commit()
+        finally:
+            self._end_write()
+
+    async def rollback(self):
+        try:
+            await super().rollback()
+        finally:
+            self._end_write()
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            self._end_write()
+
+
+engine = create_engine()
+
+# Objects stay loaded after a commit: attributes are not lazily reloaded in async code
+SessionLocal = async_sessionmaker(engine, class_=Session, expire_on_commit=False, autoflush=False)
 
 Base = declarative_base()
+
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as db:
+        yield db
+
+
+async def create_tables(bind: AsyncEngine = engine):
+    async with bind.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -1,29 +1,40 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from codec import FastJSONResponse, FastJSONRoute
 from config import settings
-from database import engine, Base
-from users.routers import router as user_router, get_db
+from database import create_tables, engine, get_db
+from users.routers import router as user_router
 from report_layouts.routers import router as layout_router
 from users.services import get_user_by_email
 from users.auth import verify_password, create_access_token
 from users.schemas import UserLogin
 
-# TODO: Remove for production   # # # # # # #
-Base.metadata.create_all(bind=engine)
-# # # # # # # # # # # # # #  # # # # # # #
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # TODO: Remove for production   # # # # # # #
+    await create_tables()
+    # # # # # # # # # # # # # #  # # # # # # #
+    yield
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = FastJSONRoute
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 app.include_router(user_router)
 app.include_router(layout_router)
 
 
-@app.post("/dash-login")
-def dash_login(credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
-    user = get_user_by_email(db, credentials.email)
-    if not user or not verify_password(credentials.password, user.hashed_password):
+@app.post("/dash-login", response_class=FastJSONResponse)
+async def dash_login(credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
+    user = await get_user_by_email(db, credentials.email)
+    if not user or not await run_in_threadpool(verify_password, credentials.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid login")
     token = create_access_token(user.id)
     return {"message": "Login successful", "access_token": token}
@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index
 from uuid import uuid4
 from datetime import datetime
 
@@ -9,6 +9,11 @@ from database import Base
 
 class ReportLayout(Base):
     __tablename__ = "report_layout"
+    __table_args__ = (
+        # Keyset pagination, newest first: all layouts, and the layouts of a user
+        Index("ix_report_layout_timestamp_id", "timestamp", "id"),
+        Index("ix_report_layout_user_id_timestamp_id", "user_id", "timestamp", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
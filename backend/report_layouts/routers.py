@@ -1,40 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-
-from report_layouts.schemas import ReportLayoutCreate, ReportLayoutRead, ReportLayoutUpdate
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from codec import FastJSONRoute
+from database import get_db
+from report_layouts import services
+from report_layouts.schemas import ReportLayoutCreate, ReportLayoutPage, ReportLayoutRead, ReportLayoutUpdate
 from users.models import User
-from users.routers import get_db
 from report_layouts.models import ReportLayout
 
-router = APIRouter(prefix="/report-layouts", tags=["Report Layouts"])
+router = APIRouter(prefix="/report-layouts", tags=["Report Layouts"], route_class=FastJSONRoute)
 
 
 # Create
 @router.post("/", response_model=ReportLayoutRead)
-def create_report_layout(layout: ReportLayoutCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == layout.user_id).first()
+async def create_report_layout(layout: ReportLayoutCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await db.get(User, layout.user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     db_layout = ReportLayout(uid=layout.uid, config=layout.config, user_id=layout.user_id)
     db.add(db_layout)
-    db.commit()
-    db.refresh(db_layout)
+    await db.commit()
+    await db.refresh(db_layout)
     return db_layout
 
 
+async def page_of(fetch, db: AsyncSession, cursor: Optional[str], limit: int, **filters) -> dict:
+    try:
+        items, next_cursor = await fetch(db, cursor=cursor, limit=limit, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
 # Read all
 @router.get("/", response_model=List[ReportLayoutRead])
-def get_report_layouts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    layouts = db.query(ReportLayout).offset(skip).limit(limit).all()
-    return layouts
+async def get_report_layouts(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    layouts = await db.scalars(select(ReportLayout).offset(skip).limit(limit))
+    return layouts.all()
+
+
+# Read all by page, newest first: the cursor of a page seeks past it, however deep
+@router.get("/page", response_model=ReportLayoutPage)
+async def get_report_layouts_page(
+    cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_db)
+):
+    return await page_of(services.fetch_report_layouts, db, cursor, limit)
+
+
+# Read the layouts of a user, newest first
+@router.get("/user/{user_id}", response_model=ReportLayoutPage)
+async def get_user_report_layouts(
+    user_id: str, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return await page_of(services.fetch_report_layouts_by_user, db, cursor, limit, user_id=user_id)
 
 
 # Read by ID
 @router.get("/{layout_id}", response_model=ReportLayoutRead)
-def get_report_layout(layout_id: str, db: Session = Depends(get_db)):
-    layout = db.query(ReportLayout).filter(ReportLayout.id == layout_id).first()
+async def get_report_layout(layout_id: str, db: AsyncSession = Depends(get_db)):
+    layout = await db.get(ReportLayout, layout_id)
     if not layout:
         raise HTTPException(status_code=404, detail="Report layout not found")
     return layout
@@ -42,26 +72,26 @@ def get_report_layout(layout_id: str, db: Session = Depends(get_db)):
 
 # Update
 @router.put("/{layout_id}", response_model=ReportLayoutRead)
-def update_report_layout(layout_id: str, layout_update: ReportLayoutUpdate, db: Session = Depends(get_db)):
-    layout = db.query(ReportLayout).filter(ReportLayout.id == layout_id).first()
+async def update_report_layout(layout_id: str, layout_update: ReportLayoutUpdate, db: AsyncSession = Depends(get_db)):
+    layout = await db.get(ReportLayout, layout_id)
     if not layout:
         raise HTTPException(status_code=404, detail="Report layout not found")
 
     if layout_update.config is not None:
         layout.config = layout_update.config
 
-    db.commit()
-    db.refresh(layout)
+    await db.commit()
+    await db.refresh(layout)
     return layout
 
 
 # Delete
 @router.delete("/{layout_id}", response_model=dict)
-def delete_report_layout(layout_id: str, db: Session = Depends(get_db)):
-    layout = db.query(ReportLayout).filter(ReportLayout.id == layout_id).first()
+async def delete_report_layout(layout_id: str, db: AsyncSession = Depends(get_db)):
+    layout = await db.get(ReportLayout, layout_id)
     if not layout:
         raise HTTPException(status_code=404, detail="Report layout not found")
 
-    db.delete(layout)
-    db.commit()
+    await db.delete(layout)
+    await db.commit()
     return {"detail": "Report layout deleted"}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
 
 # Base schema for input
@@ -23,3 +23,19 @@ class ReportLayoutRead(ReportLayoutBase):
 
     class Config:
         orm_mode = True
+
+
+# Schema for listings: everything but the config
+class ReportLayoutSummary(BaseModel):
+    id: str
+    uid: str
+    user_id: str
+    timestamp: datetime
+
+    model_config = {"from_attributes": True}
+
+
+# Page of a listing, newest first. next_cursor fetches the following page (None on the last one)
+class ReportLayoutPage(BaseModel):
+    items: List[ReportLayoutSummary]
+    next_cursor: Optional[str] = None
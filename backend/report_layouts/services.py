@@ -1,8 +1,55 @@
-from sqlalchemy.orm import Session
-from typing import List
+"""
+Listings of report layouts, paginated by cursor (keyset pagination).
 
-from backend.report_layouts.models import ReportLayout
+Layouts are listed newest first, by ``(timestamp, id)``. A cursor holds the position of the
+last layout of a page, and the next page starts right after it: its query seeks in the
+``(timestamp, id)`` / ``(user_id, timestamp, id)`` indexes, so every page costs the same,
+however deep. Listings leave out the ``config`` of the layouts.
+"""
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
 
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def fetch_report_layouts_by_user(db: Session, user_id: str) -> List[ReportLayout]:
-    return db.query(ReportLayout).filter(ReportLayout.user_id == user_id).all()
+from report_layouts.models import ReportLayout
+
+LISTING_COLUMNS = (ReportLayout.id, ReportLayout.uid, ReportLayout.user_id, ReportLayout.timestamp)
+
+
+def encode_cursor(timestamp: datetime, layout_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{layout_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """``(timestamp, id)`` of a cursor. Raises ``ValueError`` for malformed cursors."""
+    try:
+        timestamp, layout_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), layout_id
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def fetch_report_layouts(
+    db: AsyncSession, user_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100
+) -> Tuple[List, Optional[str]]:
+    """Page of ``limit`` layouts (all of them, or those of ``user_id``) after ``cursor``, and the next cursor."""
+    query = select(*LISTING_COLUMNS)
+    if user_id is not None:
+        query = query.where(ReportLayout.user_id == user_id)
+    if cursor is not None:
+        query = query.where(tuple_(ReportLayout.timestamp, ReportLayout.id) < decode_cursor(cursor))
+    # One extra row tells whether there is a next page
+    query = query.order_by(ReportLayout.timestamp.desc(), ReportLayout.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last.timestamp, last.id)
+
+
+async def fetch_report_layouts_by_user(
+    db: AsyncSession, user_id: str, cursor: Optional[str] = None, limit: int = 100
+) -> Tuple[List, Optional[str]]:
+    return await fetch_report_layouts(db, user_id=user_id, cursor=cursor, limit=limit)
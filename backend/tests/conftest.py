@@ -1,40 +1,40 @@
 # tests/conftest.py
+import os
+
+# The app's own engine only creates its tables on startup, kept in memory
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
-from database import Base
+from database import Base, Session
 from main import app
-from routers import get_db
+from users.routers import get_db
 
 
 @pytest.fixture(scope="session")
-def test_engine():
-    # SQLite in-memory DB for tests
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    Base.metadata.create_all(bind=engine)
-    return engine
+def test_engine(tmp_path_factory):
+    # SQLite file DB for tests: the app and the test client run on different event loops,
+    # so connections are not pooled
+    path = tmp_path_factory.mktemp("db") / "test.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
 
 
 @pytest.fixture(scope="function")
-def test_db(test_engine):
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def test_sessions(test_engine):
+    return async_sessionmaker(test_engine, class_=Session, expire_on_commit=False, autoflush=False)
 
 
 @pytest.fixture(scope="function")
-def client(test_db):
+def client(test_sessions):
     # Override FastAPI dependency
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            test_db.close()
+    async def override_get_db():
+        async with test_sessions() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
 
@@ -0,0 +1,88 @@
+import asyncio
+
+from sqlalchemy import text
+
+from database import Base, Session, async_url, create_engine, write_lock
+from users.models import User
+
+
+def test_async_url_adds_the_async_driver():
+    assert async_url("sqlite:///./app.db").drivername == "sqlite+aiosqlite"
+    assert async_url("postgresql://user@host/db").drivername == "postgresql+asyncpg"
+    assert async_url("postgresql+psycopg://user@host/db").drivername == "postgresql+psycopg"
+
+
+def test_sqlite_runs_in_wal_mode(tmp_path):
+    async def journal_mode():
+        engine = create_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+        try:
+            async with engine.connect() as conn:
+                return await conn.scalar(text("PRAGMA journal_mode"))
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(journal_mode()) == "wal"
+
+
+def test_write_lock_per_event_loop_and_engine(tmp_path):
+    first, second = create_engine(f"sqlite:///{tmp_path / 'a.db'}"), create_engine(f"sqlite:///{tmp_path / 'b.db'}")
+
+    async def locks():
+        return write_lock(first), write_lock(first), write_lock(second)
+
+    lock, same, other = asyncio.run(locks())
+    assert lock is same and lock is not other
+    assert asyncio.run(locks())[0] is not lock
+
+
+def test_write_transactions_are_queued(tmp_path):
+    async def run():
+        engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        events = []
+
+        async def write(email, hold):
+            async with Session(engine) as db:
+                db.add(User(email=email, hashed_password="x"))
+                await db.flush()
+                events.append(f"{email} flushed")
+                await asyncio.sleep(hold)
+                await db.commit()
+                events.append(f"{email} committed")
+
+        try:
+            await asyncio.gather(write("a", 0.05), write("b", 0))
+            # The lock is taken again by the next transaction once released
+            await write("c", 0)
+            async with Session(engine) as db:
+                await db.rollback()
+            return events, write_lock(engine).locked()
+        finally:
+            await engine.dispose()
+
+    events, locked = asyncio.run(run())
+    # The second transaction waits from its first write until the first one ends
+    assert events == ["a flushed", "a committed", "b flushed", "b committed", "c flushed", "c committed"]
+    assert not locked
+
+
+def test_rollback_and_close_release_the_lock(tmp_path):
+    async def run():
+        engine = create_engine(f"sqlite:///{tmp_path / 'release.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with Session(engine) as db:
+                db.add(User(email="a", hashed_password="x"))
+                await db.flush()
+                assert write_lock(engine).locked()
+                await db.rollback()
+                assert not write_lock(engine).locked()
+                await db.execute(User.__table__.insert().values(id="1", email="b", hashed_password="x"))
+                assert write_lock(engine).locked()
+            return write_lock(engine).locked()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) is False
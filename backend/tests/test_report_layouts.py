@@ -0,0 +1,127 @@
+import uuid
+
+
+def create_user(client):
+    response = client.post(
+        "/users/signup",
+        json={
+            "email": f"{uuid.uuid4().hex}@example.com",
+            "password": "secret123",
+            "full_name": "Layout Owner"
+        }
+    )
+    return response.json()["id"]
+
+
+def create_layout(client, user_id, config=None):
+    return client.post(
+        "/report-layouts/",
+        json={
+            "uid": uuid.uuid4().hex,
+            "user_id": user_id,
+            "config": config or {"tabs": []}
+        }
+    )
+
+
+def test_create_and_read_layout(client):
+    user_id = create_user(client)
+    response = create_layout(client, user_id, {"tabs": [{"title": "Tab 1"}]})
+    assert response.status_code == 200
+    layout = response.json()
+    assert layout["user_id"] == user_id
+
+    response = client.get(f"/report-layouts/{layout['id']}")
+    assert response.status_code == 200
+    assert response.json()["config"] == {"tabs": [{"title": "Tab 1"}]}
+
+
+def test_create_layout_unknown_user(client):
+    response = create_layout(client, "missing-user")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+
+
+def test_update_layout(client):
+    layout = create_layout(client, create_user(client)).json()
+
+    response = client.put(f"/report-layouts/{layout['id']}", json={"config": {"tabs": [{"title": "New"}]}})
+    assert response.status_code == 200
+    assert response.json()["config"] == {"tabs": [{"title": "New"}]}
+    assert client.get(f"/report-layouts/{layout['id']}").json()["config"] == {"tabs": [{"title": "New"}]}
+
+
+def test_delete_layout(client):
+    layout = create_layout(client, create_user(client)).json()
+
+    response = client.delete(f"/report-layouts/{layout['id']}")
+    assert response.status_code == 200
+    assert client.get(f"/report-layouts/{layout['id']}").status_code == 404
+    assert client.delete(f"/report-layouts/{layout['id']}").status_code == 404
+
+
+def test_list_layouts(client):
+    user_id = create_user(client)
+    ids = {create_layout(client, user_id).json()["id"] for _ in range(3)}
+
+    response = client.get("/report-layouts/", params={"limit": 1000})
+    assert response.status_code == 200
+    layouts = response.json()
+    assert ids <= {layout["id"] for layout in layouts}
+    assert all("config" in layout for layout in layouts)
+
+    response = client.get("/report-layouts/", params={"skip": 1, "limit": 1})
+    assert [layout["id"] for layout in response.json()] == [layouts[1]["id"]]
+
+
+def pages_of(client, url):
+    """Items of every page of a cursor listing, page by page."""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def newest_first(items) -> bool:
+    keys = [(item["timestamp"], item["id"]) for item in items]
+    return keys == sorted(keys, reverse=True)
+
+
+def test_list_layouts_by_page(client):
+    user_id = create_user(client)
+    ids = {create_layout(client, user_id).json()["id"] for _ in range(3)}
+
+    items = [item for items in pages_of(client, "/report-layouts/page") for item in items]
+    assert ids <= {item["id"] for item in items}
+    assert len(items) == len({item["id"] for item in items})
+    assert newest_first(items)
+
+
+def test_list_user_layouts_by_cursor(client):
+    user_id = create_user(client)
+    create_layout(client, create_user(client))
+    ids = {create_layout(client, user_id).json()["id"] for _ in range(5)}
+
+    pages = pages_of(client, f"/report-layouts/user/{user_id}")
+    assert [len(items) for items in pages] == [2, 2, 1]
+    items = [item for items in pages for item in items]
+    # Every layout once, newest first (ties on the timestamp by id), without the config
+    assert {item["id"] for item in items} == ids
+    assert newest_first(items)
+    assert all(item["user_id"] == user_id and "config" not in item for item in items)
+
+
+def test_list_user_layouts_unknown_user(client):
+    response = client.get("/report-layouts/user/missing-user")
+    assert response.status_code == 404
+
+
+def test_list_layouts_invalid_cursor(client):
+    response = client.get("/report-layouts/page", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -2,36 +2,30 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 
-from database import SessionLocal
+from codec import FastJSONRoute
+from database import get_db
 
 from users import schemas, services
 from users.auth import create_access_token, verify_password
 
-router = APIRouter(prefix="/users", tags=["users"])
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/users", tags=["users"], route_class=FastJSONRoute)
 
 
 @router.post("/signup", response_model=schemas.UserRead)
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    if services.get_user_by_email(db, user.email):
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    if await services.get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    return services.create_user(db, user)
+    return await services.create_user(db, user)
 
 
 @router.post("/login")
-def login_user(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = services.get_user_by_email(db, credentials.email)
-    if not user or not verify_password(credentials.password, user.hashed_password):
+async def login_user(credentials: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
+    user = await services.get_user_by_email(db, credentials.email)
+    if not user or not await run_in_threadpool(verify_password, credentials.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(user.id)
@@ -40,5 +34,5 @@ def login_user(credentials: schemas.UserLogin, db: Session = Depends(get_db)):
 
 # Read all
 @router.get("/", response_model=List[schemas.UserRead])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return services.get_users(db, skip=skip, limit=limit)
\ No newline at end of file
+async def read_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    return await services.get_users(db, skip=skip, limit=limit)
\ No newline at end of file
@@ -1,24 +1,27 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from users import schemas, models
 from users.auth import hash_password
 
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(models.User.email == email))
 
 
-def create_user(db: Session, user: schemas.UserCreate):
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
     db_user = models.User(
         email=user.email,
         full_name=user.full_name,
-        hashed_password=hash_password(user.password)
+        # bcrypt is slow on purpose, kept off the event loop
+        hashed_password=await run_in_threadpool(hash_password, user.password)
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    users = await db.scalars(select(models.User).offset(skip).limit(limit))
+    return users.all()
@@ -0,0 +1,29 @@
+// Pure presentation callbacks, run in the browser to avoid a server round trip.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        toggle_navbar: function (n, is_open) {
+            if (n) {
+                return !is_open;
+            }
+            return is_open;
+        },
+
+        toggle_components_form: function (chart, table, stat) {
+            const ctx = window.dash_clientside.callback_context;
+            if (!ctx.triggered.length) {
+                return window.dash_clientside.no_update;
+            }
+            const trigger_id = ctx.triggered[0].prop_id.split('.')[0];
+            const show = {"display": "block"};
+            const hide = {"display": "none"};
+            if (trigger_id.includes('show-chart-form')) {
+                return [show, hide, hide];
+            } else if (trigger_id.includes('add-table-btn')) {
+                return [hide, show, hide];
+            } else if (trigger_id.includes('add-stat-btn')) {
+                return [hide, hide, show];
+            }
+            return [hide, hide, hide];
+        }
+    }
+});
@@ -0,0 +1,64 @@
+// Builder edits of the dashboard state kept in the browser, see dashboard/state.py.
+// Nodes are found by id: an edit whose target is gone (a second click on a removed row,
+// a form left open on a removed column) is dropped.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        apply_edit: function (edit, state) {
+            const dc = window.dash_clientside;
+            const unchanged = [dc.no_update, dc.no_update];
+            if (!edit) {
+                return unchanged;
+            }
+            const CHILDREN = {tab: "rows", row: "children", col: "children"};
+            const CHILD = {tab: "row", row: "col", col: "card"};
+            const PARENT = {row: "tab", col: "row", card: "col"};
+            const layout = JSON.parse(JSON.stringify(state || {}));
+            layout.tabs = layout.tabs || [];
+
+            // {node, siblings} of the node `id` of `kind`, or null
+            function find(id, kind) {
+                let level = layout.tabs.map(function (node) { return [node, layout.tabs, "tab"]; });
+                while (level.length) {
+                    const next = [];
+                    for (const [node, siblings, nodeKind] of level) {
+                        if (!node || typeof node !== "object") {
+                            continue;
+                        }
+                        if (nodeKind === kind && node.id === id) {
+                            return {node: node, siblings: siblings};
+                        }
+                        const children = node[CHILDREN[nodeKind]];
+                        if (nodeKind !== kind && Array.isArray(children)) {
+                            children.forEach(function (child) { next.push([child, children, CHILD[nodeKind]]); });
+                        }
+                    }
+                    level = next;
+                }
+                return null;
+            }
+
+            if (edit.op === "remove") {
+                const found = find(edit.node, edit.kind);
+                if (!found) {
+                    return unchanged;
+                }
+                found.siblings.splice(found.siblings.indexOf(found.node), 1);
+            } else if (edit.kind === "tab") {
+                const tab = Object.assign({}, edit.node);
+                tab.title = tab.title || "Tab " + (layout.tabs.length + 1);
+                layout.tabs.push(tab);
+                dc.set_props({type: "tab", node: tab.id}, {label: tab.title});
+            } else {
+                const parent = find(edit.parent, PARENT[edit.kind]);
+                if (!parent) {
+                    return unchanged;
+                }
+                const key = CHILDREN[PARENT[edit.kind]];
+                parent.node[key] = parent.node[key] || [];
+                parent.node[key].push(edit.node);
+            }
+            // A full render for the edits the server could not render in place
+            return [layout, edit.render ? Date.now() : dc.no_update];
+        }
+    }
+});
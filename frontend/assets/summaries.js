@@ -0,0 +1,76 @@
+// AI summaries of the chart cards, written into the card footer while the server streams them.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    summaries: {
+        stream_card_summary: function (n_clicks, state, version, data, route) {
+            const dc = window.dash_clientside;
+            const card = dc.callback_context.triggered_id;
+            if (!n_clicks || !card) {
+                return dc.no_update;
+            }
+            const target = Object.assign({}, card, {type: "card-summary"});
+            // Session references are small: sent as they are, the server resolves them
+            const isRef = function (value) {
+                return !!value && typeof value === "object" && "session" in value && "version" in value;
+            };
+            // Card `id` of a layout kept in the browser
+            const findCard = function (node, id) {
+                if (Array.isArray(node)) {
+                    for (const child of node) {
+                        const found = findCard(child, id);
+                        if (found) {
+                            return found;
+                        }
+                    }
+                    return null;
+                }
+                if (!node || typeof node !== "object") {
+                    return null;
+                }
+                if (node.type === "card" && node.id === id) {
+                    return node;
+                }
+                return findCard(node.tabs || node.rows || node.children, id);
+            };
+            const post = function (withData) {
+                return fetch(route, {
+                    method: "POST",
+                    headers: {"Content-Type": "application/json"},
+                    body: JSON.stringify({
+                        node: card.node,
+                        // The first click may reuse a cached summary, the next ones ask for a new one
+                        refresh: n_clicks > 1,
+                        state: isRef(state) ? state : undefined,
+                        card: isRef(state) ? undefined : findCard(state, card.node),
+                        version: version,
+                        // The dataset itself only when the server does not have it cached
+                        data: withData || isRef(data) ? data : undefined
+                    })
+                });
+            };
+            dc.set_props(card, {disabled: true});
+            post(false).then(function (response) {
+                return response.status === 409 && !isRef(data) ? post(true) : response;
+            }).then(async function (response) {
+                if (!response.ok) {
+                    throw new Error(await response.text() || response.statusText);
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let text = "";
+                for (;;) {
+                    const {done, value} = await reader.read();
+                    if (done) {
+                        break;
+                    }
+                    text += decoder.decode(value, {stream: true});
+                    dc.set_props(target, {children: text});
+                }
+            }).catch(function (error) {
+                dc.set_props(target, {children: "Error generating AI summary: " + error.message});
+            }).finally(function () {
+                dc.set_props(card, {disabled: false});
+            });
+            return "Generating the summary...";
+        }
+    }
+});
@@ -0,0 +1,36 @@
+// Windowed rendering of long dashboards: rows past ROW_WINDOW are sent as placeholders,
+// clicking one (n_clicks) asks the server for the row, see render_row_slot in main.py.
+// Placeholders are clicked once they come within MARGIN of the viewport.
+(function () {
+    const MARGIN = "600px 0px";
+    const SELECTOR = ".row-placeholder";
+
+    // Without IntersectionObserver every row is built at once
+    const visible = "IntersectionObserver" in window ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                visible.unobserve(entry.target);
+                entry.target.click();
+            }
+        });
+    }, {rootMargin: MARGIN}) : {observe: function (el) { el.click(); }};
+
+    function observe(root) {
+        if (root.matches && root.matches(SELECTOR)) {
+            visible.observe(root);
+        }
+        if (root.querySelectorAll) {
+            root.querySelectorAll(SELECTOR).forEach(function (el) {
+                visible.observe(el);
+            });
+        }
+    }
+
+    // Placeholders come and go as tabs and rows are (re)rendered
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (mutation) {
+            mutation.addedNodes.forEach(observe);
+        });
+    }).observe(document.documentElement, {childList: true, subtree: true});
+    observe(document);
+})();
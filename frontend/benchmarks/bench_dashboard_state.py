@@ -0,0 +1,101 @@
+"""
+Cost of a builder action on large dashboards: linear scan vs ``DashboardTree`` index.
+
+The linear scan reproduces the previous ``update_dashboard_state`` lookup: nested loops
+over tabs, rows and columns with a running counter and substring checks on the
+trigger id. The tree resolves the node by the id of the parsed trigger through its
+index; the index build and the action on a built index are also reported separately.
+
+Usage (from the frontend folder):
+    python -m benchmarks.bench_dashboard_state --tabs 10 --rows 50 --cols 10
+"""
+import argparse
+import copy
+import json
+import random
+import time
+
+from dashboard.state import DashboardTree
+
+
+def sample_state(tabs: int, rows: int, cols: int) -> dict:
+    tree = DashboardTree({"tabs": []})
+    for _ in range(tabs):
+        tab = tree.add_tab()
+        for _ in range(rows):
+            row = tree.add_row(tab["id"])
+            for _ in range(cols - 1):
+                tree.add_col(row["id"])
+            for col in row["children"]:
+                tree.add_card(col["id"], {"component_type": "chart", "chart_type": "bar"})
+    return tree.state
+
+
+def linear_remove_col(state: dict, trigger_id: str, clicks: list):
+    tabs = state["tabs"]
+    idx = 0
+    for tab_idx, tab in enumerate(tabs):
+        for row_idx, row in enumerate(tab["rows"]):
+            for col_idx, col in enumerate(row["children"]):
+                if (
+                        idx < len(clicks) and clicks[idx] and clicks[idx] > 0
+                        and 'remove-col-btn' in trigger_id
+                        and f'"tab":{tab_idx}' in trigger_id
+                        and f'"row":{row_idx}' in trigger_id
+                        and f'"col":{col_idx}' in trigger_id
+                ):
+                    row["children"].pop(col_idx)
+                    return state
+                idx += 1
+    return state
+
+
+def run(tabs: int, rows: int, cols: int, repeat: int):
+    state = sample_state(tabs, rows, cols)
+    n_cols = tabs * rows * cols
+    print(f"{tabs} tabs x {rows} rows x {cols} cols = {n_cols} cards, {repeat} random removals")
+
+    targets = []
+    rng = random.Random(0)
+    for _ in range(repeat):
+        t, r, c = rng.randrange(tabs), rng.randrange(rows), rng.randrange(cols)
+        col = state["tabs"][t]["rows"][r]["children"][c]
+        targets.append((t, r, c, col["id"]))
+
+    linear, build, lookup, indexed = 0.0, 0.0, 0.0, 0.0
+    for t, r, c, node_id in targets:
+        working = copy.deepcopy(state)
+        trigger_id = json.dumps({"col": c, "row": r, "tab": t, "type": "remove-col-btn"}, separators=(",", ":"))
+        clicks = [1] * n_cols
+        start = time.perf_counter()
+        linear_remove_col(working, trigger_id, clicks)
+        linear += time.perf_counter() - start
+
+        working = copy.deepcopy(state)
+        start = time.perf_counter()
+        DashboardTree(working).remove(node_id, "col")
+        lookup += time.perf_counter() - start
+
+        working = copy.deepcopy(state)
+        start = time.perf_counter()
+        tree = DashboardTree(working)
+        tree.index
+        build += time.perf_counter() - start
+        start = time.perf_counter()
+        tree.remove(node_id, "col")
+        indexed += time.perf_counter() - start
+
+    print(f"{'linear scan per action':32} {linear / repeat * 1e3:10.3f} ms")
+    print(f"{'tree action (index + id)':32} {lookup / repeat * 1e3:10.3f} ms")
+    print(f"{'index build':32} {build / repeat * 1e3:10.3f} ms")
+    print(f"{'indexed action after build':32} {indexed / repeat * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.tabs, args.rows, args.cols, args.repeat)
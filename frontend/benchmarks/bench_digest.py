@@ -0,0 +1,78 @@
+"""
+Size and cost of the chart summary prompt: raw ``head(50)`` preview vs statistical digest.
+
+For N rows of a sample frame (numeric X, two numeric series, padded to ``--columns``
+columns: the preview holds every column of the frame), reports the prompt length
+in characters and tokens (tiktoken's cl100k_base when installed, else chars / 4) and the
+time to build it. The preview prompt is the one ``summarize_chart`` sent before the
+digest: every column name and the first 50 rows of every column.
+
+Usage (from the frontend folder):
+    python -m benchmarks.bench_digest --rows 1000 100000 1000000 --columns 50
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.bench_payloads import sample_frame, timed
+from llm import build_prompt
+
+try:
+    import tiktoken
+    encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # pragma: no cover
+    encoding = None
+
+
+def count_tokens(text: str) -> int:
+    return len(encoding.encode(text)) if encoding is not None else len(text) // 4
+
+
+def preview_prompt(df, chart_type, x=None, y1=None, y2=None, title=""):
+    meta = {
+        "chart_type": chart_type,
+        "title": title,
+        "x": x,
+        "y1": y1,
+        "y2": y2,
+        "columns": list(df.columns),
+        "data_preview": df.head(50).to_dict(orient="list"),
+    }
+    return f"""
+    You are a data analysis assistant.
+    Summarize the insights of the chart described below.
+    Focus on trends, comparisons, anomalies, peaks, correlations, and interesting findings.
+
+    Chart metadata:
+    {meta}
+
+    Write a concise, clear summary (around 4–7 sentences).
+    """
+
+
+def wide_frame(rows: int, columns: int):
+    df = sample_frame(rows)
+    extra = np.random.default_rng(1).normal(size=(rows, max(0, columns - len(df.columns))))
+    for idx in range(extra.shape[1]):
+        df[f"extra_{idx}"] = extra[:, idx]
+    return df
+
+
+def run(rows: list, columns: int, repeat: int):
+    unit = "tokens" if encoding is not None else "~tokens"
+    print(f"{columns} columns, best of {repeat}")
+    print(f"{'rows':>9} {'prompt':8} {'chars':>8} {unit:>8} {'build (ms)':>11}")
+    for n in rows:
+        df = wide_frame(n, columns)
+        for name, build in (("head(50)", preview_prompt), ("digest", build_prompt)):
+            prompt, elapsed = timed(lambda: build(df, "line", x="x", y1=["price"], y2=["quantity"]), repeat)
+            print(f"{n:>9} {name:8} {len(prompt):>8} {count_tokens(prompt):>8} {elapsed * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--columns", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.columns, args.repeat)
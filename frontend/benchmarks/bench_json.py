@@ -0,0 +1,69 @@
+"""
+JSON encoding and decoding on the hot paths, orjson codec vs the stdlib.
+
+For a dashboard with N tabs (sample dashboard repeated) and a dataset with N * 1000 rows:
+- dashboard state: dumps (session store, dataset version) and indented dumps (download)
+- dashboard state: loads (upload, session store) and ``Report`` construction from JSON
+- stored-data: loads of the ``orient="split"`` payload and of ``encode_frame`` payloads
+- a callback response holding a figure, through plotly's "json" and "orjson" engines
+
+Usage (from the frontend folder):
+    python -m benchmarks.bench_json --tabs 50
+"""
+import argparse
+import json
+from pathlib import Path
+
+import plotly.io as pio
+
+from benchmarks.bench_payloads import sample_figure, sample_frame, timed
+from dashboard.codec import CODECS, orjson
+from dashboard.payloads import encode_frame
+from schemas.report import Report
+
+SAMPLE_DASHBOARD = Path(__file__).resolve().parents[2] / "samples" / "dashboard_1.json"
+
+
+def run(tabs: int, repeat: int):
+    if orjson is None:
+        raise SystemExit("orjson is not installed")
+    sample = json.loads(SAMPLE_DASHBOARD.read_text(encoding="utf-8"))
+    state = {**sample, "tabs": sample["tabs"] * (tabs // max(1, len(sample["tabs"])) or 1)}
+    df = sample_frame(tabs * 1000)
+    stdlib, fast = CODECS["json"](), CODECS["orjson"]()
+
+    state_json = stdlib.dumps(state)
+    split_json = df.to_json(date_format="iso", orient="split")
+    typed_json = stdlib.dumps(encode_frame(df))
+    response = {"response": {"graph": {"figure": sample_figure(df)}}, "multi": True}
+
+    cases = [
+        ("state: dumps", lambda c: lambda: c.dumps(state)),
+        ("state: dumps indent", lambda c: lambda: c.dumps(state, indent=True)),
+        ("state: loads", lambda c: lambda: c.loads(state_json)),
+        ("report: from JSON", lambda c: lambda: Report(**c.loads(state_json))),
+        ("stored-data: loads split", lambda c: lambda: c.loads(split_json)),
+        ("stored-data: loads typed", lambda c: lambda: c.loads(typed_json)),
+    ]
+    print(f"{tabs} tabs, {len(df)} rows, best of {repeat}")
+    print(f"{'case':32} {'json (ms)':>10} {'orjson (ms)':>12} {'speedup':>8}")
+    for name, case in cases:
+        _, slow_time = timed(case(stdlib), repeat)
+        _, fast_time = timed(case(fast), repeat)
+        print(f"{name:32} {slow_time * 1000:>10.2f} {fast_time * 1000:>12.2f} {slow_time / fast_time:>7.1f}x")
+
+    engine_times = {}
+    for engine in ("json", "orjson"):
+        _, engine_times[engine] = timed(lambda: pio.to_json(response, validate=False, engine=engine), repeat)
+    print(
+        f"{'callback response (figure)':32} {engine_times['json'] * 1000:>10.2f} "
+        f"{engine_times['orjson'] * 1000:>12.2f} {engine_times['json'] / engine_times['orjson']:>7.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.tabs, args.repeat)
@@ -0,0 +1,167 @@
+"""
+Throughput and tail latency of the AI summaries, against the mock LLM server.
+
+Starts benchmarks/mock_llm.py in this process (or uses the one at ``--url``) and points
+the provider clients at it, with the LLM cache and the rate limits off, then:
+- ``summarize_chart``: ``--requests`` summaries of distinct charts sent by N threads, for
+  each ``--concurrency`` N: throughput and p50 / p95 / p99 latency
+- report: the AI enrichment of a report of ``--charts`` charts (``run_summaries`` on
+  ``Report.summary_requests``), with ``LLM_CONCURRENCY[provider]`` = N, for each
+  ``LLM_BATCH`` mode: time per report and LLM requests per report
+
+Usage (from the frontend folder):
+    python -m benchmarks.bench_llm --provider openai --concurrency 1 4 16 64 --latency 0.3
+    python -m benchmarks.bench_llm --error-rate 0.05 --rate-limit-rate 0.05
+"""
+import argparse
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_payloads import sample_frame
+from benchmarks.mock_llm import add_arguments, base_urls, config_of, serve
+from config import settings
+
+CHART_TYPES = ("bar", "line", "scatter")
+X_AXES = ("x", "category")
+Y_AXES = ("price", "quantity")
+
+
+def configure(provider: str, url: str, pool: int):
+    """Settings of the benchmark, before the LLM modules read them on import."""
+    settings.LLM_PROVIDER = provider
+    settings.LLM_BASE_URLS = base_urls(url)
+    settings.LLM_CACHE = False
+    settings.LLM_RATE_LIMITS = {}
+    settings.LLM_POOL_SIZE = pool
+    settings.OPEN_AI_KEY = settings.OPEN_AI_KEY or "mock"
+    settings.ANTHROPIC_API_KEY = settings.ANTHROPIC_API_KEY or "mock"
+    settings.GROQ_API_KEY = settings.GROQ_API_KEY or "mock"
+
+
+def chart_specs(count: int) -> list:
+    combos = itertools.cycle(itertools.product(CHART_TYPES, X_AXES, Y_AXES, (False, True)))
+    specs = []
+    for idx, (chart_type, x, y1, with_y2) in zip(range(count), combos):
+        y2 = next(y for y in Y_AXES if y != y1) if with_y2 else ""
+        specs.append({"chart_type": chart_type, "x_axis": x, "y_axis_1": y1, "y_axis_2": y2, "title": f"Chart {idx}"})
+    return specs
+
+
+def report_layout(charts: int, per_tab: int = 4) -> dict:
+    specs = chart_specs(charts)
+    tabs = [specs[idx:idx + per_tab] for idx in range(0, len(specs), per_tab)]
+    return {
+        "title": "Benchmark",
+        "tabs": [
+            {"title": f"Tab {idx}", "rows": [{"children": [{"children": [{"component_type": "chart", **spec}]} for spec in tab]}]}
+            for idx, tab in enumerate(tabs)
+        ],
+    }
+
+
+def mock_requests(url: str) -> int:
+    import httpx
+    return httpx.get(f"{url}/stats").json()["requests"]
+
+
+def bench_summaries(df, provider: str, concurrency: list, requests: int):
+    from dashboard.metrics import Summary
+    from llm import summarize_chart
+
+    print(f"summarize_chart: {requests} summaries")
+    print(f"{'threads':>8} {'per s':>8} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'errors':>7}")
+    specs = chart_specs(requests)
+    for threads in concurrency:
+        latency = Summary(requests)
+        errors = 0
+
+        def one(spec: dict):
+            start = time.perf_counter()
+            try:
+                summarize_chart(
+                    df,
+                    chart_type=spec["chart_type"],
+                    x=spec["x_axis"],
+                    y1=[spec["y_axis_1"]],
+                    y2=[spec["y_axis_2"]] if spec["y_axis_2"] else [],
+                    title=spec["title"],
+                    provider=provider,
+                )
+                return time.perf_counter() - start, None
+            except Exception as e:
+                return time.perf_counter() - start, e
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            for elapsed, error in pool.map(one, specs):
+                latency.observe(elapsed)
+                errors += error is not None
+        wall = time.perf_counter() - start
+        quantiles = latency.quantiles()
+        print(
+            f"{threads:>8} {requests / wall:>8.1f} {quantiles[0.5]:>8.3f} {quantiles[0.95]:>8.3f} "
+            f"{quantiles[0.99]:>8.3f} {errors:>7}"
+        )
+
+
+def bench_report(df, url: str, provider: str, concurrency: list, charts: int, reports: int):
+    from dashboard.metrics import Summary
+    from dashboard.summaries import run_summaries
+    from schemas.report import Report
+
+    report = Report(**report_layout(charts))
+    print(f"\nreport AI enrichment: {charts} charts in {len(report.children)} tabs, {reports} reports")
+    print(f"{'LLM_BATCH':>10} {'limit':>6} {'p50 (s)':>8} {'max (s)':>8} {'calls':>6} {'errors':>7}")
+    for batch, limit in itertools.product(("off", "tab", "report"), concurrency):
+        settings.LLM_BATCH = batch
+        latency = Summary(reports)
+        errors = 0
+        calls = mock_requests(url)
+        for _ in range(reports):
+            start = time.perf_counter()
+            summaries = run_summaries(report.summary_requests(df), limits={provider: limit})
+            latency.observe(time.perf_counter() - start)
+            errors += sum(str(text).startswith("Error generating AI summary") for text in summaries.values())
+        calls = (mock_requests(url) - calls) / reports
+        print(
+            f"{batch:>10} {limit:>6} {latency.quantiles()[0.5]:>8.3f} {max(latency.samples):>8.3f} "
+            f"{calls:>6.1f} {errors:>7}"
+        )
+
+
+def run(args: argparse.Namespace):
+    server = None
+    url = args.url
+    if url is None:
+        server, url = serve(config_of(args))
+    configure(args.provider, url, args.pool)
+    from dashboard.datasets import datasets
+
+    # Kept in the dataset cache, as uploads are: chart digests are computed once
+    df = sample_frame(args.rows)
+    datasets.put("bench-llm", df)
+    print(
+        f"provider {args.provider} at {url}, HTTP pool of {args.pool} connections"
+        + ("" if args.url else f", mock latency {args.latency}s, {args.token_rate:g} tokens/s, {args.tokens} tokens")
+    )
+    try:
+        bench_summaries(df, args.provider, args.concurrency, args.requests)
+        bench_report(df, url, args.provider, args.concurrency, args.charts, args.reports)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", choices=["openai", "anthropic", "groq"], default="openai")
+    parser.add_argument("--url", help="Mock server to use instead of starting one")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--charts", type=int, default=12)
+    parser.add_argument("--reports", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--pool", type=int, default=settings.LLM_POOL_SIZE, help="LLM_POOL_SIZE")
+    add_arguments(parser)
+    run(parser.parse_args())
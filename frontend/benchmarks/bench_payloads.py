@@ -0,0 +1,90 @@
+"""
+Bytes on the wire and serialization time of figure and stored-data payloads.
+
+Compares, for a chart with N points and a dataset with N rows:
+- figure as JSON lists of numbers (plotly < 6 behaviour)
+- figure through plotly's own JSON encoder
+- figure through ``encode_figure`` (f8 and f4)
+- stored-data as ``df.to_json(orient="split")`` vs ``encode_frame``
+
+Usage (from the frontend folder):
+    python -m benchmarks.bench_payloads --rows 100000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dashboard.payloads import encode_figure, encode_frame, decode_frame
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def sample_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": np.arange(rows),
+        "price": rng.normal(100, 15, rows),
+        "quantity": rng.integers(0, 500, rows),
+        "category": rng.choice(["a", "b", "c"], rows),
+    })
+
+
+def sample_figure(df: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df["x"], y=df["price"], mode="lines", name="price"))
+    fig.add_trace(go.Bar(x=df["x"], y=df["quantity"], name="quantity", yaxis="y2"))
+    fig.update_layout(template="plotly_white", yaxis2={"overlaying": "y", "side": "right"})
+    return fig
+
+
+def run(rows: int, repeat: int):
+    df = sample_frame(rows)
+    fig = sample_figure(df)
+    lists_figure = {
+        "data": [
+            {**trace.to_plotly_json(), "x": df["x"].tolist(), "y": df[trace.name].tolist()}
+            for trace in fig.data
+        ],
+        "layout": fig.layout.to_plotly_json(),
+    }
+
+    cases = {
+        "figure: json lists": lambda: json.dumps(lists_figure),
+        "figure: plotly default": lambda: pio.to_json(fig, validate=False),
+        "figure: encode_figure f8": lambda: pio.to_json(encode_figure(fig), validate=False),
+        "figure: encode_figure f4": lambda: pio.to_json(encode_figure(fig, float_dtype="f4"), validate=False),
+        "stored-data: to_json split": lambda: df.to_json(date_format="iso", orient="split"),
+        "stored-data: encode_frame": lambda: json.dumps(encode_frame(df)),
+    }
+    print(f"{rows} rows, best of {repeat}")
+    print(f"{'case':32} {'bytes':>12} {'time (ms)':>10}")
+    for name, fn in cases.items():
+        payload, elapsed = timed(fn, repeat)
+        print(f"{name:32} {len(payload):>12,} {elapsed * 1000:>10.1f}")
+
+    encoded = json.dumps(encode_frame(df))
+    _, parse_split = timed(lambda: pd.DataFrame(**json.loads(df.to_json(orient="split"))), repeat)
+    _, parse_typed = timed(lambda: decode_frame(json.loads(encoded)), repeat)
+    print(f"{'parse: split':32} {'':>12} {parse_split * 1000:>10.1f}")
+    print(f"{'parse: decode_frame':32} {'':>12} {parse_typed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
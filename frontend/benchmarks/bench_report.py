@@ -0,0 +1,63 @@
+"""
+Cost of building the ``Report`` model of a dashboard layout before a PDF export.
+
+Compares, for a layout with N tabs (sample dashboard repeated):
+- ``Report(**layout)`` and ``Report.model_validate_json``: full pydantic validation
+- recursive ``model_construct``: building the models without validation, for layouts
+  that were validated when they were stored
+- ``load_report``: cache hit by key (layout id and version), and by content
+
+Usage (from the frontend folder):
+    python -m benchmarks.bench_report --tabs 200
+"""
+import argparse
+import json
+from pathlib import Path
+
+from benchmarks.bench_payloads import timed
+from schemas.report import Col, Component, Report, Row, Tab, load_report
+
+SAMPLE_DASHBOARD = Path(__file__).resolve().parents[2] / "samples" / "dashboard_1.json"
+CHILD_MODELS = {Report: Tab, Tab: Row, Row: Col, Col: Component}
+CHILD_KEYS = {Report: "tabs", Tab: "rows"}
+
+
+def construct(model, data: dict):
+    """Recursive ``model_construct``, nested models are not built by pydantic."""
+    if model not in CHILD_MODELS:
+        return model.model_construct(**data)
+    values = dict(data)
+    children = values.pop(CHILD_KEYS.get(model, "children"), [])
+    return model.model_construct(
+        **values, children=[construct(CHILD_MODELS[model], child) for child in children]
+    )
+
+
+def run(tabs: int, repeat: int):
+    sample = json.loads(SAMPLE_DASHBOARD.read_text(encoding="utf-8"))
+    layout = {**sample, "tabs": [tab for _ in range(tabs) for tab in sample["tabs"]][:tabs]}
+    raw = json.dumps(layout)
+    n_components = sum(1 for _ in Report(**layout).components())
+
+    load_report(layout, key="bench")
+    load_report(layout)
+    cases = {
+        "validate: Report(**layout)": lambda: Report(**layout),
+        "validate: model_validate_json": lambda: Report.model_validate_json(raw),
+        "no validation: model_construct": lambda: construct(Report, layout),
+        "cache hit: by key": lambda: load_report(layout, key="bench"),
+        "cache hit: by content": lambda: load_report(layout),
+    }
+    print(f"{tabs} tabs, {n_components} components, best of {repeat}")
+    print(f"{'case':32} {'time (ms)':>10}")
+    for name, fn in cases.items():
+        _, elapsed = timed(fn, repeat)
+        print(f"{name:32} {elapsed * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.tabs, args.repeat)
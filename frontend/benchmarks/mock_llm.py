@@ -0,0 +1,249 @@
+"""
+Local stand-in for the LLM providers, for benchmarks and offline development.
+
+Serves the chat APIs used by ``llm.py``, with or without streaming (server-sent events):
+- OpenAI / Groq chat completions: ``POST /v1/chat/completions``, ``/openai/v1/chat/completions``
+- Anthropic messages: ``POST /v1/messages``
+
+Answers are made of placeholder words (a JSON object of chart summaries when the prompt
+asks for one, see ``llm.summarize_charts``). The first token comes after ``--latency``
+seconds (+/- ``--jitter``), then ``--token-rate`` tokens per second follow, up to
+``--tokens``. ``--error-rate`` of the requests fail with a 500, and ``--rate-limit-rate``
+with a 429.
+
+Usage (from the frontend folder):
+    python -m benchmarks.mock_llm --port 8900 --latency 0.3 --token-rate 80
+
+then point the app at it:
+    LLM_BASE_URLS='{"openai": "http://127.0.0.1:8900/v1", "anthropic": "http://127.0.0.1:8900", "groq": "http://127.0.0.1:8900"}'
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+WORDS = (
+    "sales grew steadily across the period while prices stayed mostly flat with a few "
+    "outliers in the later months and quantities peaked before a slight decline"
+).split()
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.3
+    jitter: float = 0.1
+    token_rate: float = 80
+    tokens: int = 120
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+
+def base_urls(url: str) -> dict:
+    """``LLM_BASE_URLS`` of the providers served at ``url``."""
+    return {"openai": f"{url}/v1", "anthropic": url, "groq": url}
+
+
+def answer_text(prompt: str, tokens: int) -> str:
+    """``tokens`` words, or a JSON object with ``tokens`` words per summary when asked for one."""
+    text = " ".join(WORDS[idx % len(WORDS)] for idx in range(tokens)).capitalize() + "."
+    if "JSON" not in prompt:
+        return text
+    ids = re.findall(r'"id":\s*"([^"]+)"', prompt)
+    return json.dumps({"dashboard": text, "charts": {idx: text for idx in ids}})
+
+
+def create_app(config: MockConfig) -> Flask:
+    app = Flask(__name__)
+    ids = itertools.count()
+    stats = {"requests": 0, "errors": 0}
+    lock = threading.Lock()
+    app.config["MOCK_STATS"] = stats
+
+    def failure(api: str):
+        """Injected error response, or None."""
+        draw = random.random()
+        if draw < config.error_rate:
+            status, kind, message = 500, "api_error", "Injected server error"
+        elif draw < config.error_rate + config.rate_limit_rate:
+            status, kind, message = 429, "rate_limit_error", "Injected rate limit"
+        else:
+            return None
+        with lock:
+            stats["errors"] += 1
+        if api == "anthropic":
+            body = {"type": "error", "error": {"type": kind, "message": message}}
+        else:
+            body = {"error": {"message": message, "type": kind, "code": None}}
+        response = jsonify(body)
+        response.status_code = status
+        response.headers["retry-after"] = "1"
+        return response
+
+    def tokens(prompt: str):
+        """Words of the answer (one token each), paced by the configured latency and token rate."""
+        time.sleep(max(0.0, config.latency + random.uniform(-config.jitter, config.jitter)))
+        text = answer_text(prompt, config.tokens)
+        pieces = re.findall(r"\S+\s*", text)
+        start = time.perf_counter()
+        for idx, piece in enumerate(pieces):
+            # Paced against the start, sleeping per token would drift
+            delay = start + idx / config.token_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield piece
+
+    def sse(events):
+        return Response(events, mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    def begin(api: str):
+        with lock:
+            stats["requests"] += 1
+        body = request.get_json(force=True)
+        return body, failure(api), next(ids)
+
+    @app.post("/v1/chat/completions")
+    @app.post("/openai/v1/chat/completions")
+    def chat_completions():
+        body, error, idx = begin("openai")
+        if error is not None:
+            return error
+        prompt = "".join(str(message.get("content", "")) for message in body.get("messages", []))
+        model, created, completion_id = body.get("model"), int(time.time()), f"chatcmpl-mock-{idx}"
+
+        if not body.get("stream"):
+            text = "".join(tokens(prompt))
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(text.split()),
+                    "total_tokens": len(prompt) // 4 + len(text.split()),
+                },
+            })
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in tokens(prompt):
+                yield chunk({"content": piece})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return sse(events())
+
+    @app.post("/v1/messages")
+    def messages():
+        body, error, idx = begin("anthropic")
+        if error is not None:
+            return error
+        prompt = "".join(
+            message["content"] if isinstance(message.get("content"), str)
+            else "".join(block.get("text", "") for block in message.get("content", []))
+            for message in body.get("messages", [])
+        )
+        message = {
+            "id": f"msg_mock_{idx}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 0},
+        }
+
+        if not body.get("stream"):
+            text = "".join(tokens(prompt))
+            return jsonify({
+                **message,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text.split())},
+            })
+
+        def event(kind: str, data: dict) -> str:
+            return f"event: {kind}\ndata: {json.dumps({'type': kind, **data})}\n\n"
+
+        def events():
+            yield event("message_start", {"message": message})
+            yield event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+            for piece in tokens(prompt):
+                yield event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": piece}})
+            yield event("content_block_stop", {"index": 0})
+            yield event("message_delta", {
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": config.tokens},
+            })
+            yield event("message_stop", {})
+
+        return sse(events())
+
+    @app.get("/stats")
+    def mock_stats():
+        with lock:
+            return jsonify(stats)
+
+    return app
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve(config: MockConfig, host: str = "127.0.0.1", port: int = 0):
+    """Mock server running in a background thread, and its URL. Stop it with ``server.shutdown()``."""
+    server = make_server(host, port, create_app(config), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    defaults = MockConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="Latency spread, in seconds")
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate, help="Tokens per second")
+    parser.add_argument("--tokens", type=int, default=defaults.tokens, help="Tokens per answer")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Share of 500 answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="Share of 429 answers")
+
+
+def config_of(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        token_rate=args.token_rate,
+        tokens=args.tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(f"Mock LLM server on http://{args.host}:{args.port}")
+    make_server(args.host, args.port, create_app(config_of(args)), threaded=True).serve_forever()
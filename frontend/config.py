@@ -23,11 +23,83 @@ class Settings(BaseSettings):
 
     # DASH
     DASH_ROUTE_PREFIX: str = "/dash/"
+    # Number of neighbouring tabs rendered in the background after the active one
+    TAB_PREFETCH: int = 0
+    TAB_PREFETCH_DELAY_MS: int = 300
+    # Rows built up front in each tab, the others are placeholders built when they are
+    # scrolled near the viewport (0 builds every row)
+    ROW_WINDOW: int = 8
+    # Parsed datasets kept in memory, and rows per table page
+    DATASET_CACHE_SIZE: int = 8
+    TABLE_PAGE_SIZE: int = 10
+    # Payload encoding: numeric columns of stored-data as typed arrays, and the float
+    # precision of figure data ("f8" or "f4")
+    STORE_TYPED_ARRAYS: bool = True
+    FIGURE_FLOAT_DTYPE: str = "f8"
+    # JSON implementation: "orjson" (falls back to "json" if not installed) or "json"
+    JSON_CODEC: str = "orjson"
+    # Where dashboard-state and stored-data are kept: "browser" (session storage),
+    # "memory" (in-process LRU, single worker) or "sqlite" (shared by the workers)
+    SESSION_STORE: str = "browser"
+    SESSION_STORE_PATH: str = "sessions.db"
+    SESSION_CACHE_SIZE: int = 256
+    SESSION_TTL_S: int = 7 * 24 * 3600
+    # Parsed Report objects kept in each process (and in the background cache, see load_report)
+    REPORT_CACHE_SIZE: int = 32
+    # PDF exports as Dash background callbacks, needs dash[diskcache]. Jobs run in new
+    # processes, without the in-process caches (see dashboard/background.py).
+    # BACKGROUND_WORKERS bounds the jobs running at the same time
+    BACKGROUND_CALLBACKS: bool = True
+    BACKGROUND_CACHE_DIR: str = ".cache/background"
+    BACKGROUND_WORKERS: int = 2
+    BACKGROUND_EXPIRE_S: int = 600
+    # Per-callback timings and payload sizes, served in the Prometheus format on
+    # METRICS_ROUTE. The quantiles cover the last CALLBACK_METRICS_WINDOW requests
+    CALLBACK_METRICS: bool = True
+    CALLBACK_METRICS_WINDOW: int = 1024
+    METRICS_ROUTE: str = "/metrics"
+    # AI summaries of report charts: default provider, requests running at the same time
+    # per provider, and how long a summary may take
+    LLM_PROVIDER: str = "groq"
+    LLM_CONCURRENCY: dict[str, int] = {"openai": 8, "anthropic": 4, "gemini": 4, "groq": 4}
+    LLM_TIMEOUT_S: float = 30
+    # Route streaming the AI summary of a dashboard card as it is generated
+    SUMMARY_STREAM_ROUTE: str = "/summaries/stream"
+    # Routing of LLM calls, see dashboard/llm_router.py: providers tried in turn when one
+    # fails, requests per minute (bursts of LLM_RATE_BURST_S seconds of them), retries with
+    # jittered exponential backoff, and circuit breakers
+    LLM_FALLBACK: list[str] = ["groq", "openai", "anthropic"]
+    LLM_RATE_LIMITS: dict[str, float] = {"openai": 500, "anthropic": 50, "gemini": 15, "groq": 30}
+    LLM_RATE_BURST_S: float = 10
+    LLM_RATE_WAIT_S: float = 5
+    LLM_RETRIES: int = 2
+    LLM_RETRY_BASE_S: float = 0.5
+    LLM_RETRY_MAX_S: float = 8
+    LLM_BREAKER_FAILURES: int = 5
+    LLM_BREAKER_RESET_S: float = 30
+    # Endpoints replacing the default ones of the providers, e.g. {"openai": "http://gateway/v1"}
+    LLM_BASE_URLS: dict[str, str] = {}
+    # HTTP connections kept open to the providers, shared by all the clients of a process
+    LLM_POOL_SIZE: int = 20
+    # Points of the aggregated series sent to the LLM for each chart series
+    DIGEST_POINTS: int = 24
+    # Summaries asked in a single LLM call, with an overview: for the whole "report",
+    # per "tab", or "off" (one call per chart)
+    LLM_BATCH: str = "report"
+    # Answers cached on disk by provider, model and prompt
+    LLM_CACHE: bool = True
+    LLM_CACHE_PATH: str = ".cache/llm.db"
+    LLM_CACHE_TTL_S: int = 30 * 24 * 3600
+    LLM_CACHE_MAX_MB: float = 64
+    # Log the server callbacks that need no server data on startup
+    CALLBACK_AUDIT: bool = False
 
     # CORS (optional)
     CORS_ALLOW_ORIGINS: list[str] = ["*"]
     OPEN_AI_KEY: str = Field(default="")
     GROQ_API_KEY: str = Field(default="")
+    ANTHROPIC_API_KEY: str = Field(default="")
+    GEMINI_API_KEY: str = Field(default="")
 
     class Config:
         env_file = Path() / "core" / ".env"
@@ -0,0 +1,73 @@
+"""
+Callback audit: lists the server callbacks that could run as clientside callbacks.
+
+A callback is reported when every Input, State and Output it touches is a pure
+presentation property (clicks, open/closed flags, styles, active tab...), i.e. it
+needs no data that only the server has.
+
+Usage (from the frontend folder):
+    python -m dashboard.audit
+or set CALLBACK_AUDIT=true and run main.py, the result is logged on startup.
+"""
+import logging
+
+from dash import Dash
+
+UI_PROPERTIES = {
+    "n_clicks",
+    "n_clicks_timestamp",
+    "n_intervals",
+    "is_open",
+    "style",
+    "className",
+    "class_name",
+    "active_tab",
+    "disabled",
+    "hidden",
+}
+
+
+def _dependencies(entry: dict) -> list:
+    outputs = entry["output"] if isinstance(entry["output"], (list, tuple)) else [entry["output"]]
+    deps = [(output.component_id, output.component_property) for output in outputs]
+    deps += [(dep.component_id, dep.component_property) for dep in entry["raw_inputs"]]
+    deps += [(dep["id"], dep["property"]) for dep in entry["state"]]
+    return deps
+
+
+def audit_callbacks(app: Dash) -> list:
+    """
+    Return the server callbacks of ``app`` whose inputs, states and outputs are all
+    presentation-only properties, as dicts with the callback name and its dependencies.
+    """
+    candidates = []
+    for key, entry in app.callback_map.items():
+        if "callback" not in entry:  # clientside callback
+            continue
+        deps = _dependencies(entry)
+        if all(prop in UI_PROPERTIES for _, prop in deps):
+            candidates.append({
+                "callback": entry["callback"].__name__,
+                "output": key,
+                "dependencies": [f"{component_id}.{prop}" for component_id, prop in deps],
+            })
+    return candidates
+
+
+def log_audit(app: Dash):
+    candidates = audit_callbacks(app)
+    if not candidates:
+        logging.info("Callback audit: no server callback could run clientside.")
+    for candidate in candidates:
+        logging.info(
+            f"Callback audit: {candidate['callback']} needs no server data "
+            f"({', '.join(candidate['dependencies'])})"
+        )
+    return candidates
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    from main import app
+
+    log_audit(app)
@@ -0,0 +1,120 @@
+"""
+Background callbacks for long-running work (PDF export).
+
+When ``BACKGROUND_CALLBACKS`` is on and the diskcache extra is installed
+(``pip install "dash[diskcache]"``), ``background_callback`` registers the callback as a
+Dash background callback: it runs in a worker process, the HTTP request returns at once,
+and the browser polls for progress and the result. Jobs take one of
+``BACKGROUND_WORKERS`` slots kept in the same cache, so at most that many of them do work
+at a time; the others report that they are queued.
+
+Without the manager the same functions run as ordinary callbacks, with a no-op
+``set_progress`` and the ``running`` states still applied.
+
+Each job runs in a new process, which starts from empty process-local state and drops
+whatever it adds to it: the dataset cache (``datasets``) and the metrics counters.
+Callbacks that fill a cache for the next callbacks must stay inline (``enabled=False``).
+State every process must see is kept in ``cache``: the LLM router rate limits and
+circuit breakers, the LLM concurrency slots and the parsed reports of ``load_report``.
+"""
+import functools
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable
+
+from config import settings
+
+try:
+    import diskcache
+    from dash import DiskcacheManager
+except ImportError:  # pragma: no cover
+    diskcache = None
+
+
+def create_manager():
+    if not settings.BACKGROUND_CALLBACKS:
+        return None, None
+    if diskcache is None:
+        logging.warning('diskcache is not installed, running long callbacks inline (pip install "dash[diskcache]")')
+        return None, None
+    cache = diskcache.Cache(settings.BACKGROUND_CACHE_DIR)
+    return cache, DiskcacheManager(cache, expire=settings.BACKGROUND_EXPIRE_S)
+
+
+cache, manager = create_manager()
+
+
+# Seconds between two looks for a free slot
+SLOT_POLL_S = 0.5
+
+
+@contextmanager
+def slot(name: str, count: int, on_queue: Callable = None):
+    """
+    Hold one of ``count`` slots of ``name`` shared by every process, calling ``on_queue()``
+    when none is free. A slot is a lease: a key of its own that expires after
+    ``BACKGROUND_EXPIRE_S``, so the slot of a cancelled (killed) job comes back then,
+    whatever the other jobs do. Without the cache, nothing is held.
+    """
+    if cache is None:
+        yield
+        return
+    lease = uuid.uuid4().hex
+    keys = [f"{name}:slot:{idx}" for idx in range(count)]
+    key = take_slot(keys, lease)
+    if key is None:
+        if on_queue is not None:
+            on_queue()
+        while key is None:
+            time.sleep(SLOT_POLL_S)
+            key = take_slot(keys, lease)
+    try:
+        yield
+    finally:
+        with cache.transact():
+            # An expired lease may have been taken by another job since
+            if cache.get(key) == lease:
+                cache.delete(key)
+
+
+@contextmanager
+def worker_slot(set_progress: Callable, name: str = "background-jobs"):
+    """Hold one of the ``BACKGROUND_WORKERS`` slots of the jobs, see ``slot``."""
+    with slot(name, settings.BACKGROUND_WORKERS, lambda: set_progress("Queued, waiting for a free worker...")):
+        yield
+
+
+def take_slot(keys: list, lease: str):
+    """First of ``keys`` free (unset or expired) now held by ``lease``, or None."""
+    for key in keys:
+        if cache.add(key, lease, expire=settings.BACKGROUND_EXPIRE_S):
+            return key
+    return None
+
+
+def no_progress(*args):
+    pass
+
+
+def background_callback(app, *dependencies, progress=None, cancel=None, running=None, enabled=True, **kwargs):
+    """
+    ``app.callback`` for ``func(set_progress, *args)``. It runs as a background callback
+    when a manager is configured and ``enabled`` (e.g. False when the callback writes
+    process-local state), and inline otherwise.
+    """
+    background = manager is not None and enabled
+
+    def decorator(func):
+        if not (background and progress):
+            # Dash only passes set_progress to background callbacks with progress outputs
+            @functools.wraps(func)
+            def callback(*args):
+                return func(no_progress, *args)
+        else:
+            callback = func
+        options = dict(background=True, manager=manager, progress=progress, cancel=cancel) if background else {}
+        return app.callback(*dependencies, running=running, **options, **kwargs)(callback)
+
+    return decorator
@@ -0,0 +1,115 @@
+"""
+JSON codec shared by the Dash app: callback requests and responses, the session store,
+dataset payloads and report loading.
+
+``JSON_CODEC`` selects the implementation: "orjson" (the default, falls back to "json"
+when orjson is not installed) or "json" (stdlib). Both accept NumPy scalars and arrays,
+pandas timestamps and missing values, so callbacks can return computed values as is.
+
+``install(server)`` makes Flask (request bodies) and Plotly (Dash responses, figures)
+use the same codec. See ``benchmarks/bench_json.py`` for the timings against the stdlib.
+"""
+import datetime
+import json
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from flask.json.provider import JSONProvider
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def default(obj) -> Any:
+    """Serialize the NumPy / pandas values the encoders do not handle natively."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (datetime.date, datetime.time, pd.Timestamp)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibCodec:
+    name = "json"
+
+    def dumps(self, obj, indent: bool = False) -> str:
+        if indent:
+            return json.dumps(obj, default=default, indent=2)
+        return json.dumps(obj, default=default, separators=(",", ":"))
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, indent: bool = False) -> str:
+        option = self.options | orjson.OPT_INDENT_2 if indent else self.options
+        return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+CODECS = {"json": StdlibCodec, "orjson": OrjsonCodec}
+
+
+def get_codec(name: str):
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON_CODEC {name!r}, expected one of {sorted(CODECS)}")
+    if name == "orjson" and orjson is None:
+        logging.warning("orjson is not installed, using the stdlib json codec")
+        name = "json"
+    return CODECS[name]()
+
+
+codec = get_codec(settings.JSON_CODEC)
+
+
+def dumps(obj, indent: bool = False) -> str:
+    return codec.dumps(obj, indent=indent)
+
+
+def loads(data):
+    return codec.loads(data)
+
+
+class CodecJSONProvider(JSONProvider):
+    """
+    Flask JSON provider using the codec. Calls passing options (``sort_keys``, ``default``,
+    ``indent``...) go to the stdlib json, which takes them all.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            kwargs.setdefault("default", default)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+
+def install(server):
+    """Use the codec for Flask request bodies and for Plotly / Dash responses."""
+    server.json = CodecJSONProvider(server)
+    pio.json.config.default_engine = codec.name
@@ -0,0 +1,101 @@
+"""
+In-process cache of the uploaded datasets.
+
+Every dataset is identified by its version: a hash of the serialized payload kept in
+the ``stored-data`` store. Callbacks that only need the data (table pages, KPIs...)
+receive the version and read the parsed DataFrame from here instead of re-parsing the
+whole payload. Artifacts derived from a dataset (sort orders, filter masks...) are
+cached alongside it and dropped together with it.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import pandas as pd
+
+from config import settings
+from dashboard import codec
+from dashboard.payloads import decode_frame
+
+
+def dataset_version(data) -> str:
+    if not isinstance(data, str):
+        data = codec.dumps(data)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _Entry:
+    def __init__(self, df: pd.DataFrame, max_derived: int):
+        self.df = df
+        self.derived = OrderedDict()
+        self.max_derived = max_derived
+
+
+class DatasetCache:
+    def __init__(self, max_entries: int = 8, max_derived: int = 64):
+        self.max_entries = max_entries
+        self.max_derived = max_derived
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: Optional[str]) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is None:
+                return None
+            self._entries.move_to_end(version)
+            return entry.df
+
+    def put(self, version: str, df: pd.DataFrame):
+        with self._lock:
+            replaced = self._entries.get(version)
+            if replaced is not None:
+                self._versions.pop(id(replaced.df), None)
+            self._entries[version] = _Entry(df, self.max_derived)
+            self._entries.move_to_end(version)
+            self._versions[id(df)] = version
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._versions.pop(id(evicted.df), None)
+
+    def version_of(self, df: pd.DataFrame) -> Optional[str]:
+        """Version of ``df`` if this very frame is cached, so callers can share its derived artifacts."""
+        with self._lock:
+            version = self._versions.get(id(df))
+            entry = self._entries.get(version)
+            return version if entry is not None and entry.df is df else None
+
+    def load(self, data) -> tuple:
+        """Return ``(version, df)`` for a ``stored-data`` payload, parsing it only once."""
+        if data is None:
+            return None, pd.DataFrame([])
+        version = dataset_version(data)
+        df = self.get(version)
+        if df is None:
+            df = decode_frame(data) if isinstance(data, dict) else pd.DataFrame(**codec.loads(data))
+            self.put(version, df)
+        return version, df
+
+    def derived(self, version: str, key, factory: Callable):
+        """
+        Return the artifact ``key`` derived from dataset ``version``, computing it with
+        ``factory(df)`` on first use. Raises KeyError if the dataset is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is None:
+                raise KeyError(version)
+            if key in entry.derived:
+                entry.derived.move_to_end(key)
+                return entry.derived[key]
+        value = factory(entry.df)
+        with self._lock:
+            entry.derived[key] = value
+            while len(entry.derived) > entry.max_derived:
+                entry.derived.popitem(last=False)
+        return value
+
+
+datasets = DatasetCache(max_entries=settings.DATASET_CACHE_SIZE)
@@ -0,0 +1,141 @@
+"""
+Compact statistical profile of the data behind a chart, for LLM prompts.
+
+``chart_digest(df, x, ys)`` replaces the first rows of the frame that used to be sent:
+its size is bounded by the number of series and ``DIGEST_POINTS``, not by the number of
+rows, and it describes the whole dataset. For each numeric Y column:
+
+- ``series``: the Y values aggregated (mean) over at most ``DIGEST_POINTS`` groups of X:
+  the X categories with the most rows, equal-width bins of a numeric / date X, or
+  consecutive row blocks without X
+- ``trend``: least-squares slope against X (or the row order), and the change it implies
+  over the whole X range
+- ``min`` / ``max`` with the X where they occur, ``quantiles`` and the ``outliers``
+  outside 1.5 IQR (count and the most extreme values)
+
+Everything is computed with pandas / NumPy vector operations, and kept with the dataset
+in the dataset cache.
+"""
+import numpy as np
+import pandas as pd
+
+from config import settings
+from dashboard.datasets import datasets
+
+QUANTILES = (0, 0.25, 0.5, 0.75, 1)
+MAX_OUTLIERS = 5
+
+
+def compact(value):
+    """Value as short as it can be written in a prompt: 4 significant digits, ISO dates."""
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(f"{value:.4g}")
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def x_kind(x: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(x) and not pd.api.types.is_bool_dtype(x):
+        return "numeric"
+    return "categorical"
+
+
+def x_positions(x: pd.Series, kind: str) -> np.ndarray:
+    """X as numbers for the trend: days for dates, the row order for categories."""
+    if kind == "datetime":
+        return (x - x.min()).dt.total_seconds().to_numpy() / 86400
+    if kind == "numeric":
+        return x.to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+def x_groups(x: pd.Series, kind: str, points: int) -> pd.Series:
+    """Group of every row, at most ``points`` distinct ones (rows left out are NaN)."""
+    if kind == "categorical":
+        top = x.value_counts().index[:points]
+        return x.where(x.isin(top))
+    if x.nunique() <= points:
+        return x
+    return pd.Series(pd.cut(x, points, labels=False), index=x.index)
+
+
+def series_digest(y: pd.Series, x: pd.Series = None, points: int = None) -> dict:
+    points = points or settings.DIGEST_POINTS
+    y = pd.to_numeric(y, errors="coerce")
+    valid = y.notna().to_numpy()
+    if x is not None:
+        valid = valid & x.notna().to_numpy()
+    y = y[valid].reset_index(drop=True)
+    digest = {"count": int(valid.sum())}
+    if y.empty:
+        return digest
+    if x is not None:
+        x = x[valid].reset_index(drop=True)
+        kind = x_kind(x)
+        groups = x_groups(x, kind, points)
+    else:
+        kind = "row"
+        groups = np.arange(len(y)) * points // len(y)
+    # Each group is labelled by its first X (or row), categories by themselves
+    labels = x if x is not None else pd.Series(np.arange(len(y)))
+    aggregated = pd.DataFrame({"x": labels, "y": y}).groupby(groups, sort=kind != "categorical").agg(
+        x=("x", "min" if kind != "categorical" else "first"), y=("y", "mean")
+    )
+    digest["series"] = [[compact(label), compact(value)] for label, value in zip(aggregated["x"], aggregated["y"])]
+
+    position = x_positions(x, kind) if x is not None else np.arange(len(y), dtype=float)
+    span = position.max() - position.min()
+    if span > 0:
+        centered = position - position.mean()
+        slope = centered @ y.to_numpy(dtype=float) / (centered @ centered)
+        digest["trend"] = {
+            "slope": compact(slope),
+            "per": {"datetime": "day", "numeric": "x unit"}.get(kind, "row"),
+            "change_over_range": compact(slope * span),
+        }
+
+    digest["min"] = {"value": compact(y.min()), "at": compact(labels[y.idxmin()])}
+    digest["max"] = {"value": compact(y.max()), "at": compact(labels[y.idxmax()])}
+    quantiles = y.quantile(QUANTILES)
+    digest["quantiles"] = {f"p{int(q * 100)}": compact(value) for q, value in quantiles.items()}
+    digest["mean"] = compact(y.mean())
+
+    iqr = quantiles[0.75] - quantiles[0.25]
+    low, high = quantiles[0.25] - 1.5 * iqr, quantiles[0.75] + 1.5 * iqr
+    outliers = y[(y < low) | (y > high)]
+    if not outliers.empty:
+        extreme = (outliers - quantiles[0.5]).abs().nlargest(MAX_OUTLIERS).index
+        digest["outliers"] = {
+            "count": len(outliers),
+            "most_extreme": [[compact(labels[idx]), compact(y[idx])] for idx in extreme],
+        }
+    return digest
+
+
+def chart_digest(df: pd.DataFrame, x: str = None, ys: list = None, points: int = None) -> dict:
+    """
+    Profile of the X column and of every numeric Y column of a chart found in ``df``,
+    kept with the dataset when ``df`` is in the dataset cache.
+    """
+    ys = tuple(dict.fromkeys(y for y in ys or [] if y in df.columns and pd.api.types.is_numeric_dtype(df[y])))
+    version = datasets.version_of(df)
+    if version is None:
+        return build_digest(df, x, ys, points)
+    return datasets.derived(version, ("digest", x, ys, points), lambda df: build_digest(df, x, ys, points))
+
+
+def build_digest(df: pd.DataFrame, x: str, ys: tuple, points: int = None) -> dict:
+    x_values = df[x] if x in df.columns else None
+    digest = {"rows": len(df), "columns": len(df.columns)}
+    if x_values is not None:
+        kind = x_kind(x_values)
+        digest["x"] = {"name": x, "kind": kind, "distinct": int(x_values.nunique())}
+        if kind != "categorical":
+            digest["x"]["range"] = [compact(x_values.min()), compact(x_values.max())]
+    digest["y"] = {y: series_digest(df[y], x_values, points) for y in ys}
+    return digest
@@ -0,0 +1,146 @@
+"""
+KPI engine for Stat components.
+
+All the stat requests of a dashboard are collected first and computed together, one
+vectorized pass per column, instead of one ``df[column].<agg>()`` call per card.
+Results are cached against the dataset version (see ``dashboard.datasets``) so the
+Dash view and the PDF report share them.
+
+Aggregations computed in the pass: sum, count, mean, min, max, nunique, median and
+percentiles written as ``p<NN>`` (e.g. ``p90``). Any other pandas reduction (``std``,
+``var``...) is computed on its own as ``series.<agg>()``. Cards without one use ``sum``.
+"""
+import logging
+import threading
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from dashboard.datasets import datasets
+
+BASE_AGGREGATIONS = {"sum", "count", "mean", "min", "max"}
+ORDER_AGGREGATIONS = {"nunique", "median"}
+DEFAULT_AGG = "sum"
+
+_lock = threading.Lock()
+
+
+def normalize_agg(agg: str) -> str:
+    return str(agg).strip().lower()
+
+
+def _quantile(agg: str) -> Optional[float]:
+    if agg == "median":
+        return 0.5
+    if agg.startswith("p") and agg[1:].replace(".", "", 1).isdigit():
+        return float(agg[1:]) / 100
+    return None
+
+
+def collect_stat_requests(stats: Iterable[tuple]) -> dict:
+    """Group ``(column, agg)`` pairs into ``{column: {agg, ...}}``."""
+    requests = defaultdict(set)
+    for column, agg in stats:
+        if column:
+            requests[column].add(normalize_agg(agg or DEFAULT_AGG))
+    return dict(requests)
+
+
+def column_stats(series: pd.Series, aggs: set) -> dict:
+    """Compute every aggregation in ``aggs`` for ``series`` in a single pass over its values."""
+    results = {}
+    quantiles = {agg: _quantile(agg) for agg in aggs if _quantile(agg) is not None}
+    needs_order = bool(quantiles) or "nunique" in aggs
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        count = values.size
+        results["count"] = int(count)
+        if needs_order:
+            # One sort gives min, max, quantiles and distinct values at once
+            values = np.sort(values)
+        total = float(values.sum())
+        results["sum"] = total
+        results["mean"] = total / count if count else None
+        if count:
+            results["min"] = float(values[0] if needs_order else values.min())
+            results["max"] = float(values[-1] if needs_order else values.max())
+        else:
+            results["min"] = results["max"] = None
+        if "nunique" in aggs:
+            results["nunique"] = int(np.count_nonzero(np.diff(values)) + 1) if count else 0
+        for agg, q in quantiles.items():
+            results[agg] = float(np.quantile(values, q)) if count else None
+    else:
+        values = series.dropna()
+        results["count"] = int(values.size)
+        if "nunique" in aggs:
+            results["nunique"] = int(values.nunique())
+        for agg in aggs & {"min", "max"}:
+            try:
+                results[agg] = getattr(values, agg)() if values.size else None
+            except TypeError:
+                results[agg] = None
+    for agg in aggs - results.keys():
+        results[agg] = pandas_agg(series, agg)
+    return {agg: results.get(agg) for agg in aggs | BASE_AGGREGATIONS if agg in results}
+
+
+def pandas_agg(series: pd.Series, agg: str):
+    """``series.<agg>()`` for reductions outside of the single pass, None if it is not one."""
+    method = getattr(series, agg, None)
+    if agg.startswith("_") or not callable(method):
+        return None
+    try:
+        value = method()
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value if np.isscalar(value) else None
+
+
+def compute_kpis(df: pd.DataFrame, requests: dict) -> dict:
+    """
+    Return ``{column: {agg: value}}`` for ``requests``. When ``df`` is a cached dataset,
+    results are stored with it and only the missing aggregations are computed.
+    """
+    version = datasets.version_of(df)
+    results = {}
+    for column, aggs in requests.items():
+        if column not in df.columns:
+            logging.warning(f"KPI column {column} not in dataset")
+            continue
+        aggs = {normalize_agg(agg) for agg in aggs}
+        if version is None:
+            results[column] = column_stats(df[column], aggs)
+            continue
+        cached = datasets.derived(version, ("kpis", column), lambda df: {})
+        with _lock:
+            missing = aggs - cached.keys()
+        if missing:
+            computed = column_stats(df[column], missing)
+            with _lock:
+                cached.update(computed)
+        # A copy: the cached dict is shared by every caller
+        with _lock:
+            results[column] = dict(cached)
+    return results
+
+
+def stat_value(df: pd.DataFrame, column: str, agg: str):
+    """Value of a single stat card, served from the KPI cache when it has been primed."""
+    return compute_kpis(df, {column: {agg}}).get(column, {}).get(normalize_agg(agg))
+
+
+def format_stat(value) -> str:
+    if value is None:
+        return "N/A"
+    if isinstance(value, float):
+        return f"{value:,.2f}" if not value.is_integer() else f"{value:,.0f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
@@ -0,0 +1,142 @@
+"""
+Persistent cache of LLM answers, shared by the worker processes of the host.
+
+``llm.summarize_chart`` looks its prompt up here before calling the provider: an export
+of an unchanged chart (same data preview, same provider and model) reuses the summary
+instead of paying for a new one. Entries are keyed by a hash of (provider, model,
+prompt), the prompt being whitespace-normalized, and stored in SQLite at
+``LLM_CACHE_PATH``:
+
+- entries older than ``LLM_CACHE_TTL_S`` are ignored and purged
+- when the answers take more than ``LLM_CACHE_MAX_MB``, the least recently used ones
+  are evicted
+
+``summarize_chart(..., refresh=True)`` skips the lookup and replaces the cached answer.
+``render_metrics()`` reports hits, misses and the cache size (appended to ``METRICS_ROUTE``).
+Hits and misses are counted in the same database, so they include the lookups made by
+the other workers and by background jobs.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+from dashboard import codec
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split())
+
+
+class LLMCache:
+    def __init__(self, path: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_answer ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, model TEXT NOT NULL, answer TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_answer_used_at ON llm_answer (used_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache_stat (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(provider: str, model: str, prompt: str) -> str:
+        data = codec.dumps([provider, model, normalize_prompt(prompt)])
+        return hashlib.blake2b(data.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, provider: str, model: str, prompt: str) -> Optional[str]:
+        key = self.key(provider, model, prompt)
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute("SELECT answer, created_at FROM llm_answer WHERE key = ?", (key,)).fetchone()
+        hit = row is not None and not (self.ttl and row[1] < now - self.ttl)
+        with conn:
+            self._count(conn, "hits" if hit else "misses")
+            if hit:
+                conn.execute("UPDATE llm_answer SET used_at = ? WHERE key = ?", (now, key))
+        return row[0] if hit else None
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, name: str):
+        conn.execute(
+            "INSERT INTO llm_cache_stat (name, value) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def put(self, provider: str, model: str, prompt: str, answer: str):
+        conn = self._connection()
+        now = time.time()
+        size = len(answer.encode("utf-8"))
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_answer (key, provider, model, answer, size, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.key(provider, model, prompt), provider, model, answer, size, now, now),
+            )
+            if self.ttl:
+                conn.execute("DELETE FROM llm_answer WHERE created_at < ?", (now - self.ttl,))
+            if self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the least recently used answers until the cache fits in ``max_bytes``."""
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_answer").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM llm_answer ORDER BY used_at"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM llm_answer WHERE key = ?", keys)
+
+    def stats(self) -> dict:
+        conn = self._connection()
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_answer").fetchone()
+        counts = dict(conn.execute("SELECT name, value FROM llm_cache_stat"))
+        return {"hits": counts.get("hits", 0), "misses": counts.get("misses", 0), "entries": entries, "bytes": size}
+
+
+def create_cache() -> Optional[LLMCache]:
+    if not settings.LLM_CACHE:
+        return None
+    return LLMCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL_S, int(settings.LLM_CACHE_MAX_MB * 1024 * 1024))
+
+
+llm_cache = create_cache()
+
+
+def render_metrics() -> str:
+    """Hits and misses of every process, and the size of the cache, in the Prometheus text format."""
+    if llm_cache is None:
+        return ""
+    stats = llm_cache.stats()
+    lines = []
+    for name, kind, description in (
+        ("hits", "counter", "LLM answers served from the cache, by every process sharing it"),
+        ("misses", "counter", "LLM prompts not found in the cache, by every process sharing it"),
+        ("entries", "gauge", "LLM answers in the cache"),
+        ("bytes", "gauge", "Size of the LLM answers in the cache"),
+    ):
+        metric = f"llm_cache_{name}_total" if kind == "counter" else f"llm_cache_{name}"
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}", f"{metric} {stats[name]}"]
+    return "\n".join(lines) + "\n"
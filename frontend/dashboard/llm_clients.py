@@ -0,0 +1,101 @@
+"""
+LLM provider clients, created once per process and shared.
+
+``clients.get(provider)`` returns the synchronous SDK client of a provider (OpenAI,
+Anthropic, Groq, or the configured ``google.generativeai`` module), built on first use
+with the API key from the settings (``OPEN_AI_KEY``, ``ANTHROPIC_API_KEY``,
+``GEMINI_API_KEY``, ``GROQ_API_KEY``) and the endpoint from ``LLM_BASE_URLS`` if any
+(a gateway, or the mock server of benchmarks/mock_llm.py). The HTTP clients share one
+``httpx`` connection pool of ``LLM_POOL_SIZE`` connections, so keep-alive connections
+are reused between summaries. Sync clients are thread-safe and used from the summary threads.
+
+Clients are also keyed by process id, a worker process forked from the server builds
+its own instead of sharing the parent's sockets.
+"""
+import logging
+import os
+import threading
+
+from config import settings
+
+
+def _limits():
+    import httpx
+    return httpx.Limits(max_connections=settings.LLM_POOL_SIZE, max_keepalive_connections=settings.LLM_POOL_SIZE)
+
+
+def _timeout():
+    import httpx
+    return httpx.Timeout(settings.LLM_TIMEOUT_S, connect=10)
+
+
+def create_client(provider: str, http_client=None):
+    """
+    New SDK client of ``provider``, on ``http_client`` when given. The SDKs do not retry:
+    calls are retried by dashboard/llm_router.py.
+    """
+    options = dict(
+        http_client=http_client,
+        timeout=settings.LLM_TIMEOUT_S,
+        max_retries=0,
+        base_url=settings.LLM_BASE_URLS.get(provider),
+    )
+    if provider == "openai":
+        from openai import OpenAI
+        return OpenAI(api_key=settings.OPEN_AI_KEY or None, **options)
+    if provider == "anthropic":
+        from anthropic import Anthropic
+        return Anthropic(api_key=settings.ANTHROPIC_API_KEY or None, **options)
+    if provider == "groq":
+        from groq import Groq
+        return Groq(api_key=settings.GROQ_API_KEY or None, **options)
+    if provider == "gemini":
+        # The SDK is configured globally
+        from google import generativeai as genai
+        genai.configure(api_key=settings.GEMINI_API_KEY or None)
+        return genai
+    raise ValueError(f"Unsupported provider: {provider}")
+
+
+def create_pooled_client(provider: str, http_client):
+    """
+    ``create_client`` on the shared pool, or on its own one for an SDK built on another
+    HTTP library (anthropic releases based on ``httpx2`` reject ``httpx`` clients).
+    """
+    try:
+        return create_client(provider, http_client)
+    except TypeError as e:
+        if "http_client" not in str(e):
+            raise
+        logging.warning("The %s client does not use the shared connection pool: %s", provider, e)
+        return create_client(provider)
+
+
+class ClientRegistry:
+    def __init__(self):
+        self._clients = {}
+        self._http_clients = {}
+        self._lock = threading.Lock()
+
+    def _http_client(self):
+        pid = os.getpid()
+        if pid not in self._http_clients:
+            import httpx
+            self._http_clients[pid] = httpx.Client(limits=_limits(), timeout=_timeout())
+        return self._http_clients[pid]
+
+    def get(self, provider: str):
+        key = (provider, os.getpid())
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            if key not in self._clients:
+                if provider == "gemini":
+                    self._clients[key] = create_client(provider)
+                else:
+                    self._clients[key] = create_pooled_client(provider, self._http_client())
+            return self._clients[key]
+
+
+clients = ClientRegistry()
@@ -0,0 +1,321 @@
+"""
+Routing of LLM calls across providers: rate limits, retries, circuit breakers and fallback.
+
+``router.call(provider, attempt)`` runs ``attempt(name)`` with the requested provider
+first, then with the next ones of ``LLM_FALLBACK`` (e.g. groq -> openai -> anthropic):
+
+- each provider has a token bucket of ``LLM_RATE_LIMITS[provider]`` requests per minute,
+  holding up to ``LLM_RATE_BURST_S`` seconds of requests. A call waits at most
+  ``LLM_RATE_WAIT_S`` for a token, then moves on to the next provider
+- rate limits, timeouts, connection and server errors are retried ``LLM_RETRIES`` times,
+  after a backoff drawn at random between 0 and ``LLM_RETRY_BASE_S * 2 ** retry`` (full
+  jitter, capped at ``LLM_RETRY_MAX_S``); other errors go straight to the next provider
+- after ``LLM_BREAKER_FAILURES`` failed calls in a row a provider is skipped for
+  ``LLM_BREAKER_RESET_S``, then a single trial call decides whether it is used again
+
+When every provider fails, ``LLMUnavailable`` is raised from the last error. Buckets and
+breakers are kept in the diskcache of the background callbacks when there is one (see
+dashboard/background.py), so that the web workers and every background job share them;
+per process otherwise. ``render_metrics()`` reports the calls, errors, retries,
+fallbacks, rejections and latency of every provider (appended to ``METRICS_ROUTE``).
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from config import settings
+from dashboard.background import cache as shared_cache
+from dashboard.metrics import QUANTILES, Summary
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMUnavailable(Exception):
+    """No provider could answer."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self) -> float:
+        """Take a token: 0 when taken, otherwise the seconds until there is one."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout: float = 0) -> bool:
+        """Take a token, waiting up to ``timeout`` seconds for one."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """``TokenBucket`` kept under ``key`` of a diskcache, shared by every process."""
+
+    def __init__(self, cache, key: str, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self.cache = cache
+        self.key = key
+
+    def _take(self) -> float:
+        with self._lock, self.cache.transact():
+            now = time.time()
+            self.tokens, self.updated = self.cache.get(self.key, (self.capacity, now))
+            self._refill(now)
+            wait = 0
+            if self.tokens >= 1:
+                self.tokens -= 1
+            else:
+                wait = (1 - self.tokens) / self.rate
+            self.cache.set(self.key, (self.tokens, self.updated))
+        return wait
+
+
+class CircuitBreaker:
+    # Clock of ``opened_at``
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self, failures: int, reset: float):
+        self.failures = failures
+        self.reset = reset
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            yield
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.clock() - self.opened_at >= self.reset else "open"
+
+    @property
+    def state(self) -> str:
+        with self._locked():
+            return self._state()
+
+    def allow(self) -> bool:
+        """Whether a call may go through; once open, a single trial call after ``reset``."""
+        with self._locked():
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def release(self):
+        """Give back a trial call that was not made (e.g. rate limited)."""
+        with self._locked():
+            self.trial = False
+
+    def success(self):
+        with self._locked():
+            self.consecutive, self.opened_at, self.trial = 0, None, False
+
+    def failure(self):
+        with self._locked():
+            self.consecutive += 1
+            if self.trial or self.consecutive >= self.failures:
+                self.opened_at = self.clock()
+            self.trial = False
+
+
+class SharedCircuitBreaker(CircuitBreaker):
+    """``CircuitBreaker`` kept under ``key`` of a diskcache, shared by every process."""
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, cache, key: str, failures: int, reset: float):
+        super().__init__(failures, reset)
+        self.cache = cache
+        self.key = key
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, self.cache.transact():
+            self.consecutive, self.opened_at, self.trial = self.cache.get(self.key, (0, None, False))
+            yield
+            self.cache.set(self.key, (self.consecutive, self.opened_at, self.trial))
+
+
+def error_kind(error: BaseException) -> str:
+    """``rate_limit``, ``timeout``, ``connection``, ``server`` or ``client`` (other errors)."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    name = type(error).__name__.lower()
+    if status == 429 or "ratelimit" in name:
+        return "rate_limit"
+    if isinstance(error, TimeoutError) or "timeout" in name or status == 408:
+        return "timeout"
+    if isinstance(error, ConnectionError) or "connection" in name:
+        return "connection"
+    if status in RETRYABLE_STATUS or (status is not None and status >= 500):
+        return "server"
+    return "client"
+
+
+def backoff(retry: int) -> float:
+    return random.uniform(0, min(settings.LLM_RETRY_MAX_S, settings.LLM_RETRY_BASE_S * 2 ** retry))
+
+
+class Router:
+    def __init__(self, fallback: list = None, rate_limits: dict = None, cache=None):
+        self.fallback = list(settings.LLM_FALLBACK if fallback is None else fallback)
+        self.rate_limits = settings.LLM_RATE_LIMITS if rate_limits is None else rate_limits
+        # diskcache holding the buckets and breakers, None to keep them in this process
+        self.cache = cache
+        self._buckets = {}
+        self._breakers = {}
+        self._counters = defaultdict(int)
+        self._latency = defaultdict(lambda: Summary(settings.CALLBACK_METRICS_WINDOW))
+        self._lock = threading.Lock()
+
+    def _bucket(self, provider: str) -> Optional[TokenBucket]:
+        with self._lock:
+            if provider not in self._buckets:
+                per_minute = self.rate_limits.get(provider)
+                bucket = None
+                if per_minute:
+                    rate = per_minute / 60
+                    capacity = max(1.0, rate * settings.LLM_RATE_BURST_S)
+                    if self.cache is not None:
+                        bucket = SharedTokenBucket(self.cache, f"llm-bucket:{provider}", rate, capacity)
+                    else:
+                        bucket = TokenBucket(rate, capacity)
+                self._buckets[provider] = bucket
+            return self._buckets[provider]
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                options = dict(failures=settings.LLM_BREAKER_FAILURES, reset=settings.LLM_BREAKER_RESET_S)
+                if self.cache is not None:
+                    self._breakers[provider] = SharedCircuitBreaker(self.cache, f"llm-breaker:{provider}", **options)
+                else:
+                    self._breakers[provider] = CircuitBreaker(**options)
+            return self._breakers[provider]
+
+    def _count(self, name: str, provider: str, label: str = ""):
+        with self._lock:
+            self._counters[(name, provider, label)] += 1
+
+    def providers(self, provider: str) -> list:
+        return [provider] + [name for name in self.fallback if name != provider]
+
+    def call(self, provider: str, attempt: Callable[[str], object]):
+        """``attempt(name)`` of the first provider that answers, starting with ``provider``."""
+        last_error = None
+        for idx, name in enumerate(self.providers(provider)):
+            if idx:
+                self._count("fallbacks", name)
+            breaker = self.breaker(name)
+            if not breaker.allow():
+                self._count("rejected", name, "circuit_open")
+                continue
+            bucket = self._bucket(name)
+            if bucket is not None and not bucket.acquire(settings.LLM_RATE_WAIT_S):
+                self._count("rejected", name, "rate_limited")
+                breaker.release()
+                continue
+            rate_limited = False
+            for retry in range(settings.LLM_RETRIES + 1):
+                if retry:
+                    time.sleep(backoff(retry - 1))
+                    if bucket is not None and not bucket.acquire(settings.LLM_RATE_WAIT_S):
+                        self._count("rejected", name, "rate_limited")
+                        rate_limited = True
+                        break
+                    self._count("retries", name)
+                start = time.perf_counter()
+                try:
+                    result = attempt(name)
+                except Exception as e:
+                    kind = error_kind(e)
+                    self._count("errors", name, kind)
+                    last_error = e
+                    if kind == "client":
+                        break
+                    continue
+                finally:
+                    with self._lock:
+                        self._latency[name].observe(time.perf_counter() - start)
+                self._count("requests", name, "success")
+                breaker.success()
+                return result
+            self._count("requests", name, "error")
+            if rate_limited:
+                # Our own limit, not a failure of the provider
+                breaker.release()
+            else:
+                breaker.failure()
+        raise LLMUnavailable(
+            f"No LLM provider available ({', '.join(self.providers(provider))})"
+            + (f": {last_error}" if last_error is not None else "")
+        ) from last_error
+
+    def render(self) -> str:
+        """Counters and latency of every provider, in the Prometheus text format."""
+        with self._lock:
+            counters = dict(self._counters)
+            latency = {name: (summary.quantiles(), summary.sum, summary.count) for name, summary in self._latency.items()}
+            breakers = {name: breaker.state for name, breaker in self._breakers.items()}
+        lines = []
+        for name, label, description in (
+            ("requests", "outcome", "LLM calls by provider and outcome"),
+            ("errors", "kind", "Failed LLM requests by provider and kind of error"),
+            ("retries", "", "LLM requests retried after an error"),
+            ("fallbacks", "", "LLM calls sent to a provider after the previous one failed"),
+            ("rejected", "reason", "LLM calls that skipped a provider (circuit open, rate limited)"),
+        ):
+            metric = f"llm_{name}_total"
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+            for (counter, provider, value), count in sorted(counters.items()):
+                if counter == name:
+                    labels = f'provider="{provider}"' + (f',{label}="{value}"' if label else "")
+                    lines.append(f"{metric}{{{labels}}} {count}")
+        metric = "llm_request_duration_seconds"
+        lines += [f"# HELP {metric} Duration of LLM requests by provider", f"# TYPE {metric} summary"]
+        for provider, (quantiles, total, count) in sorted(latency.items()):
+            for q in QUANTILES:
+                lines.append(f'{metric}{{provider="{provider}",quantile="{q}"}} {quantiles[q]:.6g}')
+            lines.append(f'{metric}_sum{{provider="{provider}"}} {total:.6g}')
+            lines.append(f'{metric}_count{{provider="{provider}"}} {count}')
+        metric = "llm_circuit_open"
+        lines += [f"# HELP {metric} Whether calls to the provider are suspended", f"# TYPE {metric} gauge"]
+        lines += [f'{metric}{{provider="{name}"}} {int(state == "open")}' for name, state in sorted(breakers.items())]
+        return "\n".join(lines) + "\n"
+
+
+router = Router(cache=shared_cache)
+
+
+def render_metrics() -> str:
+    return router.render()
@@ -0,0 +1,158 @@
+"""
+Per-callback profiling of the Dash app, exposed in the Prometheus text format.
+
+``instrument(app, server)`` hooks the ``_dash-update-component`` endpoint and records,
+for every callback request, labelled by callback name and trigger:
+
+- wall time and CPU time (of the request thread), deserialization and serialization included
+- request and response body sizes, i.e. the serialized inputs / states and outputs
+
+Each series keeps a window of the last ``CALLBACK_METRICS_WINDOW`` samples and is exported
+as a Prometheus summary (p50 / p95 / p99 plus running sum and count) on ``METRICS_ROUTE``.
+Polls of background callbacks are counted under the ``background-poll`` trigger.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Iterable
+
+from dash import Dash
+from flask import Flask, Response, g, request
+
+QUANTILES = (0.5, 0.95, 0.99)
+METRICS = {
+    "duration_seconds": "Wall time of Dash callback requests",
+    "cpu_seconds": "CPU time of Dash callback requests",
+    "request_bytes": "Serialized inputs and states of Dash callback requests",
+    "response_bytes": "Serialized outputs of Dash callback requests",
+}
+PREFIX = "dash_callback_"
+
+
+class Summary:
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.sum += value
+        self.count += 1
+
+    def quantiles(self) -> dict:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: math.nan for q in QUANTILES}
+        # Nearest rank
+        return {q: ordered[max(0, math.ceil(q * len(ordered)) - 1)] for q in QUANTILES}
+
+
+class CallbackMetrics:
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._series = defaultdict(self._new_series)
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> dict:
+        return {name: Summary(self.window) for name in METRICS}
+
+    def observe(self, callback: str, trigger: str, **values):
+        with self._lock:
+            series = self._series[(callback, trigger)]
+            for name, value in values.items():
+                if value is not None:
+                    series[name].observe(value)
+
+    def render(self) -> str:
+        """All the series in the Prometheus text exposition format."""
+        with self._lock:
+            snapshot = {
+                labels: {name: (summary.quantiles(), summary.sum, summary.count) for name, summary in series.items()}
+                for labels, series in self._series.items()
+            }
+        lines = []
+        for name, description in METRICS.items():
+            metric = PREFIX + name
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} summary"]
+            for (callback, trigger), series in sorted(snapshot.items()):
+                quantiles, total, count = series[name]
+                labels = f'callback="{_escape(callback)}",trigger="{_escape(trigger)}"'
+                for q, value in quantiles.items():
+                    lines.append(f'{metric}{{{labels},quantile="{q}"}} {value:.6g}')
+                lines.append(f"{metric}_sum{{{labels}}} {total:.6g}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def callback_name(app: Dash, body: dict) -> str:
+    output = body.get("output", "")
+    entry = app.callback_map.get(output, {})
+    callback = entry.get("callback")
+    return getattr(callback, "__name__", None) or output
+
+
+def trigger_name(body: dict) -> str:
+    """
+    First changed property of the request. Pattern-matching ids are reduced to their
+    "type", so a trigger label does not grow with the number of tabs, rows or nodes.
+    """
+    changed = body.get("changedPropIds") or []
+    if not changed:
+        return "initial"
+    component_id, _, prop = changed[0].rpartition(".")
+    if component_id.startswith("{"):
+        for item in body.get("inputs", []):
+            for dep in item if isinstance(item, list) else [item]:
+                dep_id = dep.get("id")
+                if isinstance(dep_id, dict) and dep.get("property") == prop:
+                    return f"{dep_id.get('type', 'pattern')}.{prop}"
+        return f"pattern.{prop}"
+    return f"{component_id}.{prop}"
+
+
+def instrument(
+        app: Dash, server: Flask, route: str = "/metrics", window: int = 1024, collectors: Iterable[Callable] = ()
+) -> CallbackMetrics:
+    """
+    Record the metrics of every callback request of ``app`` and serve them on ``route``,
+    followed by the text of every ``collectors()``.
+    """
+    metrics = CallbackMetrics(window)
+    update_path = app.config.routes_pathname_prefix + "_dash-update-component"
+
+    @server.before_request
+    def start_callback_timer():
+        if request.path == update_path:
+            g.callback_timer = (time.perf_counter(), time.thread_time())
+
+    @server.after_request
+    def record_callback(response):
+        timer = g.pop("callback_timer", None)
+        if timer is None:
+            return response
+        wall, cpu = time.perf_counter() - timer[0], time.thread_time() - timer[1]
+        body = request.get_json(silent=True) or {}
+        trigger = "background-poll" if "cacheKey" in request.args else trigger_name(body)
+        response_bytes = None if response.direct_passthrough else response.calculate_content_length()
+        metrics.observe(
+            callback_name(app, body),
+            trigger,
+            duration_seconds=wall,
+            cpu_seconds=cpu,
+            request_bytes=request.content_length,
+            response_bytes=response_bytes,
+        )
+        return response
+
+    def metrics_endpoint():
+        text = metrics.render() + "".join(collector() for collector in collectors)
+        return Response(text, mimetype="text/plain; version=0.0.4")
+
+    server.add_url_rule(route, "callback_metrics", metrics_endpoint)
+    return metrics
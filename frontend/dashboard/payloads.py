@@ -0,0 +1,119 @@
+"""
+Compact encoding of the numeric payloads sent to the browser.
+
+Numeric arrays are emitted as base64 typed arrays, the ``{"dtype": ..., "bdata": ...}``
+form understood by plotly.js, instead of JSON lists of numbers:
+
+- figures: ``encode_figure`` re-encodes the numeric trace data, downcasting integers to
+  the smallest typed array that holds them and, optionally, floats to float32.
+- stored data: ``encode_frame`` / ``decode_frame`` use the same form for the numeric
+  columns of the ``stored-data`` payload.
+
+See ``benchmarks/bench_payloads.py`` for size and timing against the default paths.
+"""
+import base64
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from dashboard import codec
+
+# Typed arrays supported by plotly.js (there is no 64 bit integer array)
+INT_DTYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+FLOAT_DTYPES = {"f8": np.float64, "f4": np.float32}
+TRACE_ARRAY_KEYS = ("x", "y", "z", "lat", "lon", "values")
+
+
+def is_typed_array(value) -> bool:
+    return isinstance(value, dict) and "bdata" in value and "dtype" in value
+
+
+def decode_array(value: dict) -> np.ndarray:
+    arr = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]).newbyteorder("<"))
+    if "shape" in value:
+        arr = arr.reshape([int(n) for n in str(value["shape"]).split(",")])
+    return arr
+
+
+def _smallest_int_dtype(arr: np.ndarray):
+    if arr.size == 0:
+        return np.int8
+    lo, hi = arr.min(), arr.max()
+    for dtype in INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return None
+
+
+def encode_array(values, float_dtype: Optional[str] = None):
+    """
+    Encode a numeric 1-D array as a typed array dict. Non numeric values are returned
+    unchanged. ``float_dtype="f4"`` halves the size of float arrays at float32 precision.
+    """
+    arr = np.asarray(values)
+    if arr.ndim != 1 or arr.dtype.kind not in "iuf":
+        return values
+    if arr.dtype.kind in "iu":
+        dtype = _smallest_int_dtype(arr)
+        if dtype is None:
+            # Does not fit a 32 bit typed array, keep it exact as a JSON list
+            return values
+        arr = arr.astype(dtype)
+    if arr.dtype.kind == "f":
+        target = FLOAT_DTYPES.get(float_dtype)
+        arr = arr.astype(target or arr.dtype)
+    arr = arr.astype(arr.dtype.newbyteorder("<"), copy=False)
+    return {
+        "dtype": arr.dtype.str.lstrip("<|"),
+        "bdata": base64.b64encode(arr.tobytes()).decode("ascii"),
+    }
+
+
+def encode_figure(fig: go.Figure, float_dtype: Optional[str] = None) -> dict:
+    """Plotly figure dict with its numeric trace data encoded as typed arrays."""
+    figure = fig.to_plotly_json()
+    for trace in figure.get("data", []):
+        for key in TRACE_ARRAY_KEYS:
+            value = trace.get(key)
+            if value is None or isinstance(value, str):
+                continue
+            if is_typed_array(value):
+                if "shape" in value:
+                    continue
+                value = decode_array(value)
+            trace[key] = encode_array(value, float_dtype=float_dtype)
+    return figure
+
+
+def encode_frame(df: pd.DataFrame, float_dtype: Optional[str] = None) -> dict:
+    """
+    Serialize ``df`` for a ``dcc.Store``: numeric columns as typed arrays, the others as
+    JSON lists (dates in ISO format). The index is not kept.
+    """
+    data = {}
+    for column in df.columns:
+        series = df[column]
+        encoded = encode_array(series.to_numpy(), float_dtype=float_dtype)
+        if not is_typed_array(encoded):
+            encoded = codec.loads(series.to_json(orient="values", date_format="iso"))
+        data[str(column)] = encoded
+    return {"columns": [str(column) for column in df.columns], "data": data}
+
+
+def _widen(arr: np.ndarray) -> np.ndarray:
+    # Downcasting is a wire format detail, computations get the usual 64 bit dtypes
+    return arr.astype(np.int64 if arr.dtype.kind in "iu" else np.float64)
+
+
+def decode_frame(payload: dict) -> pd.DataFrame:
+    data = payload["data"]
+    return pd.DataFrame(
+        {
+            column: _widen(decode_array(data[column])) if is_typed_array(data[column]) else data[column]
+            for column in payload["columns"]
+        },
+        columns=payload["columns"],
+    )
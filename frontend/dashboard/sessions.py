@@ -0,0 +1,220 @@
+"""
+Server-side storage for the ``dashboard-state`` and ``stored-data`` stores.
+
+With ``SESSION_STORE`` set to "memory" or "sqlite", the browser stores only hold a
+reference, ``{"session": <key>, "version": <n>}``, and the values themselves are kept
+here. Callbacks resolve references with ``resolve`` and write through ``save`` /
+``update``, so the dashboard layout and the dataset no longer travel with every request.
+
+Writes are checked against the version held by the client (optimistic concurrency):
+a client acting on an outdated layout gets a ``VersionConflict`` instead of silently
+overwriting a newer one, e.g. from a second browser tab on the same session.
+
+- ``MemorySessionStore``: in-process LRU, for a single worker.
+- ``SqliteSessionStore``: shared by every worker process on the host.
+
+Values returned by the stores are shared, callers must treat them as read-only.
+"""
+import abc
+import copy
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from config import settings
+from dashboard import codec
+
+
+class VersionConflict(Exception):
+    def __init__(self, key: str, expected: int, current: int):
+        super().__init__(f"Session {key} is at version {current}, not {expected}")
+        self.key = key
+        self.expected = expected
+        self.current = current
+
+
+def is_ref(value) -> bool:
+    return isinstance(value, dict) and value.keys() == {"session", "version"}
+
+
+class SessionStore(abc.ABC):
+    """Versioned key -> JSON value store. Version 0 means the key does not exist."""
+
+    # Whether other processes (e.g. background callbacks) see the writes
+    shared = True
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Tuple[int, Any]:
+        """``(version, value)`` of ``key``, ``(0, None)`` when it does not exist (or expired)."""
+
+    @abc.abstractmethod
+    def put(self, key: str, value, version: int) -> int:
+        """
+        Store ``value`` if ``key`` is still at ``version``, and return the new version.
+        Raises ``VersionConflict`` otherwise.
+        """
+
+    def resolve(self, value):
+        """The stored value for a reference, anything else is returned unchanged."""
+        if not is_ref(value):
+            return value
+        version, stored = self.get(value["session"])
+        if version == 0:
+            return None
+        return stored
+
+    def save(self, value, ref=None) -> dict:
+        """Store ``value`` under the session of ``ref`` (a new one if it is not a reference)."""
+        if is_ref(ref):
+            key, version = ref["session"], ref["version"]
+        else:
+            key, version = uuid.uuid4().hex, 0
+        return {"session": key, "version": self.put(key, value, version)}
+
+    def update(self, ref, func: Callable[[Any], None]) -> dict:
+        """
+        Apply ``func`` to a copy of the value of ``ref`` and store the result. ``ref`` may
+        also be an inline value, e.g. the initial data of the store.
+        """
+        if not is_ref(ref):
+            value = copy.deepcopy(ref)
+            func(value)
+            return self.save(value)
+        version, value = self.get(ref["session"])
+        if version != ref["version"]:
+            raise VersionConflict(ref["session"], ref["version"], version)
+        value = copy.deepcopy(value)
+        func(value)
+        return self.save(value, ref)
+
+
+class MemorySessionStore(SessionStore):
+    shared = False
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[int, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0, None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, value, version: int) -> int:
+        with self._lock:
+            current = self._entries.get(key, (0, None))[0]
+            if current != version:
+                raise VersionConflict(key, version, current)
+            self._entries[key] = (version + 1, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return version + 1
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Values are stored as JSON. Decoded values are cached per process by (key, version),
+    so a read only costs a primary key lookup while the session has not changed.
+    """
+
+    def __init__(self, path: str, cache_size: int = 256, ttl: Optional[float] = None):
+        self.path = path
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_state ("
+                "key TEXT PRIMARY KEY, version INTEGER NOT NULL, value TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_session_state_updated_at ON session_state (updated_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _expired_before(self, now: float) -> float:
+        """``updated_at`` of the sessions expired at ``now``: before it."""
+        return now - self.ttl if self.ttl else float("-inf")
+
+    def get(self, key: str) -> Tuple[int, Any]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT version FROM session_state WHERE key = ? AND updated_at >= ?",
+            (key, self._expired_before(time.time())),
+        ).fetchone()
+        if row is None:
+            return 0, None
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] == row[0]:
+            return cached
+        row = conn.execute("SELECT version, value FROM session_state WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return 0, None
+        version, value = row[0], codec.loads(row[1])
+        self._remember(key, version, value)
+        return version, value
+
+    def put(self, key: str, value, version: int) -> int:
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            if version == 0:
+                if self.ttl:
+                    conn.execute("DELETE FROM session_state WHERE updated_at < ?", (self._expired_before(now),))
+                try:
+                    conn.execute(
+                        "INSERT INTO session_state (key, version, value, updated_at) VALUES (?, 1, ?, ?)",
+                        (key, codec.dumps(value), now),
+                    )
+                except sqlite3.IntegrityError:
+                    raise VersionConflict(key, version, self.get(key)[0]) from None
+            else:
+                # An expired session is at version 0, whether or not it is purged yet
+                updated = conn.execute(
+                    "UPDATE session_state SET version = version + 1, value = ?, updated_at = ? "
+                    "WHERE key = ? AND version = ? AND updated_at >= ?",
+                    (codec.dumps(value), now, key, version, self._expired_before(now)),
+                ).rowcount
+                if not updated:
+                    raise VersionConflict(key, version, self.get(key)[0])
+        self._remember(key, version + 1, value)
+        return version + 1
+
+    def _remember(self, key: str, version: int, value):
+        with self._lock:
+            self._cache[key] = (version, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def create_store(kind: str) -> Optional[SessionStore]:
+    """Session store configured by ``SESSION_STORE``; None keeps the state in the browser."""
+    if kind == "memory":
+        return MemorySessionStore(settings.SESSION_CACHE_SIZE)
+    if kind == "sqlite":
+        return SqliteSessionStore(settings.SESSION_STORE_PATH, settings.SESSION_CACHE_SIZE, settings.SESSION_TTL_S)
+    if kind != "browser":
+        raise ValueError(f"Unknown SESSION_STORE {kind!r}, expected browser, memory or sqlite")
+    return None
+
+
+sessions = create_store(settings.SESSION_STORE)
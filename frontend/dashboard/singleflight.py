@@ -0,0 +1,168 @@
+"""
+Single-flight execution of expensive work (PDF exports, chart builds, AI summaries).
+
+Concurrent calls with the same ``(group, key)`` share one execution: the first caller
+runs the function, the others wait for it and get the same result (or exception).
+Nothing is kept once the call is over, so this deduplicates double clicks and users
+exporting the same layout together without caching results.
+
+- ``flights`` coalesces calls made by the threads of one process.
+- ``shared_flights`` also coalesces the background callback worker processes. It keeps a
+  lock per key in the background cache. The result of a call is only stored for the
+  callers that joined it while it ran, and deleted by the last of them to read it.
+  Without the background cache it is ``flights``.
+
+``render_metrics()`` reports, per group, the calls made and how many of them were
+coalesced, in the Prometheus text format (appended to ``METRICS_ROUTE``).
+"""
+import hashlib
+import pickle
+import threading
+from collections import defaultdict
+from typing import Callable, Hashable, Optional
+
+from config import settings
+from dashboard.background import cache, diskcache
+
+_MISSING = object()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._stats = defaultdict(lambda: {"calls": 0, "coalesced": 0})
+        self._lock = threading.Lock()
+
+    def do(self, group: str, key: Optional[Hashable], func: Callable, on_wait: Callable = None):
+        """
+        ``func()``, shared with the identical calls in flight. A ``None`` key (e.g. the
+        dataset is not known) runs ``func`` without coalescing. ``on_wait`` is called
+        before waiting for another caller.
+        """
+        if key is None:
+            return func()
+        with self._lock:
+            self._stats[group]["calls"] += 1
+            flight = self._flights.get((group, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(group, key)] = _Flight()
+            else:
+                self._stats[group]["coalesced"] += 1
+        if not leader:
+            if on_wait is not None:
+                on_wait()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[(group, key)]
+            flight.done.set()
+        return flight.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {group: dict(counts) for group, counts in self._stats.items()}
+
+
+class SharedFlight:
+    """
+    ``SingleFlight`` across processes, through a ``diskcache.Cache``.
+
+    Calls run one at a time under a lock per key. Each call belongs to a generation of the
+    key, and the generation moves on when a call succeeds: callers that joined while it
+    ran read its result, later callers run the function again.
+    """
+
+    def __init__(self, cache, expire: float = None):
+        self.cache = cache
+        # Clean-up of the entries of callers that died while waiting
+        self.expire = expire
+
+    def do(self, group: str, key: Optional[Hashable], func: Callable, on_wait: Callable = None):
+        if key is None:
+            return func()
+        name = f"flight:{group}:{hashlib.blake2b(pickle.dumps(key), digest_size=16).hexdigest()}"
+        self._count(group, "calls")
+        with self.cache.transact():
+            generation = self.cache.get(name + ":generation", default=0)
+            callers = f"{name}:{generation}:callers"
+            self.cache.set(callers, self.cache.get(callers, default=0) + 1, expire=self.expire)
+        result_key = f"{name}:{generation}:result"
+        lock = diskcache.Lock(self.cache, name + ":lock", expire=self.expire)
+        if on_wait is not None and lock.locked():
+            on_wait()
+        with lock:
+            result = self.cache.get(result_key, default=_MISSING)
+            if result is not _MISSING:
+                self._count(group, "coalesced")
+                with self.cache.transact():
+                    if self._leave(callers):
+                        self.cache.delete(result_key)
+                return result
+            try:
+                result = func()
+            except BaseException:
+                # The generation stays: its other callers run the function in turn
+                with self.cache.transact():
+                    self._leave(callers)
+                raise
+            with self.cache.transact():
+                if not self._leave(callers):
+                    self.cache.set(result_key, result, expire=self.expire)
+                self.cache.set(name + ":generation", generation + 1, expire=self.expire)
+        return result
+
+    def _leave(self, callers: str) -> bool:
+        """Count a caller out of its generation, True for the last one."""
+        remaining = self.cache.get(callers, default=1) - 1
+        if remaining > 0:
+            self.cache.set(callers, remaining, expire=self.expire)
+            return False
+        self.cache.delete(callers)
+        return True
+
+    def _count(self, group: str, name: str):
+        with self.cache.transact():
+            stats = self.cache.get("flight-stats", default={})
+            stats.setdefault(group, {"calls": 0, "coalesced": 0})[name] += 1
+            self.cache.set("flight-stats", stats)
+
+    def stats(self) -> dict:
+        return self.cache.get("flight-stats", default={})
+
+
+flights = SingleFlight()
+shared_flights = SharedFlight(cache, settings.BACKGROUND_EXPIRE_S) if cache is not None else flights
+
+
+def render_metrics() -> str:
+    """Calls and coalesced calls of every group, in the Prometheus text format."""
+    totals = defaultdict(lambda: {"calls": 0, "coalesced": 0})
+    for source in {id(flights): flights, id(shared_flights): shared_flights}.values():
+        for group, counts in source.stats().items():
+            for name, value in counts.items():
+                totals[group][name] += value
+    lines = []
+    for name, description in (
+        ("calls", "Calls made through single-flight groups"),
+        ("coalesced", "Calls that shared the result of an identical call in flight"),
+    ):
+        metric = f"singleflight_{name}_total"
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{group="{group}"}} {counts[name]}' for group, counts in sorted(totals.items())]
+    return "\n".join(lines) + "\n"
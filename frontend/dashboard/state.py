@@ -0,0 +1,189 @@
+"""
+Dashboard layout state with stable node ids.
+
+The ``dashboard-state`` store holds ``{"tabs": [tab, ...]}`` where tabs have ``rows``,
+rows and columns have ``children`` and columns hold cards. ``DashboardTree`` gives every
+tab, row, column and card an ``id`` and keeps an id -> node index.
+
+Components rendered for a node carry its id in their pattern-matching id, e.g.
+``{"type": "remove-row-btn", "node": "<row id>"}``, and never its position: the
+rendered dashboard is edited in place, so positions go stale after a removal.
+
+Builder actions are edits, ``add_edit`` / ``remove_edit``, applied by node id: a node
+that is gone (removed by a previous click, or a form left open on a removed column)
+makes the edit fail instead of hitting whatever node now holds its position. Edits are
+applied by ``DashboardTree.apply`` server side, or by ``dashboard.apply_edit`` in the
+browser (assets/dashboard.js) when the state is kept there.
+"""
+import copy
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+CHILDREN_KEYS = {"tab": "rows", "row": "children", "col": "children"}
+CHILD_KIND = {"tab": "row", "row": "col", "col": "card"}
+
+
+def new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def legacy_id(kind: str, path: tuple) -> str:
+    """
+    Id of a node saved before ids existed. It is derived from its position so the
+    layout and the callbacks agree on it until the state is written back with real ids.
+    """
+    return f"{kind}-{'-'.join(str(idx) for idx in path)}"
+
+
+def empty_tab(title: str = None) -> dict:
+    return {"id": new_id(), "title": title, "rows": []}
+
+
+def empty_row() -> dict:
+    return {"id": new_id(), "type": "row", "children": [empty_col()]}
+
+
+def empty_col() -> dict:
+    return {"id": new_id(), "type": "col", "children": []}
+
+
+def find_node(state, node_id: str, kind: str = None) -> Optional[dict]:
+    """
+    Node ``node_id`` of a layout, or None. Unlike ``DashboardTree`` it leaves the layout
+    untouched, for the read-only values of the session store.
+    """
+    pending = [(tab, "tab") for tab in state.get("tabs", [])] if isinstance(state, dict) else []
+    while pending:
+        node, node_kind = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if node.get("id") == node_id and kind in (None, node_kind):
+            return node
+        children_key = CHILDREN_KEYS.get(node_kind)
+        if children_key:
+            pending.extend((child, CHILD_KIND[node_kind]) for child in node.get(children_key, []))
+    return None
+
+
+def add_edit(kind: str, parent_id: Optional[str], node: dict) -> dict:
+    """Edit appending ``node`` to the children of ``parent_id`` (None for a tab)."""
+    return {"op": "add", "kind": kind, "parent": parent_id, "node": node}
+
+
+def remove_edit(kind: str, node_id: str) -> dict:
+    return {"op": "remove", "kind": kind, "node": node_id}
+
+
+@dataclass
+class NodeRef:
+    node: dict
+    kind: str
+    siblings: list
+    parent_id: Optional[str]
+
+
+class DashboardTree:
+    def __init__(self, state: Optional[dict] = None):
+        self.state = state if isinstance(state, dict) else {"tabs": []}
+        self.state.setdefault("tabs", [])
+        self._index = None
+        # Ids (and tab titles) given by the index to nodes that had none, or a duplicated id
+        self.assigned = 0
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = {}
+            for position, tab in enumerate(self.state["tabs"]):
+                self._register(tab, "tab", self.state["tabs"], None, (position,))
+        return self._index
+
+    def normalize(self) -> dict:
+        """Give an id to every node that has none, new ids to duplicates and titles to tabs."""
+        self.index
+        return self.state
+
+    def _register(self, node: dict, kind: str, siblings: list, parent_id: Optional[str], path: tuple):
+        node_id = node.get("id")
+        if not node_id:
+            node_id = node["id"] = legacy_id(kind, path)
+            self.assigned += 1
+        elif node_id in self._index:
+            # Duplicated id, e.g. a copy-pasted tab in an uploaded layout
+            node_id = node["id"] = new_id()
+            self.assigned += 1
+        if kind == "tab" and not node.get("title"):
+            node["title"] = f"Tab {path[0] + 1}"
+            self.assigned += 1
+        self._index[node_id] = NodeRef(node, kind, siblings, parent_id)
+        children_key = CHILDREN_KEYS.get(kind)
+        if children_key:
+            children = node.setdefault(children_key, [])
+            for position, child in enumerate(children):
+                if isinstance(child, dict):
+                    self._register(child, CHILD_KIND[kind], children, node_id, path + (position,))
+
+    def _unregister(self, node: dict, kind: str):
+        if self._index is None:
+            return
+        self._index.pop(node.get("id"), None)
+        children_key = CHILDREN_KEYS.get(kind)
+        for child in node.get(children_key, []) if children_key else []:
+            if isinstance(child, dict):
+                self._unregister(child, CHILD_KIND[kind])
+
+    def get(self, node_id: str, kind: str = None) -> Optional[NodeRef]:
+        ref = self.index.get(node_id)
+        if ref is None or (kind is not None and ref.kind != kind):
+            return None
+        return ref
+
+    def _append(self, parent_id: Optional[str], kind: str, node: dict) -> dict:
+        if parent_id is None:
+            if kind != "tab":
+                raise KeyError(f"A {kind} needs a parent")
+            siblings = self.state["tabs"]
+        else:
+            parent = self.get(parent_id)
+            if parent is None or CHILD_KIND.get(parent.kind) != kind:
+                raise KeyError(f"No {kind} container with id {parent_id}")
+            siblings = parent.node.setdefault(CHILDREN_KEYS[parent.kind], [])
+        siblings.append(node)
+        if self._index is not None:
+            self._register(node, kind, siblings, parent_id, (len(siblings) - 1,))
+        return node
+
+    def add_tab(self, title: str = None) -> dict:
+        return self._append(None, "tab", empty_tab(title or f"Tab {len(self.state['tabs']) + 1}"))
+
+    def add_row(self, tab_id: str) -> dict:
+        return self._append(tab_id, "row", empty_row())
+
+    def add_col(self, row_id: str) -> dict:
+        return self._append(row_id, "col", empty_col())
+
+    def add_card(self, col_id: str, card: dict) -> dict:
+        return self._append(col_id, "card", {"id": new_id(), "type": "card", **card})
+
+    def remove(self, node_id: str, kind: str = None) -> dict:
+        ref = self.get(node_id, kind)
+        if ref is None:
+            raise KeyError(f"No {kind or 'node'} with id {node_id}")
+        # Identity lookup, only among the siblings of the node
+        position = next(idx for idx, sibling in enumerate(ref.siblings) if sibling is ref.node)
+        ref.siblings.pop(position)
+        self._unregister(ref.node, ref.kind)
+        return ref.node
+
+    def apply(self, edit: dict) -> dict:
+        """
+        Apply an ``add_edit`` / ``remove_edit`` and return the node added or removed.
+        Raises KeyError when its target is not in the layout any more.
+        """
+        if edit["op"] == "remove":
+            return self.remove(edit["node"], edit["kind"])
+        node = copy.deepcopy(edit["node"])
+        if edit["kind"] == "tab" and not node.get("title"):
+            node["title"] = f"Tab {len(self.state['tabs']) + 1}"
+        return self._append(edit.get("parent"), edit["kind"], node)
@@ -0,0 +1,165 @@
+"""
+Concurrent AI summaries of the charts of a report.
+
+``Report.html(ai_describe=True)`` collects a ``SummaryRequest`` per chart component and runs
+them all at once with ``run_summaries``, instead of one LLM round trip after the other:
+
+- each summary runs ``llm.summarize_chart`` in a thread, under an asyncio fan-out
+- at most ``LLM_CONCURRENCY[provider]`` requests run at a time for each provider, across
+  every process when the background diskcache is configured (``background.slot``)
+- a summary that takes longer than ``LLM_TIMEOUT_S`` is reported as timed out (the
+  provider call is not interrupted, its late result is dropped)
+
+A ``BatchRequest`` groups the charts of a tab or of the whole report (``LLM_BATCH``) in
+a single call, see ``llm.summarize_charts``: the digests of all the charts go in one
+prompt, and the answer holds a summary per chart plus an overview of the dashboard,
+returned under the batch key. When the answer cannot be parsed, its charts are
+summarized one by one.
+
+``stream(request)`` yields a single summary in chunks as the provider writes it, for the
+summaries of the Dash cards.
+
+Identical requests (same key) are sent once. Results are returned by request key (by
+chart key for batches), and errors are returned as the footer text, as when summaries
+were generated one by one.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from config import settings
+from dashboard.background import slot
+from dashboard.singleflight import flights
+
+
+@dataclass
+class SummaryRequest:
+    key: Hashable
+    df: pd.DataFrame
+    chart_type: str
+    x: Optional[str] = None
+    y1: list = field(default_factory=list)
+    y2: list = field(default_factory=list)
+    title: str = ""
+    provider: str = settings.LLM_PROVIDER
+    # Skip the LLM cache lookup, see dashboard/llm_cache.py
+    refresh: bool = False
+    # Coalesces identical summaries of concurrent exports, see dashboard/singleflight.py
+    flight_key: Optional[Hashable] = None
+
+
+@dataclass
+class BatchRequest:
+    key: Hashable
+    df: pd.DataFrame
+    charts: List[SummaryRequest]
+    title: str = ""
+    provider: str = settings.LLM_PROVIDER
+    refresh: bool = False
+
+    @property
+    def flight_key(self) -> Optional[Hashable]:
+        keys = tuple(chart.flight_key for chart in self.charts)
+        if None in keys:
+            return None
+        return self.title, self.provider, keys
+
+
+def summarize(request: SummaryRequest) -> str:
+    from llm import summarize_chart
+    return flights.do("summary", request.flight_key, lambda: summarize_chart(
+        df=request.df,
+        chart_type=request.chart_type,
+        x=request.x,
+        y1=request.y1,
+        y2=request.y2,
+        title=request.title,
+        provider=request.provider,
+        refresh=request.refresh,
+    ))
+
+
+def stream(request: SummaryRequest) -> Iterator[str]:
+    """Summary of ``request`` in chunks as it is generated, ending with the error text on failure."""
+    from llm import stream_chart
+    try:
+        yield from stream_chart(
+            df=request.df,
+            chart_type=request.chart_type,
+            x=request.x,
+            y1=request.y1,
+            y2=request.y2,
+            title=request.title,
+            provider=request.provider,
+            refresh=request.refresh,
+        )
+    except Exception as e:
+        yield f"Error generating AI summary: {str(e)}"
+
+
+def summarize_batch(batch: BatchRequest) -> dict:
+    """Summary of every chart of ``batch`` by chart key, and the overview under the batch key."""
+    from llm import summarize_charts
+    charts = {str(idx): chart for idx, chart in enumerate(batch.charts)}
+    answer = flights.do("summary-batch", batch.flight_key, lambda: summarize_charts(
+        df=batch.df,
+        charts=[
+            {"id": idx, "chart_type": chart.chart_type, "x": chart.x, "y1": chart.y1, "y2": chart.y2, "title": chart.title}
+            for idx, chart in charts.items()
+        ],
+        title=batch.title,
+        provider=batch.provider,
+        refresh=batch.refresh,
+    ))
+    results = {chart.key: answer["charts"][idx] for idx, chart in charts.items()}
+    if answer["dashboard"]:
+        results[batch.key] = answer["dashboard"]
+    return results
+
+
+async def summarize_all(requests: Iterable[Union[SummaryRequest, BatchRequest]], timeout: float = None, limits: dict = None) -> dict:
+    timeout = settings.LLM_TIMEOUT_S if timeout is None else timeout
+    limits = settings.LLM_CONCURRENCY if limits is None else limits
+    semaphores = {}
+    # Not the loop's default executor: asyncio.run would wait for the calls that timed out
+    executor = ThreadPoolExecutor(max_workers=max(1, sum(limits.values())), thread_name_prefix="summary")
+    loop = asyncio.get_running_loop()
+
+    def limited(func: Callable, request: Union[SummaryRequest, BatchRequest]):
+        # The other processes (web workers, background jobs) call the same providers
+        with slot(f"llm:{request.provider}", limits.get(request.provider, 1)):
+            return func(request)
+
+    async def run(request: Union[SummaryRequest, BatchRequest]) -> dict:
+        if request.provider not in semaphores:
+            semaphores[request.provider] = asyncio.Semaphore(limits.get(request.provider, 1))
+        batch = isinstance(request, BatchRequest)
+        async with semaphores[request.provider]:
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, limited, summarize_batch if batch else summarize, request), timeout
+                )
+                return result if batch else {request.key: result}
+            except asyncio.TimeoutError:
+                error = f"Error generating AI summary: no answer after {timeout:g}s"
+            except Exception as e:
+                error = f"Error generating AI summary: {str(e)}"
+        return {chart.key: error for chart in request.charts} if batch else {request.key: error}
+
+    unique = {request.key: request for request in requests}
+    try:
+        results = await asyncio.gather(*(run(request) for request in unique.values()))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {key: text for result in results for key, text in result.items()}
+
+
+def run_summaries(requests: Iterable[Union[SummaryRequest, BatchRequest]], **kwargs) -> dict:
+    """``summarize_all`` from synchronous code (callbacks, report rendering)."""
+    requests = list(requests)
+    if not requests:
+        return {}
+    return asyncio.run(summarize_all(requests, **kwargs))
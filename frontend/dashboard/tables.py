@@ -0,0 +1,134 @@
+"""
+Server-side paging, sorting and filtering for table components.
+
+Tables are rendered with ``page_action``, ``sort_action`` and ``filter_action`` set to
+"custom": the browser only ever holds the current page, and every page request is
+answered from the cached dataset (see ``dashboard.datasets``). The row order for each
+sort / filter combination is computed once per dataset and cached, so flipping pages
+only costs the size of the page.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+from dash import dash_table
+
+from dashboard.datasets import datasets
+
+FILTER_OPERATORS = [
+    ["ge ", ">="],
+    ["le ", "<="],
+    ["lt ", "<"],
+    ["gt ", ">"],
+    ["ne ", "!="],
+    ["eq ", "="],
+    ["contains "],
+    ["datestartswith "],
+]
+
+
+def split_filter_part(filter_part: str) -> tuple:
+    """Split one ``{column} op value`` expression of a DataTable filter query."""
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find("{") + 1: name_part.rfind("}")]
+                value_part = value_part.strip()
+                v0 = value_part[:1]
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', "`"):
+                    value = value_part[1:-1].replace("\\" + v0, v0)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def filter_mask(df: pd.DataFrame, filter_query: str) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    for filter_part in filter_query.split(" && "):
+        name, operator, value = split_filter_part(filter_part)
+        if name not in df.columns:
+            continue
+        series = df[name]
+        try:
+            if operator in ("eq", "ne", "lt", "le", "gt", "ge"):
+                mask &= getattr(series, operator)(value).to_numpy(dtype=bool, na_value=False)
+            elif operator == "contains":
+                mask &= series.astype(str).str.contains(str(value), regex=False).to_numpy(dtype=bool)
+            elif operator == "datestartswith":
+                mask &= series.astype(str).str.startswith(str(value)).to_numpy(dtype=bool)
+        except TypeError:
+            # e.g. a text value compared against a numeric column
+            mask &= False
+    return mask
+
+
+def sort_order(df: pd.DataFrame, sort_key: tuple) -> np.ndarray:
+    """Row positions of ``df`` sorted by ``sort_key``, a tuple of (column, direction)."""
+    columns = [column for column, _ in sort_key]
+    ascending = [direction == "asc" for _, direction in sort_key]
+    ordered = df.reset_index(drop=True).sort_values(
+        columns, ascending=ascending, kind="stable", na_position="last"
+    )
+    return ordered.index.to_numpy()
+
+
+def row_positions(version: str, sort_by: list = None, filter_query: str = None) -> np.ndarray:
+    """Positions of the rows to display, in display order. Cached per dataset version."""
+    sort_key = tuple(
+        (item["column_id"], item["direction"]) for item in sort_by or []
+    )
+    filter_query = (filter_query or "").strip()
+
+    def build(df):
+        if sort_key:
+            positions = datasets.derived(version, ("sort", sort_key), lambda df: sort_order(df, sort_key))
+        else:
+            positions = np.arange(len(df))
+        if filter_query:
+            mask = datasets.derived(version, ("filter", filter_query), lambda df: filter_mask(df, filter_query))
+            positions = positions[mask[positions]]
+        return positions
+
+    return datasets.derived(version, ("rows", sort_key, filter_query), build)
+
+
+def table_page(version, page_current=0, page_size=10, sort_by=None, filter_query=None, columns=None) -> tuple:
+    """Return ``(records, page_count)`` for one page of the dataset ``version``."""
+    df = datasets.get(version)
+    if df is None:
+        return [], 0
+    positions = row_positions(version, sort_by, filter_query)
+    start = (page_current or 0) * page_size
+    page = df.iloc[positions[start:start + page_size]]
+    if columns:
+        page = page[columns]
+    return page.to_dict("records"), max(1, math.ceil(len(positions) / page_size))
+
+
+def render_table(table_id: dict, df: pd.DataFrame, columns: list = None, page_size: int = 10) -> dash_table.DataTable:
+    """
+    DataTable wired for server-side paging. The first page is rendered inline, the
+    following ones are served by the ``update_table_page`` callback.
+    """
+    columns = [c for c in columns or df.columns if c in df.columns]
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[{"name": c, "id": c} for c in columns],
+        data=df[columns].head(page_size).to_dict("records"),
+        page_current=0,
+        page_size=page_size,
+        page_count=max(1, math.ceil(len(df) / page_size)),
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        style_table={'overflowX': 'auto'},
+        style_cell={'textAlign': 'center'}
+    )
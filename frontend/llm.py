@@ -1,7 +1,20 @@
+import logging
+
 import pandas as pd
-from typing import List, Optional, Literal
+from typing import Callable, Iterator, List, Optional, Literal
+
+from dashboard import codec
+from dashboard.digest import chart_digest
+from dashboard.llm_cache import llm_cache
+from dashboard.llm_clients import clients
+from dashboard.llm_router import router
 
-from data_viz import settings
+DEFAULT_MODELS = {
+    "openai": "gpt-4.1-mini",
+    "anthropic": "claude-3-5-sonnet-latest",
+    "gemini": "gemini-2.0-flash",
+    "groq": "llama-3.1-8b-instant",
+}
 
 
 def summarize_chart(
@@ -14,6 +27,7 @@ def summarize_chart(
     provider: Literal["openai", "anthropic", "gemini", "groq"] = "groq",
     client=None,
     model: str = None,
+    refresh: bool = False,
 ) -> str:
     """
     Generate an LLM-powered summary of a chart based on its underlying data.
@@ -26,92 +40,284 @@ def summarize_chart(
         y2 (list[str]): Secondary Y-axis series.
         title (str): Chart title.
         provider (str): LLM provider name.
-        client: Pre-initialised client (OpenAI, Anthropic, Google, Groq).
+        client: Pre-initialised client (OpenAI, Anthropic, Google, Groq), the shared
+            client of the provider by default, see dashboard/llm_clients.py.
         model (str): Model name for that provider.
+        refresh (bool): Ask the provider even if the answer is cached, and cache the new one.
 
     Returns:
         str: Natural-language summary.
     """
 
-    # ---- 1) Create compact data preview (avoid sending huge frames) ----
-    df_preview = df.head(50).to_dict(orient="list")
+    prompt = build_prompt(df, chart_type, x=x, y1=y1, y2=y2, title=title)
+    return ask(prompt, provider, model=model, client=client, refresh=refresh)
+
+
+def stream_chart(
+    df: pd.DataFrame,
+    chart_type: str,
+    x: Optional[str] = None,
+    y1: Optional[List[str]] = None,
+    y2: Optional[List[str]] = None,
+    title: str = "",
+    provider: Literal["openai", "anthropic", "gemini", "groq"] = "groq",
+    client=None,
+    model: str = None,
+    refresh: bool = False,
+) -> Iterator[str]:
+    """
+    ``summarize_chart``, yielding the summary in chunks as the provider writes it. A cached
+    summary is yielded in one chunk, a streamed one is cached once complete.
+    """
+    prompt = build_prompt(df, chart_type, x=x, y1=y1, y2=y2, title=title)
+    model = model_of(provider, model)
+    if llm_cache is not None and not refresh:
+        cached = llm_cache.get(provider, model, prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    def attempt(name: str):
+        # Routed until the first chunk: a provider failing later cannot be replaced
+        stream = complete_stream(prompt, name, *routed(name, provider, model, client))
+        return next(stream, ""), stream
+
+    first, stream = router.call(provider, attempt)
+    chunks = [first]
+    yield first
+    for chunk in stream:
+        chunks.append(chunk)
+        yield chunk
+    if llm_cache is not None:
+        llm_cache.put(provider, model, prompt, "".join(chunks))
+
+
+def summarize_charts(
+    df: pd.DataFrame,
+    charts: List[dict],
+    title: str = "",
+    provider: Literal["openai", "anthropic", "gemini", "groq"] = "groq",
+    client=None,
+    model: str = None,
+    refresh: bool = False,
+) -> dict:
+    """
+    Summaries of several charts of the same dataset, and of the dashboard they make up,
+    in a single LLM call.
+
+    Args:
+        df (pd.DataFrame): Dataframe of every chart.
+        charts (list[dict]): Charts, with an "id" and the ``summarize_chart`` arguments
+            "chart_type", "x", "y1", "y2" and "title".
+        title (str): Dashboard title.
+        provider, client, model, refresh: As for ``summarize_chart``.
+
+    Returns:
+        dict: ``{"dashboard": str | None, "charts": {id: str}}``. The charts missing from
+        the answer (or all of them, when it is not the expected JSON) are summarized
+        one by one with ``summarize_chart``, and the dashboard summary is then None.
+    """
+    ids = [str(chart["id"]) for chart in charts]
+    prompt = build_batch_prompt(df, charts, title=title)
+    answer = ask(
+        prompt,
+        provider,
+        model=model,
+        client=client,
+        refresh=refresh,
+        parse=lambda text: parse_batch(text, ids),
+        max_tokens=300 + 200 * len(charts),
+    )
+    if answer is None:
+        logging.warning("Batched summary of %d charts could not be parsed, summarizing them one by one", len(charts))
+        answer = {"dashboard": None, "charts": {}}
+    for chart in charts:
+        if str(chart["id"]) not in answer["charts"]:
+            answer["charts"][str(chart["id"])] = summarize_chart(
+                df,
+                chart_type=chart.get("chart_type"),
+                x=chart.get("x"),
+                y1=chart.get("y1"),
+                y2=chart.get("y2"),
+                title=chart.get("title", ""),
+                provider=provider,
+                client=client,
+                model=model,
+                refresh=refresh,
+            )
+    return answer
+
+
+def ask(
+    prompt: str,
+    provider: str,
+    model: str = None,
+    client=None,
+    refresh: bool = False,
+    parse: Callable = None,
+    max_tokens: int = 300,
+):
+    """
+    Answer to ``prompt``, from the LLM cache unless ``refresh``. With ``parse``, returns
+    ``parse(answer)`` and only caches answers it accepts (not None).
+    The call is routed (see dashboard/llm_router.py): when ``provider`` fails, the answer
+    of a fallback provider is returned, and cached as the answer to this request.
+    """
+    model = model_of(provider, model)
+    parse = parse or (lambda text: text)
+
+    if llm_cache is not None and not refresh:
+        cached = llm_cache.get(provider, model, prompt)
+        parsed = parse(cached) if cached is not None else None
+        if parsed is not None:
+            return parsed
+    answer = router.call(
+        provider, lambda name: complete(prompt, name, *routed(name, provider, model, client), max_tokens=max_tokens)
+    )
+    parsed = parse(answer)
+    if llm_cache is not None and parsed is not None:
+        llm_cache.put(provider, model, prompt, answer)
+    return parsed
+
+
+def model_of(provider: str, model: str = None) -> str:
+    if provider not in DEFAULT_MODELS:
+        raise ValueError(f"Unsupported provider: {provider}")
+    return model or DEFAULT_MODELS[provider]
+
 
+def routed(name: str, provider: str, model: str, client=None) -> tuple:
+    """Model and client of a call routed to ``name``, the ones given being those of ``provider``."""
+    if name == provider:
+        return model, client
+    return model_of(name), None
+
+
+def build_prompt(
+    df: pd.DataFrame,
+    chart_type: str,
+    x: Optional[str] = None,
+    y1: Optional[List[str]] = None,
+    y2: Optional[List[str]] = None,
+    title: str = "",
+) -> str:
+    # ---- 1) Statistical digest of the chart data, bounded whatever the number of rows ----
     meta = {
         "chart_type": chart_type,
         "title": title,
         "x": x,
         "y1": y1,
         "y2": y2,
-        "columns": list(df.columns),
-        "data_preview": df_preview,
+        "data_digest": chart_digest(df, x, [*(y1 or []), *(y2 or [])]),
     }
 
     # ---- 2) Universal prompt ----
-    prompt = f"""
+    return f"""
     You are a data analysis assistant.
     Summarize the insights of the chart described below.
     Focus on trends, comparisons, anomalies, peaks, correlations, and interesting findings.
+    The data is described by a digest of the whole dataset: per series, values aggregated
+    over X, the trend, extrema, quantiles and outliers.
 
     Chart metadata:
-    {meta}
+    {codec.dumps(meta)}
 
     Write a concise, clear summary (around 4–7 sentences).
     """
 
+
+def build_batch_prompt(df: pd.DataFrame, charts: List[dict], title: str = "") -> str:
+    dashboard = {
+        "title": title,
+        "charts": [
+            {
+                "id": str(chart["id"]),
+                "chart_type": chart.get("chart_type"),
+                "title": chart.get("title", ""),
+                "x": chart.get("x"),
+                "y1": chart.get("y1"),
+                "y2": chart.get("y2"),
+                "data_digest": chart_digest(df, chart.get("x"), [*(chart.get("y1") or []), *(chart.get("y2") or [])]),
+            }
+            for chart in charts
+        ],
+    }
+    return f"""
+    You are a data analysis assistant.
+    Summarize the insights of the dashboard described below and of each of its charts.
+    All the charts are built on the same dataset, described per chart by a digest of the
+    whole dataset: per series, values aggregated over X, the trend, extrema, quantiles
+    and outliers.
+    Focus on trends, comparisons, anomalies, peaks, correlations, and interesting findings.
+
+    Dashboard:
+    {codec.dumps(dashboard)}
+
+    Answer with a JSON object only, without any other text, of the form:
+    {{"dashboard": "<summary of the dashboard as a whole, 4-7 sentences>",
+      "charts": {{"<chart id>": "<summary of the chart, 3-5 sentences>", ...}}}}
+    """
+
+
+def parse_batch(answer: str, ids: List[str]) -> Optional[dict]:
+    """``{"dashboard": ..., "charts": {...}}`` of a batched answer, None if it is not one."""
+    # Models tend to wrap the object in a Markdown code block or a sentence
+    start, end = answer.find("{"), answer.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        data = codec.loads(answer[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("charts"), dict):
+        return None
+    charts = {
+        str(key): value.strip() for key, value in data["charts"].items()
+        if str(key) in ids and isinstance(value, str) and value.strip()
+    }
+    if not charts:
+        return None
+    dashboard = data.get("dashboard")
+    return {"dashboard": dashboard.strip() if isinstance(dashboard, str) else None, "charts": charts}
+
+
+def complete(prompt: str, provider: str, model: str, client=None, max_tokens: int = 300) -> str:
+    """Answer of ``model`` from ``provider`` to ``prompt``."""
+    if client is None:
+        client = clients.get(provider)
+
     # ================
     # PROVIDER ROUTING
     # ================
 
     # ---- OpenAI ----
     if provider == "openai":
-        if client is None:
-            from openai import OpenAI
-            client = OpenAI()
-
-        model = model or "gpt-4.1-mini"
-
         response = client.chat.completions.create(
             model=model,
+            max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
         )
-        return response.choices[0].message["content"]
+        return response.choices[0].message.content
 
     # ---- Anthropic ----
     elif provider == "anthropic":
-        if client is None:
-            import anthropic
-            client = anthropic.Anthropic()
-
-        model = model or "claude-3-5-sonnet-latest"
-
         response = client.messages.create(
             model=model,
-            max_tokens=300,
+            max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
         )
         return response.content[0].text
 
     # ---- Google Gemini ----
     elif provider == "gemini":
-        if client is None:
-            from google import generativeai as genai
-            genai.configure(api_key="YOUR_KEY")
-            client = genai
-
-        model = model or "gemini-2.0-flash"
         response = client.GenerativeModel(model).generate_content(prompt)
         return response.text
 
     # ---- GROQ (Free Llama 3.1) ----
     elif provider == "groq":
-        if client is None:
-            from groq import Groq
-            client = Groq()
-
-        model = model or "llama-3.1-8b-instant"
-
         response = client.chat.completions.create(
             model=model,
+            max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
         )
         return response.choices[0].message.content
@@ -121,12 +327,37 @@ def summarize_chart(
         raise ValueError(f"Unsupported provider: {provider}")
 
 
+def complete_stream(prompt: str, provider: str, model: str, client=None, max_tokens: int = 300) -> Iterator[str]:
+    """``complete``, yielding the answer in chunks as they arrive."""
+    if client is None:
+        client = clients.get(provider)
+    messages = [{"role": "user", "content": prompt}]
+
+    # ---- OpenAI / GROQ (same chat completions API) ----
+    if provider in ("openai", "groq"):
+        for chunk in client.chat.completions.create(model=model, max_tokens=max_tokens, messages=messages, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    # ---- Anthropic ----
+    elif provider == "anthropic":
+        with client.messages.stream(model=model, max_tokens=max_tokens, messages=messages) as stream:
+            yield from stream.text_stream
+
+    # ---- Google Gemini ----
+    elif provider == "gemini":
+        for chunk in client.GenerativeModel(model).generate_content(prompt, stream=True):
+            yield chunk.text
+
+    else:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+
 if __name__ == "__main__":
     df = pd.DataFrame({
         "date": pd.date_range(start="2023-01-01", periods=12, freq="M"),
         "sales": [150, 200, 250, 300, 280, 320, 400, 450, 500, 550, 600, 700],
     })
-    settings.load_settings()
     summary = summarize_chart(
         df,
         chart_type="line",
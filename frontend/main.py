@@ -1,23 +1,37 @@
 import requests
 
-from flask import Flask, session as flask_session
+from flask import Flask, Response, request, session as flask_session
 from flask_login import LoginManager, UserMixin, login_user, current_user, logout_user
 
 from datetime import datetime
 
 import dash
-from dash import dcc, html, Input, Output, State, dash_table, ALL, MATCH
+from dash import dcc, html, Input, Output, State, ALL, MATCH, ClientsideFunction
 import dash_bootstrap_components as dbc
 
 import pandas as pd
-import base64, io, json
+import base64, copy, io
 import plotly.express as px
 import plotly.graph_objects as go
 import logging
 from pathlib import Path
 
 from config import settings
-from schemas.report import Report
+from schemas.report import layout_key, load_report
+from dashboard import codec
+from dashboard.audit import log_audit
+from dashboard.background import background_callback, worker_slot
+from dashboard.datasets import datasets, dataset_version
+from dashboard.tables import render_table, table_page
+from dashboard.payloads import encode_figure, encode_frame
+from dashboard.sessions import VersionConflict, is_ref, sessions
+from dashboard.singleflight import flights, render_metrics as render_flight_metrics, shared_flights
+from dashboard.state import DashboardTree, add_edit, empty_col, empty_row, empty_tab, find_node, new_id, remove_edit
+from dashboard.kpis import DEFAULT_AGG, collect_stat_requests, compute_kpis, stat_value, format_stat
+from dashboard.llm_cache import render_metrics as render_llm_cache_metrics
+from dashboard.llm_router import render_metrics as render_llm_router_metrics
+from dashboard.metrics import instrument
+from dashboard.summaries import SummaryRequest, stream as stream_summary
 
 
 # --------------------------
@@ -34,6 +48,7 @@ class DashUser(UserMixin):
 # --------------------------
 flask_server = Flask(__name__)
 flask_server.secret_key = settings.SECRET_KEY
+codec.install(flask_server)
 
 login_manager = LoginManager()
 login_manager.init_app(flask_server)
@@ -61,6 +76,11 @@ app = dash.Dash(
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True
 )
+if settings.CALLBACK_METRICS:
+    instrument(
+        app, flask_server, settings.METRICS_ROUTE, settings.CALLBACK_METRICS_WINDOW,
+        collectors=[render_flight_metrics, render_llm_cache_metrics, render_llm_router_metrics]
+    )
 navbar = dbc.Navbar(
     children=[
         # Left: App Title
@@ -123,20 +143,26 @@ app.layout = html.Div(
                       )
 
 
-@app.callback(
+# Pure-UI toggles run in the browser, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_navbar"),
     Output("navbar-collapse", "is_open"),
     Input("navbar-toggler", "n_clicks"),
     State("navbar-collapse", "is_open"),
 )
-def toggle_navbar(n, is_open):
-    if n:
-        return not is_open
-    return is_open
 
 
 
 store = [dcc.Store(id="stored-data", storage_type="session"),
+         dcc.Store(id="dataset-version", storage_type="session"),
+         dcc.Store(id="column-options", data=[], storage_type="session"),
+         dcc.Store(id="summary-stream-route", data=settings.SUMMARY_STREAM_ROUTE),
          dcc.Store(id="dashboard-state", data={"tabs": []}, storage_type="session"),
+         dcc.Store(id="dashboard-edit"),
+         dcc.Store(id="dashboard-render"),
+         dcc.Store(id="active-tab", storage_type="session"),
+         dcc.Store(id="rendered-tabs", data=[]),
+         dcc.Interval(id="tab-prefetch", interval=settings.TAB_PREFETCH_DELAY_MS, disabled=True),
        ]
 
 
@@ -191,6 +217,7 @@ def protected_layout():
                                                 multiple=False
                                             ),
 
+                                            html.Div(id="upload-progress", className="background-progress"),
                                             html.Div(id="file-info-div",
                                                      style={"fontWeight": "bold", "marginTop": "10px"}), ]
                                     ),
@@ -276,6 +303,7 @@ def protected_layout():
                                 children=[
                                     dbc.Col(
                                         children=[
+                                            html.Div(id="dashboard-alert"),
                                             html.Div(id="tabs-container"),
                                             html.Div(id="tab-content-container"),
                                         ]
@@ -298,6 +326,15 @@ def protected_layout():
                 className="app-content"
             ),
             dcc.Download(id="download-pdf"),
+            html.Div(
+                [
+                    html.Span(id="pdf-progress"),
+                    dbc.Button("Cancel", id="cancel-pdf-btn", size="sm", color="secondary", outline=True),
+                ],
+                id="pdf-status",
+                className="background-status",
+                style={"display": "none"},
+            ),
             footer
 
         ]
@@ -367,57 +404,32 @@ def process_login(n, email, password):
         return dbc.Alert("Server error", color="danger")
 
 
-def empty_tab(idx=0, title: str = None) -> dict:
-    return {
-        'title': title or f'Tab {idx + 1}',
-        'children': [
-            empty_row(idx=0, tab_idx=idx),
-        ]
-    }
-
-
-def empty_row(idx=0, tab_idx=0) -> dict:
-    return {
-        'type': 'row',
-        'children': [
-            empty_col(idx=0, row_idx=idx, tab_idx=tab_idx),
-
-        ]
-    }
-
-
-def empty_col(idx=0, tab_idx=0, row_idx=0) -> dict:
-    logging.debug("CREATING EMPTY COL")
-
-    return {
-        'type': 'col',
-        'children': [
-            # empty_card(idx, col_idx=idx, tab_idx=tab_idx, row_idx=row_idx),
-        ]
-    }
-
-
-def empty_card(idx=0, col_idx=0, tab_idx=0, row_idx=0) -> dict:
-    return {
-        'type': 'card',
-        'title': f'EMPTY Card {idx + 1}',
-        'footer': None,
-        'children': None,
-        "idx": idx,
-        "col_idx": col_idx,
-        "tab_idx": tab_idx,
-        "row_idx": row_idx,
-    }
+# Background callbacks run in worker processes: only offload the ones that write the
+# session state when the session store is shared between processes
+SHARED_STATE = sessions is None or sessions.shared
 
 
 # ---------- Parse CSV ----------
-@app.callback(
+@background_callback(
+    app,
     Output("stored-data", "data"),
+    Output("dataset-version", "data"),
     Output("file-info-div", "children"),
+    Output("column-options", "data"),
     Input("upload-data", "contents"),
-    State("upload-data", "filename")
+    State("upload-data", "filename"),
+    progress=Output("upload-progress", "children"),
+    running=[(Output("upload-data", "disabled"), True, False)],
+    # Inline: the parsed frame is cached in the process serving the next callbacks
+    # (datasets.put), a background job would cache it in a process that exits
+    enabled=False,
 )
-def parse_csv(contents, filename):
+def parse_csv(set_progress, contents, filename):
+    set_progress("Parsing the file...")
+    return read_csv_upload(contents, filename)
+
+
+def read_csv_upload(contents, filename) -> tuple:
     if contents is None:
         df = pd.read_csv(initial_file_path)
         # return None, ""
@@ -427,9 +439,17 @@ def parse_csv(contents, filename):
         try:
             df = pd.read_csv(io.StringIO(decoded.decode("utf-8")))
         except Exception as e:
-            return None, f"Error reading CSV: {e}"
+            return None, None, f"Error reading CSV: {e}", []
     info_text = f"File: {filename} | Rows: {df.shape[0]} | Columns: {df.shape[1]}"
-    return df.to_json(date_format="iso", orient="split"), info_text
+    if settings.STORE_TYPED_ARRAYS:
+        data = encode_frame(df)
+    else:
+        data = df.to_json(date_format="iso", orient="split")
+    version = dataset_version(data)
+    datasets.put(version, df)
+    if sessions is not None:
+        data = sessions.save(data)
+    return data, version, info_text, [str(col) for col in df.columns]
 
 
 def build_chart(
@@ -521,10 +541,10 @@ def build_chart(
     fig.update_layout(
         **layout
     )
-    return dcc.Graph(figure=fig)
+    return dcc.Graph(figure=encode_figure(fig, float_dtype=settings.FIGURE_FLOAT_DTYPE))
 
 
-def build_component(card, df):
+def build_component(card, df, component_id=None):
     component_type = card.get("component_type", "N/A")
     try:
         if component_type == "chart":
@@ -532,12 +552,35 @@ def build_component(card, df):
             y_axis_1 = card.get("y_axis_1", "N/A")
             y_axis_2 = card.get("y_axis_2", "N/A")
             chart_type = card.get("chart_type", None)
-            component = build_chart(
+            version = datasets.version_of(df)
+            # Tabs rendered by concurrent requests build each figure once
+            component = flights.do(
+                "figure",
+                (version, chart_type, x_axis, str(y_axis_1), str(y_axis_2)) if version else None,
+                lambda: build_chart(
+                    df=df,
+                    chart_type=chart_type,
+                    x=x_axis,
+                    y1=y_axis_1,
+                    y2=y_axis_2
+                )
+            )
+        elif component_type == "stat":
+            column = card.get("column")
+            agg = card.get("agg") or DEFAULT_AGG
+            component = html.Div(
+                [
+                    html.H3(format_stat(stat_value(df, column, agg)), className="stat-value"),
+                    html.Div(f"{agg.upper()} of {column}", className="stat-label"),
+                ],
+                className="stat-component"
+            )
+        elif component_type == "table":
+            component = render_table(
+                table_id={"type": "data-table", **(component_id or {})},
                 df=df,
-                chart_type=chart_type,
-                x=x_axis,
-                y1=y_axis_1,
-                y2=y_axis_2
+                columns=card.get("columns"),
+                page_size=settings.TABLE_PAGE_SIZE
             )
 
         else:
@@ -548,13 +591,18 @@ def build_component(card, df):
 
 
 # ---------- Render Tabs ----------
-def render_card(card, idx, tab_idx, row_idx, col_idx, search_dict, df) -> list:
-    logging.debug(f"         RENDERING CARD {idx} ")
+HIDDEN = {"display": "none"}
+
+
+def render_card(card, search_dict, df) -> list:
+    logging.debug(f"         RENDERING CARD {card.get('id')} ")
     logging.debug(f'        {card=}')
-    logging.debug(f'{card=}')
-    cards_index = {}
 
-    component = build_component(card, df)
+    component_id = {"node": card["id"]}
+    component = build_component(card, df, component_id=component_id)
+    footer = [card.get('footer', "No Footer")]
+    if card.get("component_type") == "chart":
+        footer += card_summary(component_id)
 
     return [
         dbc.Card(
@@ -565,195 +613,200 @@ def render_card(card, idx, tab_idx, row_idx, col_idx, search_dict, df) -> list:
                 dbc.CardBody([
                     component
                 ]),
-                dbc.CardFooter([
-                    card.get('footer', "No Footer")
-                ])
+                dbc.CardFooter(footer)
             ])
     ]
 
 
-def render_create_comp_form(col_idx, tab_idx, row_idx, df):
-    columns = [col for col in df.columns]
+def card_summary(component_id: dict) -> list:
+    """AI summary button of a chart card, and where its summary is written as it is generated."""
+    return [
+        html.Div(id={"type": "card-summary", **component_id}, className="card-summary"),
+        dbc.Button(
+            "AI Summary",
+            id={"type": "card-summary-btn", **component_id},
+            className="btn btn--sm",
+            color="primary",
+            outline=True,
+        ),
+    ]
+
+
+def as_list(value) -> list:
+    if value is None or value == "":
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def default_column(columns: list, idx: int):
+    return columns[idx] if idx < len(columns) else None
+
+
+def chart_form_body(node_id, columns: list):
     chart_types = ["bar", "line", "scatter"]
-    aggregations = ["Sum", "Count", "Mean"]
-    chart_form = dbc.Row(
-        dbc.Col(
-            dbc.Card(
-                dbc.Form(
-                    [
-                        dbc.Row(
-
-                            [
-                                html.H3("Create a Chart Component"),
-                                dbc.Label("Chart Type", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={
-                                            "type": "chart-type-dropdown",
-                                            "tab": tab_idx,
-                                            "row": row_idx,
-                                            "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in chart_types],
-                                        value=chart_types[0],
-                                    ),
-                                    width=4
-                                ),
-                            ],
-                            className="mb-3"
-                        ),
-                        dbc.Row(
-                            [
-                                dbc.Label("X Axis", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={"type": "x-axis-dropdown", "tab": tab_idx, "row": row_idx, "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in columns],
-                                        value=columns[0],
-                                    ),
-                                    width=4
+    return dbc.Col(
+        dbc.Card(
+            dbc.Form(
+                [
+                    dbc.Row(
+
+                        [
+                            html.H3("Create a Chart Component"),
+                            dbc.Label("Chart Type", width=2),
+                            dbc.Col(
+                                dbc.Select(
+                                    id={"type": "chart-type-dropdown", "node": node_id},
+                                    options=[{"label": c, "value": c} for c in chart_types],
+                                    value=chart_types[0],
                                 ),
-                            ],
-                            className="mb-3"
-                        ),
-                        dbc.Row(
-                            [
-                                dbc.Label("Chart Type", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={"type": "chart-type-dropdown", "tab": tab_idx, "row": row_idx,
-                                            "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in columns],
-                                        value=columns[1],
-                                    ),
-                                    width=4
+                                width=4
+                            ),
+                        ],
+                        className="mb-3"
+                    ),
+                    dbc.Row(
+                        [
+                            dbc.Label("X Axis", width=2),
+                            dbc.Col(
+                                dbc.Select(
+                                    id={"type": "x-axis-dropdown", "node": node_id},
+                                    options=[{"label": c, "value": c} for c in columns],
+                                    value=default_column(columns, 0),
                                 ),
-                            ],
-                            className="mb-3"
-                        ),
-                        dbc.Row(
-                            [
-                                dbc.Label("Y Axis 1", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={"type": "y-axis-1-dropdown", "tab": tab_idx, "row": row_idx,
-                                            "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in columns],
-                                        value=columns[1],
-                                    ),
-                                    width=4
+                                width=4
+                            ),
+                        ],
+                        className="mb-3"
+                    ),
+                    dbc.Row(
+                        [
+                            dbc.Label("Y Axis 1", width=2),
+                            dbc.Col(
+                                dbc.Select(
+                                    id={"type": "y-axis-1-dropdown", "node": node_id},
+                                    options=[{"label": c, "value": c} for c in columns],
+                                    value=default_column(columns, 1),
                                 ),
-                            ],
-                            className="mb-3"
-                        ),
-                        dbc.Row(
-                            [
-                                dbc.Label("Y Axis 2", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={"type": "y-axis-2-dropdown", "tab": tab_idx, "row": row_idx,
-                                            "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in columns],
-                                        value=columns[2],
-                                    ),
-                                    width=4
+                                width=4
+                            ),
+                        ],
+                        className="mb-3"
+                    ),
+                    dbc.Row(
+                        [
+                            dbc.Label("Y Axis 2", width=2),
+                            dbc.Col(
+                                dbc.Select(
+                                    id={"type": "y-axis-2-dropdown", "node": node_id},
+                                    options=[{"label": c, "value": c} for c in columns],
+                                    value=default_column(columns, 2),
                                 ),
-                            ],
-                            className="mb-3"
-                        ),
-                        dbc.Button(
-                            "Generate Chart",
-                            id={"type": "add-chart-btn",
-                                "tab": tab_idx, "row": row_idx, "col": col_idx},
-                            color="primary")
-                    ],
+                                width=4
+                            ),
+                        ],
+                        className="mb-3"
+                    ),
+                    dbc.Button(
+                        "Generate Chart",
+                        id={"type": "add-chart-btn", "node": node_id},
+                        color="primary")
+                ],
 
-                )
             )
-        ),
-        id={"type": "chart-form", "tab": tab_idx, "row": row_idx, "col": col_idx},
-        style={"display": "none"},
-        className="component-form"
+        )
     )
 
-    table_form = dbc.Row(
-        dbc.Col(
-            dbc.Card(
-                [
-                    dbc.CardHeader(html.H4("Create a Table Component")),
-                    dbc.CardBody(
-                        dbc.Form(
-                            children=[
-                                dbc.Row(
-                                    [
-                                        dbc.Label("Select Columns", width=2),
-                                        dbc.Col(
-                                            dbc.Select(
-                                                id={"type": "table-columns-dropdown", "tab": tab_idx, "row": row_idx,
-                                                    "col": col_idx},
-                                                options=[{"label": c, "value": c} for c in columns],
-                                                value="",
-                                                # multi=True
-                                            ),
+
+def table_form_body(node_id, columns: list):
+    return dbc.Col(
+        dbc.Card(
+            [
+                dbc.CardHeader(html.H4("Create a Table Component")),
+                dbc.CardBody(
+                    dbc.Form(
+                        children=[
+                            dbc.Row(
+                                [
+                                    dbc.Label("Select Columns", width=2),
+                                    dbc.Col(
+                                        dbc.Select(
+                                            id={"type": "table-columns-dropdown", "node": node_id},
+                                            options=[{"label": c, "value": c} for c in columns],
+                                            value="",
+                                            # multi=True
                                         ),
-                                    ],
-                                    className="mb-3"
-                                ),
-                            ],
-                        )
-                    )]
-            )
-        ),
-        id={"type": "table-form", "tab": tab_idx, "row": row_idx, "col": col_idx},
-        style={"display": "none"},
-        className="component-form"
-    )
-    stat_form = dbc.Row(
-        dbc.Col(
-            dbc.Card(
-                dbc.Form(
-                    children=[
-                        html.H3("Create a Stat Component"),
-                        dbc.Row(
-                            [
-                                dbc.Label("Select Column", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={"type": "table-columns-dropdown", "tab": tab_idx, "row": row_idx,
-                                            "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in columns],
-                                        value="",
-                                        # multi=False
                                     ),
-                                    width=4
+                                ],
+                                className="mb-3"
+                            ),
+                        ],
+                    )
+                )]
+        )
+    )
+
+
+def stat_form_body(node_id, columns: list):
+    aggregations = ["Sum", "Count", "Mean"]
+    return dbc.Col(
+        dbc.Card(
+            dbc.Form(
+                children=[
+                    html.H3("Create a Stat Component"),
+                    dbc.Row(
+                        [
+                            dbc.Label("Select Column", width=2),
+                            dbc.Col(
+                                dbc.Select(
+                                    id={"type": "stat-column-dropdown", "node": node_id},
+                                    options=[{"label": c, "value": c} for c in columns],
+                                    value="",
+                                    # multi=False
                                 ),
-                            ],
-                            className="mb-3"
-                        ),
-                        dbc.Row(
-                            [
-                                dbc.Label("Select Aggregation", width=2),
-                                dbc.Col(
-                                    dbc.Select(
-                                        id={"type": "table-columns-dropdown", "tab": tab_idx, "row": row_idx,
-                                            "col": col_idx},
-                                        options=[{"label": c, "value": c} for c in aggregations],
-                                        value="",
-                                        # multi=False
-                                    ),
-                                    width=4
+                                width=4
+                            ),
+                        ],
+                        className="mb-3"
+                    ),
+                    dbc.Row(
+                        [
+                            dbc.Label("Select Aggregation", width=2),
+                            dbc.Col(
+                                dbc.Select(
+                                    id={"type": "stat-agg-dropdown", "node": node_id},
+                                    options=[{"label": c, "value": c} for c in aggregations],
+                                    value="",
+                                    # multi=False
                                 ),
-                            ],
-                            className="mb-3"
-                        ),
-                    ]
+                                width=4
+                            ),
+                        ],
+                        className="mb-3"
+                    ),
+                ]
 
-                )
             )
-        ),
-        id={"type": "stat-form", "tab": tab_idx, "row": row_idx, "col": col_idx},
+        )
+    )
+
+
+def component_form(form_type, node_id) -> dbc.Row:
+    """Empty, hidden container of a component form, filled by ``open_component_form``."""
+    return dbc.Row(
+        id={"type": form_type, "node": node_id},
         style={"display": "none"},
         className="component-form"
     )
+
+
+def render_create_comp_form(node_id):
+    """
+    Buttons opening the chart, table and stat forms of a column. The forms themselves
+    are only built when opened, with the dataset columns of the ``column-options`` store.
+    """
+    chart_form = component_form("chart-form", node_id)
+    table_form = component_form("table-form", node_id)
+    stat_form = component_form("stat-form", node_id)
     return [
         html.H2("Add Component..."),
         dbc.Row(
@@ -761,7 +814,7 @@ def render_create_comp_form(col_idx, tab_idx, row_idx, df):
                 dbc.Col(
                     dbc.Button(
                         "📋",
-                        id={"type": "add-table-btn", "tab": tab_idx, "row": row_idx, "col": col_idx},
+                        id={"type": "add-table-btn", "node": node_id},
                         color="primary",
                         className="m-1",
                         outline=True,
@@ -771,16 +824,14 @@ def render_create_comp_form(col_idx, tab_idx, row_idx, df):
                 ),
                 dbc.Tooltip(
                     "Add a new table",
-                    target={"type": "add-table-btn", "tab": tab_idx, "row": row_idx, "col": col_idx},
+                    target={"type": "add-table-btn", "node": node_id},
                     placement="top",
                     trigger="hover"
                 ),
                 dbc.Col(
                     dbc.Button(
                         "📊",
-                        id={"type": "show-chart-form",
-                            "tab": tab_idx, "row": row_idx, "col": col_idx
-                            },
+                        id={"type": "show-chart-form", "node": node_id},
                         color="primary",
                         outline=True,
                         className="m-1"
@@ -789,14 +840,14 @@ def render_create_comp_form(col_idx, tab_idx, row_idx, df):
                 ),
                 dbc.Tooltip(
                     "Add a new Chart",
-                    target={"type": "show-chart-form", "tab": tab_idx, "row": row_idx, "col": col_idx},
+                    target={"type": "show-chart-form", "node": node_id},
                     placement="top",
                     trigger="hover"
                 ),
                 dbc.Col(
                     dbc.Button(
                         "🔢",
-                        id={"type": "add-stat-btn", "tab": tab_idx, "row": row_idx, "col": col_idx},
+                        id={"type": "add-stat-btn", "node": node_id},
                         color="primary",
                         outline=True,
                         className="m-1"
@@ -805,7 +856,7 @@ def render_create_comp_form(col_idx, tab_idx, row_idx, df):
                 ),
                 dbc.Tooltip(
                     "Add a new Metric",
-                    target={"type": "add-stat-btn", "tab": tab_idx, "row": row_idx, "col": col_idx},
+                    target={"type": "add-stat-btn", "node": node_id},
                     placement="top",
                     trigger="hover"
                 ),
@@ -825,56 +876,24 @@ def render_create_comp_form(col_idx, tab_idx, row_idx, df):
     ]
 
 
-def render_col(col, col_idx, tab_idx, row_idx, search_dict, df: pd.DataFrame) -> dbc.Col:
-    logging.debug(f"RENDERING COL {col_idx}")
+def render_col(col, search_dict, df: pd.DataFrame) -> dbc.Col:
     logging.debug(f'        {col=}')
+    node_id = col["id"]
     rendered_card = None
     col_children = col.get('children', [])
     if len(col_children) > 0:
-        for idx, child in enumerate(col_children):
+        for child in col_children:
             add_component_style = {"display": "none", "marginTop": "10px", "marginBottom": "10px"}
             if isinstance(child, dict) and child.get('type') == 'card':
-                rendered_card = render_card(
-                    child, idx, tab_idx, row_idx, col_idx, search_dict, df
-                )
+                rendered_card = render_card(child, search_dict, df)
             else:
                 rendered_card = str(child)
     else:
         add_component_style = {"display": "block", "marginTop": "10px", "marginBottom": "10px"}
 
     add_component_row = dbc.Row(
-        id={
-            "type": "add-component-row",
-            "col_idx": col_idx, "tab_idx": tab_idx, "row_idx": row_idx
-        },
-        children=render_create_comp_form(col_idx, tab_idx, row_idx, df),
-        # children=dbc.Col(
-        #     dbc.InputGroup(
-        #         [
-        #             dcc.Dropdown(
-        #                 id={
-        #                     "type": "component-dropdown",
-        #                     "tab": tab_idx,
-        #                     "row": row_idx,
-        #                     "col": col_idx
-        #                 },
-        #                 options=[{"label": k, "value": k} for k in components.keys()],
-        #                 placeholder="Select component",
-        #                 className="report-dropdown"
-        #             ),
-        #             dbc.Button(
-        #                 "Add",
-        #                 id={
-        #                     "type": "add-component-btn",
-        #                     "tab": tab_idx,
-        #                     "row": row_idx,
-        #                     "col": col_idx
-        #                 },
-        #                 className="btn btn--sm"
-        #             ),
-        #         ],
-        #     ),
-        # ),
+        id={"type": "add-component-row", "node": node_id},
+        children=render_create_comp_form(node_id),
         align="center",
         className="add-component-row",
         style=add_component_style
@@ -882,7 +901,7 @@ def render_col(col, col_idx, tab_idx, row_idx, search_dict, df: pd.DataFrame) ->
 
     remove_button = dbc.Button(
         "Remove Column",
-        id={"type": "remove-col-btn", "tab": tab_idx, "row": row_idx, "col": col_idx},
+        id={"type": "remove-col-btn", "node": node_id},
         className="btn btn--sm btn--negative hover-buttons",
         color="danger",
         outline=True
@@ -893,6 +912,7 @@ def render_col(col, col_idx, tab_idx, row_idx, search_dict, df: pd.DataFrame) ->
             dbc.Row(
                 dbc.Col(
                     children=rendered_card,
+                    id={"type": "col-card", "node": node_id},
                     className="centered"
                 )
             ),
@@ -900,32 +920,32 @@ def render_col(col, col_idx, tab_idx, row_idx, search_dict, df: pd.DataFrame) ->
             dbc.Row(dbc.Col(remove_button, className="centered hover-col-buttons")),
 
         ],
+        id={"type": "col-box", "node": node_id},
         className=""
     )
 
 
-def render_row(row, row_idx, tab_idx, search_dict, df) -> dbc.Row:
+def render_row(row, search_dict, df) -> dbc.Row:
     logging.debug(f"""
-    RENDERING ROW {row_idx}
+    RENDERING ROW {row.get("id")}
     {row}
 """)
-    children = []
-    for idx, child in enumerate(row.get('children', [])):
+    node_id = row["id"]
+    cols = []
+    for child in row.get('children', []):
         if isinstance(child, dict) and child.get('type') == 'col':
-            children.append(
-                render_col(
-                    child, idx, tab_idx, row_idx, search_dict, df
-                )
-            )
+            cols.append(render_col(child, search_dict, df))
         else:
-            children.append(str(child))
+            cols.append(str(child))
 
+    # Columns get their own container, added columns are appended to it
+    children = [dbc.Row(cols, id={"type": "row-cols", "node": node_id})]
     children.append(
         dbc.Row(
             dbc.Col(
                 children=dbc.Button(
                     "Add Column",
-                    id={"type": "add-col-btn", "tab": tab_idx, "row": row_idx},
+                    id={"type": "add-col-btn", "node": node_id},
                     className="btn btn--sm hover-buttons",
                     color="primary",
                     outline=True
@@ -939,7 +959,7 @@ def render_row(row, row_idx, tab_idx, search_dict, df) -> dbc.Row:
 
     remove_button = dbc.Button(
         "Remove Row",
-        id={"type": "remove-row-btn", "tab": tab_idx, "row": row_idx},
+        id={"type": "remove-row-btn", "node": node_id},
         className="btn btn--sm btn--negative",
         color="danger",
         outline=True
@@ -958,26 +978,76 @@ def render_row(row, row_idx, tab_idx, search_dict, df) -> dbc.Row:
     )
 
 
-def render_tab(tab, tab_idx, search_dict, df) -> dbc.Tab:
+def render_row_box(row, search_dict, df, placeholder=False) -> html.Div:
+    """A row with its separator, emptied and hidden when the row is removed."""
+    content = row_placeholder(row) if placeholder else render_row(row, search_dict, df)
+    return html.Div(
+        [content, dbc.Row(className="row-separator")],
+        id={"type": "row-box", "node": row["id"]},
+    )
+
+
+def tab_placeholder() -> html.Div:
+    """Lightweight stand-in for a tab whose charts have not been built yet."""
+    return html.Div(
+        dbc.Spinner(size="sm", color="secondary"),
+        className="tab-placeholder centered mar-1",
+    )
+
+
+def row_placeholder(row) -> html.Div:
+    """
+    Stand-in for a row outside of the ``ROW_WINDOW``. assets/virtual_rows.js clicks the
+    inner placeholder when it gets near the viewport, and ``render_row_slot`` builds the row.
+    """
+    return html.Div(
+        [
+            html.Div(
+                id={"type": "row-placeholder", "node": row["id"]},
+                className="row-placeholder",
+            ),
+            # Sent to render_row_slot instead of the whole dashboard state
+            dcc.Store(id={"type": "row-spec", "node": row["id"]}, data=row),
+        ],
+        id={"type": "row-slot", "node": row["id"]},
+    )
+
+
+def render_tab(tab, search_dict, df, lazy=False) -> dbc.Tab:
+    """
+    Render the tab shell. With ``lazy=True`` only a placeholder is rendered as body,
+    the content is built by ``render_active_tab`` the first time the tab is activated.
+    """
+    node_id = tab["id"]
+    children = tab_placeholder() if lazy else render_tab_body(tab, search_dict, df)
+    return dbc.Tab(
+        children=html.Div(children, id={"type": "tab-body", "node": node_id}),
+        # Tabs added without a session store get their title in the browser, see assets/dashboard.js
+        label=tab.get('title') or "New tab",
+        tab_id=node_id,
+        class_name="tab parent-hover parent-col-hover tabs__panel ",  #
+        id={"type": "tab", "node": node_id},
+        tab_class_name="tab tabs__tab ",
+        tab_style={"max-width": "100%", "padding": "10px"},
+        label_style={"max-width": "100%", "padding": "10px"}
+    )
+
+
+def render_tab_body(tab, search_dict, df) -> list:
     logging.debug(f"""
-    RENDERING TAB {tab_idx}
+    RENDERING TAB {tab.get("id")}
     {tab.get("uid")=}
     {tab.get("method")=}
     {tab=}
     """)
-    children = []
+    node_id = tab["id"]
+    rows = []
     for idx, child in enumerate(tab.get('rows', [])):
         if isinstance(child, dict) and child.get('type') == 'row':
-            children.append(
-                render_row(
-                    child, idx, tab_idx, search_dict, df
-                )
-            )
-            children.append(
-                dbc.Row(
-                    className="row-separator"
-                )
-            )
+            placeholder = bool(settings.ROW_WINDOW) and idx >= settings.ROW_WINDOW
+            rows.append(render_row_box(child, search_dict, df, placeholder=placeholder))
+    # Rows get their own container, added rows are appended to it
+    children = [html.Div(rows, id={"type": "tab-rows", "node": node_id})]
     # Add Row button
     children.append(
         dbc.Row(
@@ -985,7 +1055,7 @@ def render_tab(tab, tab_idx, search_dict, df) -> dbc.Tab:
                 children=[
                     dbc.Button(
                         "Add Row",
-                        id={"type": "add-row-btn", "tab": tab_idx},
+                        id={"type": "add-row-btn", "node": node_id},
                         className="btn btn--sm hover-buttons",
                         color="primary",
                         outline=True,
@@ -1001,111 +1071,362 @@ def render_tab(tab, tab_idx, search_dict, df) -> dbc.Tab:
     )
     remove_button = dbc.Button(
         "Remove Tab",
-        id={"type": "remove-tab-btn", "tab": tab_idx},
+        id={"type": "remove-tab-btn", "node": node_id},
         className="btn btn--sm btn--negative",
         color="danger",
         outline=True,
 
     )
     children.append(remove_button)
-    #
-    # return rendered_tab
-    return dbc.Tab(
-        children=children or ["EMPTY TAB"], label=tab.get('title', f'Tab {tab_idx + 1}'),
-        class_name="tab parent-hover parent-col-hover tabs__panel ",  #
-        id={"type": "tab", "tab": tab_idx, },
-        tab_class_name="tab tabs__tab ",
-        tab_style={"max-width": "100%", "padding": "10px"},
-        label_style={"max-width": "100%", "padding": "10px"}
-    )
+    return children
 
 
-@app.callback(
+@background_callback(
+    app,
     Output("download-pdf", "data"),
     Input("download-pdf-btn", "n_clicks"),
     State("dashboard-state", "data"),
     State("stored-data", "data"),
+    progress=Output("pdf-progress", "children"),
+    cancel=[Input("cancel-pdf-btn", "n_clicks")],
+    running=[
+        (Output("download-pdf-btn", "disabled"), True, False),
+        (Output("pdf-status", "style"), {"display": "flex"}, {"display": "none"}),
+    ],
+    enabled=SHARED_STATE,
     prevent_initial_call=True,
 )
-def trigger_pdf_download(n, state, data):
-    data_js = json.loads(data)
-    df = pd.DataFrame(**data_js)
-    logging.debug(df)
-
-    report = Report(**state)
-    logging.debug(report)
-    pdf_bytes = report.pdf(
-        df=df
+def trigger_pdf_download(set_progress, n, state, data):
+    if sessions is not None and is_ref(state):
+        # Session versions are immutable, no need to hash the layout to find its report
+        version, layout = sessions.get(state["session"])
+        layout, report_key = layout or {}, (state["session"], version)
+    else:
+        layout = state or {}
+        report_key = layout_key(layout)
+    # Double clicks and users exporting the same layout and data together share one export
+    pdf_bytes = shared_flights.do(
+        "pdf",
+        (report_key, dataset_version(data)),
+        lambda: export_pdf(set_progress, layout, report_key, data),
+        on_wait=lambda: set_progress("Waiting for the same export to finish..."),
     )
-
     return dcc.send_bytes(pdf_bytes, "report.pdf")
 
 
-@app.callback(
-    Output({'type': 'chart-form', 'tab': MATCH, 'row': MATCH, 'col': MATCH}, 'style'),
-    Output({'type': 'table-form', 'tab': MATCH, 'row': MATCH, 'col': MATCH}, 'style'),
-    Output({'type': 'stat-form', 'tab': MATCH, 'row': MATCH, 'col': MATCH}, 'style'),
+def export_pdf(set_progress, layout, report_key, data) -> bytes:
+    with worker_slot(set_progress):
+        set_progress("Loading data...")
+        df = load_dataframe(data)
+        logging.debug(df)
+        report = load_report(layout, key=report_key)
+        logging.debug(report)
+        set_progress("Rendering the PDF...")
+        return report.pdf(
+            df=df
+        )
+
+
+CARD_SUMMARY = {"node": MATCH}
+
+app.clientside_callback(
+    ClientsideFunction(namespace="summaries", function_name="stream_card_summary"),
+    Output({"type": "card-summary", **CARD_SUMMARY}, "children"),
+    Input({"type": "card-summary-btn", **CARD_SUMMARY}, "n_clicks"),
+    State("dashboard-state", "data"),
+    State("dataset-version", "data"),
+    State("stored-data", "data"),
+    State("summary-stream-route", "data"),
+    prevent_initial_call=True,
+)
 
-    Input({'type': 'show-chart-form', 'tab': MATCH, 'row': MATCH, 'col': MATCH}, 'n_clicks'),
-    Input({'type': 'add-table-btn', 'tab': MATCH, 'row': MATCH, 'col': MATCH}, 'n_clicks'),
-    Input({'type': 'add-stat-btn', 'tab': MATCH, 'row': MATCH, 'col': MATCH}, 'n_clicks'),
+
+@flask_server.route(settings.SUMMARY_STREAM_ROUTE, methods=["POST"])
+def stream_card_summary():
+    """
+    AI summary of a chart card, streamed as plain text as the provider generates it, see
+    assets/summaries.js. The first request of a card may reuse a cached summary, the next
+    ones (``refresh``) generate a new one.
+
+    The card is found by ``node`` in the session state, or posted as ``card`` when the
+    state is kept in the browser. The dataset is the cached ``version``; when this process
+    does not have it, the answer is 409 and the request is sent again with ``data``.
+    """
+    if not current_user.is_authenticated:
+        return Response("Login required", status=401, mimetype="text/plain")
+    body = request.get_json(silent=True) or {}
+    node, state = body.get("node"), body.get("state")
+    if sessions is not None and is_ref(state):
+        card = find_node(sessions.resolve(state), node, "card")
+    else:
+        card = body.get("card")
+    if not isinstance(card, dict) or node is None or card.get("id") != node:
+        return Response(f"Card not found: {node}", status=404, mimetype="text/plain")
+    try:
+        df = frame_of(body.get("version"), body.get("data"))
+    except (KeyError, TypeError, ValueError) as exc:
+        return Response(f"Invalid dataset: {exc}", status=400, mimetype="text/plain")
+    if df is None:
+        return Response("Dataset not cached, send its data", status=409, mimetype="text/plain")
+    chunks = stream_summary(SummaryRequest(
+        key=None,
+        df=df,
+        chart_type=card.get("chart_type"),
+        x=card.get("x_axis"),
+        y1=as_list(card.get("y_axis_1")),
+        y2=as_list(card.get("y_axis_2")),
+        title=card.get("title", ""),
+        refresh=bool(body.get("refresh")),
+    ))
+    # Sent as they come: no buffering by the server or a reverse proxy
+    return Response(
+        chunks, mimetype="text/plain", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace="ui", function_name="toggle_components_form"),
+    Output({'type': 'chart-form', 'node': MATCH}, 'style'),
+    Output({'type': 'table-form', 'node': MATCH}, 'style'),
+    Output({'type': 'stat-form', 'node': MATCH}, 'style'),
+
+    Input({'type': 'show-chart-form', 'node': MATCH}, 'n_clicks'),
+    Input({'type': 'add-table-btn', 'node': MATCH}, 'n_clicks'),
+    Input({'type': 'add-stat-btn', 'node': MATCH}, 'n_clicks'),
 
     prevent_initial_call=True
 )
-def toggle_components_form(chart, table, stat):
-    ctx = dash.callback_context
 
-    if not ctx.triggered:
-        return dash.no_update
 
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    show = {"display": "block"}
-    hide = {"display": "none"}
-    if 'show-chart-form' in trigger_id:
-        chart_style = show
-        table_style = hide
-        stat_style = hide
-    elif 'add-table-btn' in trigger_id:
-        chart_style = hide
-        table_style = show
-        stat_style = hide
-    elif 'add-stat-btn' in trigger_id:
-        chart_style = hide
-        table_style = hide
-        stat_style = show
+@app.callback(
+    Output({'type': 'chart-form', 'node': MATCH}, 'children'),
+    Output({'type': 'table-form', 'node': MATCH}, 'children'),
+    Output({'type': 'stat-form', 'node': MATCH}, 'children'),
+    Input({'type': 'show-chart-form', 'node': MATCH}, 'n_clicks'),
+    Input({'type': 'add-table-btn', 'node': MATCH}, 'n_clicks'),
+    Input({'type': 'add-stat-btn', 'node': MATCH}, 'n_clicks'),
+    State("column-options", "data"),
+    prevent_initial_call=True
+)
+def open_component_form(chart_clicks, table_clicks, stat_clicks, columns):
+    """Build a component form the first time it is opened, later openings only toggle it."""
+    trigger = dash.ctx.triggered_id
+    clicks = {"show-chart-form": chart_clicks, "add-table-btn": table_clicks, "add-stat-btn": stat_clicks}
+    if trigger is None or clicks[trigger["type"]] != 1:
+        raise dash.exceptions.PreventUpdate
+    columns = columns or []
+    forms = [dash.no_update] * 3
+    if trigger["type"] == "show-chart-form":
+        forms[0] = chart_form_body(trigger["node"], columns)
+    elif trigger["type"] == "add-table-btn":
+        forms[1] = table_form_body(trigger["node"], columns)
     else:
-        chart_style = hide
-        table_style = hide
-        stat_style = hide
-    return chart_style, table_style, stat_style
+        forms[2] = stat_form_body(trigger["node"], columns)
+    return forms
+
+
+def session_value(value):
+    """Value of a store, which only holds a session reference when a session store is configured."""
+    return sessions.resolve(value) if sessions is not None else value
+
+
+def load_dataframe(data) -> pd.DataFrame:
+    _, df = datasets.load(session_value(data))
+    return df
+
+
+def frame_of(version, data=None):
+    """
+    Dataset of the ``dataset-version`` store from this process' cache, or loaded from the
+    ``stored-data`` value when one is given. None when it is neither cached nor given.
+    """
+    if version is None:
+        # Nothing uploaded yet
+        return pd.DataFrame([])
+    df = datasets.get(version)
+    if df is None and data is not None:
+        df = load_dataframe(data)
+    return df
+
+
+def tab_window(tab_idx: int, n_tabs: int, radius: int = 0) -> list:
+    """Indices of the tab at ``tab_idx`` and its ``radius`` neighbours on each side."""
+    return [idx for idx in range(tab_idx - radius, tab_idx + radius + 1) if 0 <= idx < n_tabs]
+
+
+def iter_stats(state):
+    """Yield the ``(column, agg)`` of every stat card of the dashboard."""
+    for tab in state.get("tabs", []) if isinstance(state, dict) else []:
+        for row in tab.get("rows", []):
+            for col in row.get("children", []):
+                for card in col.get("children", []):
+                    if isinstance(card, dict) and card.get("component_type") == "stat":
+                        yield card.get("column"), card.get("agg")
+
+
+def prime_kpis(state, df):
+    """Compute all the dashboard KPIs up front, one pass per column."""
+    compute_kpis(df, collect_stat_requests(iter_stats(state)))
+
+
+def tab_ids(state) -> list:
+    return [tab.get("id") for tab in state.get("tabs", [])] if isinstance(state, dict) else []
+
+
+def render_tab_bodies(node_ids, state, data) -> list:
+    """
+    Build the bodies of the tabs ``node_ids`` for a ``{"type": "tab-body", "node": ALL}``
+    output, leaving every other tab body untouched.
+    """
+    tabs = {tab.get("id"): tab for tab in state.get("tabs", [])} if isinstance(state, dict) else {}
+    df = load_dataframe(data)
+    prime_kpis(state, df)
+    search_dict = {}
+    bodies = []
+    for output in dash.ctx.outputs_list[0]:
+        node_id = output["id"]["node"]
+        if node_id in node_ids and node_id in tabs:
+            bodies.append(render_tab_body(tabs[node_id], search_dict, df))
+        else:
+            bodies.append(dash.no_update)
+    return bodies
+
+
+def normalized_state(state) -> tuple:
+    """
+    Layout of the ``dashboard-state`` store, with ids and titles given to the nodes of a
+    layout saved without them, and the store value to write back for it (``no_update``
+    when nothing was missing).
+    """
+    tree = DashboardTree(copy.deepcopy(session_value(state)))
+    layout = tree.normalize()
+    if not tree.assigned:
+        return layout, dash.no_update
+    if sessions is None:
+        return layout, layout
+    try:
+        return layout, sessions.save(layout, state)
+    except VersionConflict:
+        # Written by another request meanwhile, normalized on the next render
+        return layout, dash.no_update
 
 
 @app.callback(
     Output("tabs-container", "children"),
-    Input("dashboard-state", "data"),
-    State("stored-data", "data")
+    Output("rendered-tabs", "data"),
+    Output("tab-prefetch", "disabled"),
+    Output("dashboard-state", "data", allow_duplicate=True),
+    Input("dashboard-render", "data"),
+    State("dashboard-state", "data"),
+    State("stored-data", "data"),
+    State("active-tab", "data"),
+    prevent_initial_call="initial_duplicate",
 )
-def render_tabs(state, data):
+def render_tabs(_, state, data, active_tab):
+    """
+    Render the whole dashboard: on page load, and when ``dashboard-render`` changes (a
+    dashboard upload, a session conflict). Builder actions edit the rendered layout in
+    place instead of rendering it again, see ``edit_dashboard``.
+    """
     logging.debug("Rendering Tabs")
-    logging.debug(f"{data=}")
-    tabs_children = state.get("tabs", []) if isinstance(state, dict) else state
-    if data is not None:
-        data_js = json.loads(data)
-        df = pd.DataFrame(**data_js)
-    else:
-        df = pd.DataFrame([])
-
-    if not state['tabs']:
-        return html.Div("No tabs yet.")
+    layout, state = normalized_state(state)
+    tabs_children = layout["tabs"]
+    no_tabs = html.Div("No tabs yet.", id="no-tabs", style=HIDDEN if tabs_children else None)
+
+    # Only the active tab is built now, the rest are placeholders filled on activation
+    ids = tab_ids(layout)
+    active_id = active_tab if active_tab in ids else next(iter(ids), None)
+    df = None
+    if tabs_children:
+        df = load_dataframe(data)
+        prime_kpis(layout, df)
     search_dict = {}
-    return dbc.Tabs(
+    tabs = dbc.Tabs(
+        id="dashboard-tabs",
+        active_tab=active_id,
         children=[
             render_tab(
-                tab, idx, search_dict, df
-            ) for idx, tab in enumerate(tabs_children)
+                tab, search_dict, df, lazy=tab["id"] != active_id
+            ) for tab in tabs_children
         ],
 
     )
+    return [no_tabs, tabs], [active_id] if active_id else [], not settings.TAB_PREFETCH, state
+
+
+@app.callback(
+    Output({"type": "tab-body", "node": ALL}, "children"),
+    Output("rendered-tabs", "data", allow_duplicate=True),
+    Output("active-tab", "data"),
+    Output("tab-prefetch", "disabled", allow_duplicate=True),
+    Input("dashboard-tabs", "active_tab"),
+    State("rendered-tabs", "data"),
+    State("dashboard-state", "data"),
+    State("stored-data", "data"),
+    prevent_initial_call=True
+)
+def render_active_tab(active_tab, rendered, state, data):
+    if active_tab is None:
+        raise dash.exceptions.PreventUpdate
+    rendered = rendered or []
+    if active_tab in rendered:
+        bodies = [dash.no_update] * len(dash.ctx.outputs_list[0])
+    else:
+        bodies = render_tab_bodies([active_tab], session_value(state), data)
+        rendered = rendered + [active_tab]
+    return bodies, rendered, active_tab, not settings.TAB_PREFETCH
+
+
+@app.callback(
+    Output({"type": "tab-body", "node": ALL}, "children", allow_duplicate=True),
+    Output("rendered-tabs", "data", allow_duplicate=True),
+    Output("tab-prefetch", "disabled", allow_duplicate=True),
+    Input("tab-prefetch", "n_intervals"),
+    State("active-tab", "data"),
+    State("rendered-tabs", "data"),
+    State("dashboard-state", "data"),
+    State("stored-data", "data"),
+    prevent_initial_call=True
+)
+def prefetch_tabs(_, active_tab, rendered, state, data):
+    """Build the neighbours of the active tab once it has been painted."""
+    rendered = rendered or []
+    state = session_value(state)
+    ids = tab_ids(state)
+    position = ids.index(active_tab) if active_tab in ids else 0
+    pending = [
+        ids[idx] for idx in tab_window(position, len(ids), settings.TAB_PREFETCH)
+        if ids[idx] not in rendered
+    ]
+    if not pending:
+        return [dash.no_update] * len(dash.ctx.outputs_list[0]), dash.no_update, True
+    return render_tab_bodies(pending, state, data), rendered + pending, True
+
+
+# The dataset of a callback: from this process' cache, or from the session store
+DATA_STATE = [State("dataset-version", "data")] + ([State("stored-data", "data")] if sessions is not None else [])
+
+
+@app.callback(
+    Output({"type": "row-slot", "node": MATCH}, "children"),
+    Input({"type": "row-placeholder", "node": MATCH}, "n_clicks"),
+    State({"type": "row-spec", "node": MATCH}, "data"),
+    *DATA_STATE,
+    prevent_initial_call=True
+)
+def render_row_slot(n_clicks, row, version, data=None):
+    """
+    Build a row left out of the ``ROW_WINDOW`` once it is scrolled into view, from the row
+    rendered with its placeholder and the dataset cached server side.
+    """
+    if not n_clicks or not isinstance(row, dict):
+        raise dash.exceptions.PreventUpdate
+    df = frame_of(version, data)
+    if df is None:
+        # Not cached by this process: rendered again with the stored data
+        dash.set_props("dashboard-render", {"data": new_id()})
+        return dash.no_update
+    return render_row(row, {}, df)
 
 
 # ---------- Render Tab Content ----------
@@ -1118,10 +1439,16 @@ def render_tabs(state, data):
 def render_tab_content(tab_id, state, json_data):
     if tab_id is None or json_data is None:
         return html.Div("Upload CSV and add a tab to start.")
-    df = pd.read_json(json_data, orient="split")
+    df = load_dataframe(json_data)
+    state = session_value(state)
     tab_state = next((t for t in state['tabs'] if t['id'] == tab_id), None)
     if tab_state is None:
         return html.Div("Tab not found.")
+    compute_kpis(df, collect_stat_requests(
+        (comp.get("column"), comp.get("agg"))
+        for row in tab_state["rows"] for col in row["columns"] for comp in col.get("components", [])
+        if comp["type"] == "stat"
+    ))
 
     content = []
     for r_idx, row in enumerate(tab_state["rows"]):
@@ -1133,18 +1460,18 @@ def render_tab_content(tab_id, state, json_data):
                     fig = px.scatter(df, x=comp["x"], y=comp["y"]) if comp.get("x") and comp.get("y") else px.scatter()
                     comp_children.append(dcc.Graph(figure=fig))
                 elif comp["type"] == "table":
-                    comp_children.append(dash_table.DataTable(
-                        columns=[{"name": c, "id": c} for c in df.columns],
-                        data=df.to_dict("records"),
-                        page_size=10,
-                        style_table={'overflowX': 'auto'},
-                        style_cell={'textAlign': 'center'}
+                    comp_children.append(render_table(
+                        table_id={"type": "data-table",
+                                  "node": comp.get("id") or f"{tab_id}-{r_idx}-{c_idx}-{len(comp_children)}"},
+                        df=df,
+                        columns=comp.get("columns"),
+                        page_size=settings.TABLE_PAGE_SIZE
                     ))
                 elif comp["type"] == "stat":
                     col_name = comp.get("column")
                     agg = comp.get("agg")
                     if col_name and agg:
-                        value = getattr(df[col_name], agg)()
+                        value = stat_value(df, col_name, agg)
                         comp_children.append(
                             html.Div(f"{agg.upper()} of {col_name}: {value}", style={"fontWeight": "bold"}))
             columns.append(dbc.Col(comp_children, width=12 // max(1, len(row["columns"]))))
@@ -1152,6 +1479,37 @@ def render_tab_content(tab_id, state, json_data):
     return content
 
 
+# ---------- Table pages ----------
+@app.callback(
+    Output({"type": "data-table", "node": MATCH}, "data"),
+    Output({"type": "data-table", "node": MATCH}, "page_count"),
+    Input({"type": "data-table", "node": MATCH}, "page_current"),
+    Input({"type": "data-table", "node": MATCH}, "page_size"),
+    Input({"type": "data-table", "node": MATCH}, "sort_by"),
+    Input({"type": "data-table", "node": MATCH}, "filter_query"),
+    State({"type": "data-table", "node": MATCH}, "columns"),
+    *DATA_STATE,
+    prevent_initial_call=True
+)
+def update_table_page(page_current, page_size, sort_by, filter_query, columns, version, data=None):
+    if datasets.get(version) is None:
+        # Not parsed by this process (restart, another worker)
+        if data is None:
+            # The dataset stays in the browser: rendered again with the stored data
+            dash.set_props("dashboard-render", {"data": new_id()})
+            return dash.no_update, dash.no_update
+        # Cached again from the session store
+        version, _ = datasets.load(session_value(data))
+    return table_page(
+        version,
+        page_current=page_current,
+        page_size=page_size or settings.TABLE_PAGE_SIZE,
+        sort_by=sort_by,
+        filter_query=filter_query,
+        columns=[c["id"] for c in columns or []],
+    )
+
+
 # ---------- Save Dashboard JSON ----------
 @app.callback(
     Output("download-dashboard-json", "data"),
@@ -1160,212 +1518,242 @@ def render_tab_content(tab_id, state, json_data):
     prevent_initial_call=True
 )
 def download_dashboard(n_clicks, state):
-    return dict(content=json.dumps(state, indent=2), filename="dashboard.json")
+    state = session_value(state)
+    return dict(content=codec.dumps(state, indent=True), filename="dashboard.json")
+
+
+# Builder actions: one callback each, turning a click into an edit of the node the
+# clicked component was rendered for (see dashboard/state.py). MATCH inputs only send
+# the component that was clicked, and the rendered dashboard is updated in place with
+# ``set_props``, so requests and responses do not grow with the dashboard.
+#
+# Without a session store the edit is written to ``dashboard-edit`` and applied to the
+# browser state by ``dashboard.apply_edit`` (assets/dashboard.js). With one, callbacks
+# also get the session reference held by the browser and apply the edit server side.
+SESSION_STATE = [State("dashboard-state", "data")] if sessions is not None else []
+EDIT_OUTPUT = (
+    Output("dashboard-state", "data", allow_duplicate=True) if sessions is not None
+    else Output("dashboard-edit", "data", allow_duplicate=True)
+)
+
+if sessions is None:
+    app.clientside_callback(
+        ClientsideFunction(namespace="dashboard", function_name="apply_edit"),
+        Output("dashboard-state", "data", allow_duplicate=True),
+        Output("dashboard-render", "data", allow_duplicate=True),
+        Input("dashboard-edit", "data"),
+        State("dashboard-state", "data"),
+        prevent_initial_call=True
+    )
+
+
+def edit_dashboard(edit: dict, state=None, render=None):
+    """
+    Apply ``edit`` to the dashboard and update the rendered layout with the
+    ``(component id, props)`` pairs of ``render(node)``, node being the node added or
+    removed. Updates of components that are gone are ignored by the browser.
+
+    Without a session store the edit is returned for ``dashboard.apply_edit``, which
+    drops it when its target is gone. With one it is applied to the session state: an
+    edit whose target is gone is ignored, and an outdated reference gets the current one
+    and a full render. ``edit["render"]`` asks for a full render once it is applied.
+    """
+    if not dash.ctx.triggered[0].get("value"):
+        # Buttons rendered with n_clicks=None
+        raise dash.exceptions.PreventUpdate
+    if sessions is None:
+        # Two removals of the same node are two edits
+        result, node = {**edit, "id": new_id()}, edit["node"]
+    else:
+        applied = []
+        try:
+            result = sessions.update(state, lambda layout: applied.append(DashboardTree(layout).apply(edit)))
+        except KeyError as exc:
+            logging.info(f"Dashboard action {dash.ctx.triggered_id} ignored: {exc}")
+            raise dash.exceptions.PreventUpdate
+        except VersionConflict as exc:
+            logging.warning(f"Dashboard action {dash.ctx.triggered_id} ignored: {exc}")
+            if not exc.current:
+                # The session expired: its layout is gone, keep the one on screen
+                dash.set_props("dashboard-alert", {"children": session_expired_alert()})
+                return dash.no_update
+            dash.set_props("dashboard-render", {"data": new_id()})
+            return {"session": exc.key, "version": exc.current}
+        node = applied[0]
+        if edit.get("render"):
+            dash.set_props("dashboard-render", {"data": new_id()})
+    for component_id, props in render(node) if render else []:
+        dash.set_props(component_id, props)
+    return result
+
+
+def session_expired_alert() -> dbc.Alert:
+    return dbc.Alert(
+        "Your session expired and this change was not saved. "
+        "Upload a saved dashboard JSON to keep editing it.",
+        color="warning",
+        dismissable=True,
+    )
+
+
+def appended(child) -> dict:
+    """Props appending ``child`` to the children of a component."""
+    children = dash.Patch()
+    children.append(child)
+    return {"children": children}
 
 
 @app.callback(
-    Output("dashboard-state", "data"),
+    EDIT_OUTPUT,
     Input("add-tab-btn", "n_clicks"),
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def add_tab(n_clicks, state=None):
+    return edit_dashboard(add_edit("tab", None, empty_tab()), state, lambda tab: [
+        ("dashboard-tabs", appended(render_tab(tab, {}, None))),
+        ("no-tabs", {"style": HIDDEN}),
+    ])
+
+
+@app.callback(
+    Output("dashboard-state", "data", allow_duplicate=True),
+    Output("dashboard-render", "data", allow_duplicate=True),
     Input("upload-dashboard-json", "contents"),
-    Input({'type': 'add-row-btn', 'tab': ALL}, 'n_clicks'),
-    Input({'type': 'add-col-btn', 'tab': ALL, 'row': ALL}, 'n_clicks'),
-    Input({'type': 'remove-col-btn', 'tab': ALL, "row": ALL, "col": ALL}, 'n_clicks'),
-    Input({'type': 'remove-row-btn', 'tab': ALL, "row": ALL, }, 'n_clicks'),
-    Input({'type': 'remove-tab-btn', 'tab': ALL}, 'n_clicks'),
-    Input({'type': 'add-component-btn', 'tab': ALL, 'row': ALL, 'col': ALL}, 'n_clicks'),
-
-    Input({'type': 'add-chart-btn', 'tab': ALL, 'row': ALL, 'col': ALL}, 'n_clicks'),
-    Input({'type': 'x-axis-dropdown', 'tab': ALL, 'row': ALL, 'col': ALL}, 'value'),
-    Input({'type': 'y-axis-1-dropdown', 'tab': ALL, 'row': ALL, 'col': ALL}, 'value'),
-    Input({'type': 'y-axis-2-dropdown', 'tab': ALL, 'row': ALL, 'col': ALL}, 'value'),
-    Input({'type': 'chart-type-dropdown', 'tab': ALL, 'row': ALL, 'col': ALL}, 'value'),
+    prevent_initial_call=True
+)
+def upload_dashboard(json_contents):
+    if json_contents is None:
+        raise dash.exceptions.PreventUpdate
+    content_type, content_string = json_contents.split(',')
+    decoded = base64.b64decode(content_string)
+    loaded_state = DashboardTree(codec.loads(decoded)).normalize()
+    return loaded_state if sessions is None else sessions.save(loaded_state), new_id()
 
-    State("dashboard-state", "data"),
-    State("upload-dashboard-json", "filename"),
-    State({'type': 'component-dropdown', 'tab': ALL, 'row': ALL, 'col': ALL}, 'value'),
 
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'add-row-btn', 'node': MATCH}, 'n_clicks'),
+    *SESSION_STATE,
     prevent_initial_call=True
 )
-def update_dashboard_state(
-        add_tab_clicks,
-        json_contents,
-        add_row_clicks,
-        add_col_clicks,
-        remove_col_clicks,
-        remove_row_clicks,
-        remove_tab_clicks,
-        add_comp_clicks,
-        add_chart_btn, x_axis, y_axis_1, y_axis_2, chart_type,
-        state,
-        filename,
-        dropdown_values
-):
-    tabs = state.get('tabs', [])
+def add_row(n_clicks, state=None):
+    tab_id = dash.ctx.triggered_id["node"]
+    return edit_dashboard(add_edit("row", tab_id, empty_row()), state, lambda row: [
+        ({"type": "tab-rows", "node": tab_id}, appended(render_row_box(row, {}, None))),
+    ])
 
-    ctx = dash.callback_context
 
-    if not ctx.triggered:
-        return dash.no_update
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'add-col-btn', 'node': MATCH}, 'n_clicks'),
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def add_col(n_clicks, state=None):
+    row_id = dash.ctx.triggered_id["node"]
+    return edit_dashboard(add_edit("col", row_id, empty_col()), state, lambda col: [
+        ({"type": "row-cols", "node": row_id}, appended(render_col(col, {}, None))),
+    ])
 
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    logging.debug(trigger_id)
-    # Initialize state if None
-    if state is None:
-        state = {"tabs": []}
-
-    # Case 1: Add Tab button clicked
-    if trigger_id == "add-tab-btn":
-        import uuid
-        new_tab = {"id": str(uuid.uuid4()), "title": f"Tab {len(state['tabs']) + 1}", "rows": []}
-        state['tabs'].append(new_tab)
-        return state
-
-    if "remove-tab-btn" in trigger_id:
-        logging.debug(f'{remove_tab_clicks=}')
-        for tab_idx, tab in enumerate(tabs):
-            if tab_idx < len(remove_tab_clicks) and remove_tab_clicks[
-                tab_idx] and remove_tab_clicks[
-                tab_idx] > 0 and f'remove-tab-btn' in trigger_id and f'"tab":{tab_idx}' in trigger_id:
-                tabs.pop(tab_idx)
-                state['tabs'] = tabs
-                return state
-
-
-    # Case 2: Dashboard JSON uploaded
-    elif trigger_id == "upload-dashboard-json" and json_contents is not None:
-        import base64, json
-        content_type, content_string = json_contents.split(',')
-        decoded = base64.b64decode(content_string)
-        loaded_state = json.loads(decoded.decode("utf-8"))
-        return loaded_state
-
-    if "add-row-btn" in trigger_id:
-        for tab_idx, n in enumerate(add_row_clicks):
-            if n and n > 0 and f"add-row-btn" in trigger_id and f'"tab":{tab_idx}' in trigger_id:
-                tabs[tab_idx]["rows"].extend([
-                    empty_row(
-                        idx=len(tabs[tab_idx]["rows"]),
-                        tab_idx=tab_idx
-                    ),
-                ]
-                )
-                state['tabs'] = tabs
-                return state
-    if "remove-row-btn" in trigger_id:
-        for tab_idx, tab in enumerate(tabs):
-            for row_idx, row in enumerate(tab['rows']):
-                if row_idx < len(remove_row_clicks) and remove_row_clicks[
-                    row_idx] and remove_row_clicks[
-                    row_idx] > 0 and f'remove-row-btn' in trigger_id and f'"tab":{tab_idx}' in trigger_id and f'"row":{row_idx}' in trigger_id:
-                    tab['rows'].pop(row_idx)
-                    state['tabs'] = tabs
-                    return state
-
-    if 'add-col-btn' in trigger_id:
-        idx = 0
-        for tab_idx, tab in enumerate(tabs):
-            for row_idx, row in enumerate(tab['rows']):
-                logging.debug(row)
-                if idx < len(add_col_clicks) and add_col_clicks[idx] and add_col_clicks[
-                    idx] > 0 and f'add-col-btn' in trigger_id and f'"tab":{tab_idx}' in trigger_id and f'"row":{row_idx}' in trigger_id:
-                    row['children'].append(
-                        empty_col(
-                            idx=len(row['children']),
-                            tab_idx=tab_idx,
-                            row_idx=row_idx
-
-                        )
-                    )
-                    state['tabs'] = tabs
-                    return state
-                idx += 1
-
-    if 'remove-col-btn' in trigger_id:
-        logging.debug(f'{remove_col_clicks=}')
-        idx = 0
-        for tab_idx, tab in enumerate(tabs):
-            for row_idx, row in enumerate(tab["rows"]):
-                for col_idx, col in enumerate(row['children']):
-                    if idx < len(remove_col_clicks) and remove_col_clicks[idx] and remove_col_clicks[
-                        idx] > 0 and f'remove-col-btn' in trigger_id and f'"tab":{tab_idx}' in trigger_id and f'"row":{row_idx}' in trigger_id and f'"col":{col_idx}' in trigger_id:
-                        row['children'].pop(col_idx)
-                        state['tabs'] = tabs
-                        return state
-                    idx += 1
-
-    if "add-chart-btn" in trigger_id:
-        logging.debug("ADDING CHART")
-        idx = 0
-        logging.debug(f"{idx=}")
-
-        for tab_idx, tab in enumerate(tabs):
-
-            logging.debug("PROCESSING TAB", tab_idx)
-            for row_idx, row in enumerate(tab['rows']):
-                logging.debug(" PROCESSING ROW", row_idx)
-                for col_idx, col in enumerate(row['children']):
-                    logging.debug(" PROCESSING COL", col_idx)
-                    if (
-                            # idx < len(add_chart_btn)  and
-                            add_chart_btn[idx] and
-                            add_chart_btn[idx] > 0
-                            and f'"tab":{tab_idx}' in trigger_id
-                            and f'"row":{row_idx}' in trigger_id
-                            and f'"col":{col_idx}' in trigger_id
-                    ):
-                        logging.debug("WILL ADD CHILDREN CARD TO COL")
-                        col['children'].append(
-                            {
-                                'type': 'card',
-                                "component_type": "chart",
-                                "chart_type": chart_type[idx],
-                                "x_axis": x_axis[idx],
-                                "y_axis_1": y_axis_1[idx],
-                                "y_axis_2": y_axis_2[idx],
-                            }
-                        )
-                        state['tabs'] = tabs
-                        return state
-                    idx += 1
-    if 'add-component-btn' in trigger_id:
-        logging.debug(f'{add_comp_clicks=}')
-        idx = 0
-        for tab_idx, tab in enumerate(tabs):
-            logging.debug("PROCESSING TAB", tab_idx)
-            for row_idx, row in enumerate(tab['ROWS']):
-                logging.debug(" PROCESSING ROW", row_idx)
-                for col_idx, col in enumerate(row['children']):
-
-                    if (
-                            idx < len(add_comp_clicks)
-                            and add_comp_clicks[idx]
-                            and add_comp_clicks[idx] > 0
-                            and f'add-component-btn' in trigger_id
-                            and f'"tab":{tab_idx}' in trigger_id
-                            and f'"row":{row_idx}' in trigger_id
-                            and f'"col":{col_idx}' in trigger_id
-                    ):
-                        logging.debug(f'{dropdown_values=}')
-                        comp_type = dropdown_values[idx] if dropdown_values and idx < len(dropdown_values) else None
-                        logging.debug(f'{comp_type=}')
-                        logging.debug(f'{components.get(comp_type, {})=}')
-                        if comp_type:
-                            col['children'].append(
-                                {
-                                    'type': 'card',
-                                    **components.get(comp_type, {})
-                                }
-                            )
-                            state['tabs'] = tabs
-                            return state
-                    idx += 1
 
-    return dash.no_update
+def remove_node(kind: str, box_type: str, state=None):
+    """Remove the node of the triggering button, and empty and hide the box it was rendered in."""
+    node_id = dash.ctx.triggered_id["node"]
+    return edit_dashboard(remove_edit(kind, node_id), state, lambda node: [
+        ({"type": box_type, "node": node_id}, {"children": None, "style": HIDDEN}),
+    ])
+
+
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'remove-tab-btn', 'node': MATCH}, 'n_clicks'),
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def remove_tab(n_clicks, state=None):
+    node_id = dash.ctx.triggered_id["node"]
+    return edit_dashboard(remove_edit("tab", node_id), state, lambda tab: [
+        ({"type": "tab", "node": node_id}, {"children": None, "tab_style": HIDDEN}),
+    ])
+
+
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'remove-row-btn', 'node': MATCH}, 'n_clicks'),
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def remove_row(n_clicks, state=None):
+    return remove_node("row", "row-box", state)
+
+
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'remove-col-btn', 'node': MATCH}, 'n_clicks'),
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def remove_col(n_clicks, state=None):
+    return remove_node("col", "col-box", state)
+
+
+def add_card(card: dict, version, state=None, data=None):
+    """Add ``card`` to the column of the triggering button and render it there."""
+    col_id = dash.ctx.triggered_id["node"]
+    edit = add_edit("card", col_id, {"id": new_id(), "type": "card", **card})
+    df = frame_of(version, data)
+    if df is None:
+        # Dataset not cached by this process: the card is built by a full render
+        edit["render"] = True
+        return edit_dashboard(edit, state)
+    return edit_dashboard(edit, state, lambda node: [
+        ({"type": "col-card", "node": col_id}, {"children": render_card(node, {}, df)}),
+        ({"type": "add-component-row", "node": col_id}, {"style": HIDDEN}),
+    ])
+
+
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'add-chart-btn', 'node': MATCH}, 'n_clicks'),
+    State({'type': 'chart-type-dropdown', 'node': MATCH}, 'value'),
+    State({'type': 'x-axis-dropdown', 'node': MATCH}, 'value'),
+    State({'type': 'y-axis-1-dropdown', 'node': MATCH}, 'value'),
+    State({'type': 'y-axis-2-dropdown', 'node': MATCH}, 'value'),
+    *DATA_STATE,
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def add_chart(n_clicks, chart_type, x_axis, y_axis_1, y_axis_2, version, data=None, state=None):
+    card = {
+        "component_type": "chart",
+        "chart_type": chart_type,
+        "x_axis": x_axis,
+        "y_axis_1": y_axis_1,
+        "y_axis_2": y_axis_2,
+    }
+    return add_card(card, version, state, data)
+
+
+@app.callback(
+    EDIT_OUTPUT,
+    Input({'type': 'add-component-btn', 'node': MATCH}, 'n_clicks'),
+    State({'type': 'component-dropdown', 'node': MATCH}, 'value'),
+    *DATA_STATE,
+    *SESSION_STATE,
+    prevent_initial_call=True
+)
+def add_component(n_clicks, comp_type, version, data=None, state=None):
+    if not comp_type:
+        raise dash.exceptions.PreventUpdate
+    return add_card(components.get(comp_type, {}), version, state, data)
 
 
 # ----------------------------
 # Run Dash
 # ----------------------------
 if __name__ == "__main__":
+    if settings.CALLBACK_AUDIT:
+        log_audit(app)
     flask_server.run(debug=True, port=8050)
 
@@ -1,4 +1,7 @@
 import base64
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 
 from pydantic import BaseModel, Field
@@ -12,6 +15,13 @@ from io import BytesIO
 from playwright.sync_api import sync_playwright
 import logging
 
+from config import settings
+from dashboard import background, codec
+from dashboard.datasets import datasets
+from dashboard.kpis import DEFAULT_AGG, collect_stat_requests, compute_kpis, stat_value, format_stat
+from dashboard.singleflight import flights
+from dashboard.summaries import BatchRequest, SummaryRequest, run_summaries, summarize
+
 
 default_css_files = [
     Path()  / "static" / "css" / "report.css"
@@ -169,37 +179,68 @@ class Component(BaseModel):
     class_name: str = Field(default="card", description="CSS class name for the card")
     footer: Optional[str] = Field(default=None, description="Footer text for the card")
     title: Optional[str] = Field(default=None, description="Footer text for the card")
+    column: Optional[str] = Field(default=None, description="Column of a stat component")
+    agg: Optional[str] = Field(default=None, description="Aggregation of a stat component")
+
+    def flight_key(self, df: pd.DataFrame):
+        """Identifies the chart of this component on a cached dataset, None for other components."""
+        version = datasets.version_of(df)
+        if version is None or self.component_type != "chart":
+            return None
+        return version, self.component_type, self.chart_type, self.x_axis, self.y_axis_1, self.y_axis_2
+
+    def summary_key(self) -> tuple:
+        return self.chart_type, self.x_axis, self.y_axis_1, self.y_axis_2
+
+    def summary_request(self, df: pd.DataFrame, refresh: bool = False) -> SummaryRequest:
+        return SummaryRequest(
+            key=self.summary_key(),
+            df=df,
+            chart_type=self.chart_type,
+            x=self.x_axis,
+            y1=[self.y_axis_1],
+            y2=[self.y_axis_2] if self.y_axis_2 else [],
+            title="Sample Chart",
+            refresh=refresh,
+            flight_key=self.flight_key(df),
+        )
 
     def html(self, *args, **kwargs):
         df = kwargs.get("df", pd.DataFrame())
         ai_describe = kwargs.get("ai_describe", False)
 
         content = "NO CONTENT"
-        if self.component_type == "chart":
-            content = build_chart(
+        footer = self.footer
+        if self.component_type == "stat":
+            agg = self.agg or DEFAULT_AGG
+            content = f"""
+                <div class="stat">
+                    <div class="stat-value">{format_stat(stat_value(df, self.column, agg))}</div>
+                    <div class="stat-label">{agg.upper()} of {self.column}</div>
+                </div>
+            """
+        elif self.component_type == "chart":
+            content = flights.do("chart-image", self.flight_key(df), lambda: build_chart(
                 df=df,
                 chart_type=self.chart_type,
                 x=self.x_axis,
                 y1=[self.y_axis_1],
                 y2=[self.y_axis_2] if self.y_axis_2 else [],
                 title="Sample Chart"
-            )
-
-        if ai_describe:
-            described_summary = "Not Available"
-            try:
-                from llm import summarize_chart
-                described_summary = summarize_chart(
-                    df=df,
-                    chart_type=self.chart_type,
-                    x=self.x_axis,
-                    y1=[self.y_axis_1],
-                    y2=[self.y_axis_2] if self.y_axis_2 else [],
-                    title="Sample Chart"
-                )
-            except Exception as e:
-                described_summary = f"Error generating AI summary: {str(e)}"
-            self.footer = self.footer or "" + f"<br><b>AI Summary:</b> {described_summary}"
+            ))
+
+        if ai_describe and self.component_type == "chart":
+            # Gathered and generated concurrently by Report.html, one by one otherwise
+            described_summary = (kwargs.get("summaries") or {}).get(self.summary_key())
+            if described_summary is None:
+                try:
+                    described_summary = summarize(
+                        self.summary_request(df, refresh=kwargs.get("refresh_summaries", False))
+                    )
+                except Exception as e:
+                    described_summary = f"Error generating AI summary: {str(e)}"
+            # Not stored on the component: reports are cached and shared between exports
+            footer = (footer or "") + f"<br><b>AI Summary:</b> {described_summary}"
 
         return f"""
             <div class="{self.class_name}">
@@ -207,7 +248,7 @@ class Component(BaseModel):
                 <div class="card-body">
                     <div class="image-container">{content}</div>
                 </div>
-                {f'<div class="card-footer">{self.footer}</div>' if self.footer else ''}
+                {f'<div class="card-footer">{footer}</div>' if footer else ''}
             </div>
     """
 
@@ -241,14 +282,31 @@ class Row(BaseComponent):
            """
 
 
+def overview(summaries: Optional[dict], key) -> str:
+    """AI overview of a batch of summaries (see dashboard/summaries.py), if there is one."""
+    text = (summaries or {}).get(key)
+    if not text:
+        return ""
+    return f"""<div class="overview"><b>AI Summary:</b> {text}</div>"""
+
+
 class Tab(BaseComponent):
     title: Optional[str] = Field(default="Tab", description="Title of the report")
     class_name: str = Field(default="tab", description="CSS class name for the card")
     children: List[Row] = Field(default_factory=list, alias="rows", description="List of tabs in the report")
 
+    def components(self):
+        for row in self.children:
+            for col in row.children:
+                yield from col.children
+
+    def overview_key(self) -> tuple:
+        return "overview", id(self)
+
     def html(self, *args, **kwargs):
         return f"""<section class="section">
             <h2>{self.title}</h2>
+           {overview(kwargs.get("summaries"), self.overview_key())}
            {super().html(*args, **kwargs)}
            </section>
            """
@@ -259,6 +317,10 @@ class Report(BaseComponent):
     children: List[Tab] = Field(default_factory=list, alias="tabs", description="List of tabs in the report")
     title: Optional[str] = Field(default="Report Title", description="Title of the report")
 
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "Report":
+        return cls(**codec.loads(data))
+
     def front_page(self, *args, **kwargs):
         logo_path = kwargs.get("logo_path")
         if logo_path:
@@ -295,8 +357,58 @@ class Report(BaseComponent):
             </div>
         """
 
+    def components(self):
+        for tab in self.children:
+            yield from tab.components()
+
+    def overview_key(self) -> tuple:
+        return "overview", id(self)
+
+    def summary_requests(self, df: pd.DataFrame, refresh: bool = False) -> list:
+        """
+        Summaries of the report charts: one batch for the report, one per tab, or one request
+        per chart, following ``LLM_BATCH``.
+        """
+        def requests(components) -> list:
+            # Only charts are summarized, and components showing the same chart share their summary
+            return list({
+                request.key: request
+                for request in (
+                    component.summary_request(df, refresh=refresh)
+                    for component in components if component.component_type == "chart"
+                )
+            }.values())
+
+        if settings.LLM_BATCH == "report":
+            batches = [(self.overview_key(), self.title, self.components())]
+        elif settings.LLM_BATCH == "tab":
+            batches = [(tab.overview_key(), tab.title, tab.components()) for tab in self.children]
+        else:
+            return requests(self.components())
+        return [
+            BatchRequest(key=key, df=df, charts=charts, title=title or "", refresh=refresh)
+            for key, title, components in batches
+            if (charts := requests(components))
+        ]
+
     def html(self, *args, **kwargs):
-        return self.front_page() + super().html(*args, **kwargs)
+        df = kwargs.get("df")
+        if df is not None:
+            # Compute every KPI of the report in one pass per column
+            compute_kpis(df, collect_stat_requests(
+                (component.column, component.agg or DEFAULT_AGG)
+                for component in self.components() if component.component_type == "stat"
+            ))
+        if kwargs.get("ai_describe") and "summaries" not in kwargs:
+            # Every summary of the report is requested at once, see dashboard/summaries.py
+            kwargs["summaries"] = run_summaries(self.summary_requests(
+                df if df is not None else pd.DataFrame(), refresh=kwargs.get("refresh_summaries", False)
+            ))
+        return (
+            self.front_page()
+            + overview(kwargs.get("summaries"), self.overview_key())
+            + super().html(*args, **kwargs)
+        )
 
     def pdf(self, *args, **kwargs):
         output_path = kwargs.pop("output_path", None)
@@ -324,15 +436,51 @@ class Report(BaseComponent):
         #     return pdf_io
 
 
+_reports = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def layout_key(layout: dict) -> tuple:
+    return "content", hashlib.blake2b(codec.dumps(layout).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def load_report(layout: dict, key=None) -> Report:
+    """
+    ``Report`` for a dashboard layout, validated once and cached by ``key``. Pass a key
+    that identifies an immutable layout, e.g. a layout id and its version; without one the
+    layout is keyed by a hash of its content.
+    Cached reports are shared, they must not be modified.
+
+    Background jobs each start in a new process, with an empty cache: reports are also
+    kept in the background diskcache when there is one, for ``BACKGROUND_EXPIRE_S``, so
+    that a layout is validated once for the web process and every job.
+    """
+    if key is None:
+        key = layout_key(layout)
+    with _reports_lock:
+        report = _reports.get(key)
+        if report is not None:
+            _reports.move_to_end(key)
+            return report
+    shared_key = ("report", key)
+    report = background.cache.get(shared_key) if background.cache is not None else None
+    if report is None:
+        report = Report(**layout)
+        if background.cache is not None:
+            background.cache.set(shared_key, report, expire=settings.BACKGROUND_EXPIRE_S)
+    with _reports_lock:
+        _reports[key] = report
+        while len(_reports) > settings.REPORT_CACHE_SIZE:
+            _reports.popitem(last=False)
+    return report
+
+
 if __name__ == "__main__":
 
     logo_path = Path() / ".." / "static" / "images" / "logo.png"
     dashboard_sample_path = Path() / ".." / ".." / "samples" / "dashboard_1.json"
     with open(dashboard_sample_path, "r", encoding="utf-8") as f:
-        sample_data = f.read()
-        import json
-
-        report = Report(**json.loads(sample_data))
+        report = Report.from_json(f.read())
 
     df = pd.DataFrame({
         "Name": ["Alice", "Bob", "Charlie", "David"],
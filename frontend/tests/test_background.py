@@ -0,0 +1,86 @@
+import time
+
+import dash
+import pytest
+from dash import Input, Output
+
+from config import settings
+from dashboard import background
+from dashboard.background import background_callback, worker_slot
+
+diskcache = pytest.importorskip("diskcache")
+
+
+def register(monkeypatch, manager, enabled):
+    monkeypatch.setattr(background, "manager", manager)
+    app = dash.Dash(__name__)
+
+    @background_callback(app, Output("out", "children"), Input("in", "value"), enabled=enabled)
+    def callback(set_progress, value):
+        set_progress("working")
+        return value
+
+    return app, callback
+
+
+def test_disabled_callbacks_run_inline(monkeypatch):
+    app, callback = register(monkeypatch, object(), enabled=False)
+    (spec,) = app.callback_map.values()
+    assert not spec.get("background")
+    # No progress output: set_progress is a no-op
+    assert callback.__wrapped__(background.no_progress, 1) == 1
+
+
+def test_without_a_manager_callbacks_run_inline(monkeypatch):
+    app, _ = register(monkeypatch, None, enabled=True)
+    (spec,) = app.callback_map.values()
+    assert not spec.get("background")
+
+
+def test_worker_slot_without_a_cache(monkeypatch):
+    monkeypatch.setattr(background, "cache", None)
+    progress = []
+    with worker_slot(progress.append):
+        pass
+    assert progress == []
+
+
+@pytest.fixture
+def slots(monkeypatch, tmp_path):
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    monkeypatch.setattr(background, "cache", cache)
+    monkeypatch.setattr(background, "SLOT_POLL_S", 0.01)
+    monkeypatch.setattr(settings, "BACKGROUND_WORKERS", 1)
+    monkeypatch.setattr(settings, "BACKGROUND_EXPIRE_S", 60)
+    yield cache
+    cache.close()
+
+
+def test_worker_slots_are_given_back(slots):
+    progress = []
+    with worker_slot(progress.append):
+        assert background.take_slot(["background-jobs:slot:0"], "other") is None
+    assert progress == []
+    with worker_slot(progress.append):
+        pass
+    assert list(slots.iterkeys()) == []
+
+
+def test_slot_of_a_killed_job_expires(slots, monkeypatch):
+    monkeypatch.setattr(settings, "BACKGROUND_EXPIRE_S", 0.2)
+    # A job killed while holding its slot never gives it back
+    assert background.take_slot(["background-jobs:slot:0"], "killed") is not None
+    progress = []
+    start = time.monotonic()
+    with worker_slot(progress.append):
+        assert time.monotonic() - start >= 0.2
+    assert progress == ["Queued, waiting for a free worker..."]
+
+
+def test_expired_lease_is_not_released_twice(slots, monkeypatch):
+    monkeypatch.setattr(settings, "BACKGROUND_EXPIRE_S", 0.1)
+    with worker_slot(lambda text: None):
+        time.sleep(0.2)
+        # Taken by another job once expired: that job keeps it
+        assert background.take_slot(["background-jobs:slot:0"], "next") is not None
+    assert slots.get("background-jobs:slot:0") == "next"
@@ -0,0 +1,78 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dashboard import sessions as sessions_module
+from dashboard.datasets import datasets
+from dashboard.sessions import MemorySessionStore
+from dashboard.state import find_node
+
+pytest.importorskip("dash")
+
+LAYOUT = {"tabs": [{"id": "tab-1", "title": "Tab 1", "rows": [{"id": "row-1", "children": [{"id": "col-1", "children": []}]}]}]}
+
+
+@pytest.fixture(scope="module")
+def app():
+    """``main`` loaded with a session store: the callbacks take the session states."""
+    store = MemorySessionStore()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(sessions_module, "sessions", store)
+        spec = importlib.util.spec_from_file_location("main_sessions", Path(__file__).parents[1] / "main.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+def with_node(component_id, node):
+    try:
+        component_id = json.loads(component_id)
+    except ValueError:
+        return component_id
+    return {key: node if value == ["MATCH"] else value for key, value in component_id.items()}
+
+
+def run_callback(app, trigger: dict, value, states: dict):
+    """POST the callback of ``trigger`` as the browser does, ``states`` by component id."""
+    client = app.flask_server.test_client()
+    node = trigger["node"]
+    dependency = next(
+        dep for dep in client.get("/dash/_dash-dependencies").get_json()
+        if [with_node(i["id"], node) for i in dep["inputs"]] == [trigger]
+    )
+    output_id, prop = dependency["output"].split("@")[0].rsplit(".", 1)
+    body = {
+        "output": dependency["output"],
+        "outputs": {"id": with_node(output_id, node), "property": prop},
+        "inputs": [{"id": trigger, "property": "n_clicks", "value": value}],
+        "state": [
+            {"id": with_node(s["id"], node), "property": s["property"], "value": states.get(s["id"].replace('["MATCH"]', f'"{node}"'))}
+            for s in dependency["state"]
+        ],
+        "changedPropIds": [json.dumps(trigger, separators=(",", ":"), sort_keys=True) + ".n_clicks"],
+    }
+    return client.post("/dash/_dash-update-component", json=body)
+
+
+def test_add_chart_edits_the_session_state(app):
+    store = app.sessions
+    df = pd.DataFrame({"a": [1, 2], "b": [3.0, 4.0]})
+    datasets.put("builder-sessions", df)
+    state = store.save(LAYOUT)
+    chart = '{"node":"col-1","type":"%s"}'
+    response = run_callback(app, {"type": "add-chart-btn", "node": "col-1"}, 1, {
+        chart % "chart-type-dropdown": "bar",
+        chart % "x-axis-dropdown": "a",
+        chart % "y-axis-1-dropdown": ["b"],
+        chart % "y-axis-2-dropdown": [],
+        "dashboard-state": state,
+        "dataset-version": "builder-sessions",
+        "stored-data": store.save(df.to_json(orient="split")),
+    })
+    assert response.status_code == 200
+    new_state = response.get_json()["response"]["dashboard-state"]["data"]
+    (card,) = find_node(store.resolve(new_state), "col-1", "col")["children"]
+    assert (card["chart_type"], card["x_axis"], card["y_axis_1"]) == ("bar", "a", ["b"])
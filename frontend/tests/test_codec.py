@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+
+from dashboard import codec
+from dashboard.codec import CODECS, CodecJSONProvider, get_codec
+
+
+@pytest.fixture(params=sorted(CODECS))
+def json_codec(request):
+    if request.param == "orjson" and codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    return get_codec(request.param)
+
+
+def test_numpy_and_pandas_values(json_codec):
+    value = {
+        "int": np.int64(3),
+        "float": np.float32(1.5),
+        "array": np.arange(3),
+        "series": pd.Series([1, 2]),
+        "timestamp": pd.Timestamp("2024-01-02"),
+        "nat": pd.NaT,
+        "set": {1},
+    }
+    assert json_codec.loads(json_codec.dumps(value)) == {
+        "int": 3,
+        "float": 1.5,
+        "array": [0, 1, 2],
+        "series": [1, 2],
+        "timestamp": "2024-01-02T00:00:00",
+        "nat": None,
+        "set": [1],
+    }
+
+
+def test_compact_and_indented(json_codec):
+    assert json_codec.dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+    assert json_codec.loads(json_codec.dumps({"a": [1, 2]}, indent=True)) == {"a": [1, 2]}
+    assert "\n" in json_codec.dumps({"a": 1}, indent=True)
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_provider_forwards_options():
+    provider = CodecJSONProvider(Flask(__name__))
+    assert provider.dumps({"b": 1, "a": 2}, sort_keys=True) == json.dumps({"a": 2, "b": 1})
+    assert provider.dumps({"a": object()}, default=lambda obj: "custom") == '{"a": "custom"}'
+    # Options do not lose the NumPy support of the codec
+    assert provider.dumps({"a": np.int64(1)}, indent=2) == json.dumps({"a": 1}, indent=2)
+    assert provider.loads('{"a": 1.5}', parse_float=str) == {"a": "1.5"}
+    assert provider.loads(provider.dumps({"a": np.arange(2)})) == {"a": [0, 1]}
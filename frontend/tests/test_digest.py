@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.datasets import DatasetCache
+from dashboard import digest as digest_module
+from dashboard.digest import build_digest, chart_digest, compact, series_digest
+
+
+def test_compact():
+    assert compact(1234.5678) == 1235.0
+    assert compact(np.float32(0.000123456)) == 0.0001235
+    assert compact(float("nan")) is None
+    assert compact(np.int64(7)) == 7
+    assert compact(pd.Timestamp("2024-01-02")) == "2024-01-02T00:00:00"
+    assert compact("label") == "label"
+
+
+def test_series_digest_over_numeric_x():
+    x = pd.Series(np.arange(100, dtype=float))
+    y = pd.Series(2 * np.arange(100, dtype=float))
+    digest = series_digest(y, x, points=10)
+    assert digest["count"] == 100
+    assert len(digest["series"]) == 10
+    assert digest["trend"] == {"slope": 2.0, "per": "x unit", "change_over_range": 198.0}
+    assert digest["min"] == {"value": 0.0, "at": 0.0}
+    assert digest["max"] == {"value": 198.0, "at": 99.0}
+    assert digest["quantiles"]["p50"] == 99.0
+    assert "outliers" not in digest
+
+
+def test_series_digest_keeps_the_top_categories():
+    x = pd.Series(["a"] * 5 + ["b"] * 3 + ["c"])
+    y = pd.Series([1.0] * 5 + [2.0] * 3 + [100.0])
+    digest = series_digest(y, x, points=2)
+    assert digest["series"] == [["a", 1.0], ["b", 2.0]]
+    assert digest["trend"]["per"] == "row"
+    assert digest["outliers"] == {"count": 1, "most_extreme": [["c", 100.0]]}
+
+
+def test_series_digest_over_dates_and_rows():
+    x = pd.Series(pd.date_range("2024-01-01", periods=10, freq="D"))
+    y = pd.Series(np.arange(10, dtype=float))
+    digest = series_digest(y, x, points=5)
+    assert digest["trend"]["per"] == "day"
+    assert digest["trend"]["slope"] == 1.0
+    assert digest["series"][0][0] == "2024-01-01T00:00:00"
+    # Without X: consecutive blocks of rows
+    assert len(series_digest(y, points=5)["series"]) == 5
+
+
+def test_series_digest_skips_missing_values():
+    digest = series_digest(pd.Series([1.0, None, "x", 3.0]), pd.Series([1, 2, 3, None]))
+    assert digest["count"] == 1
+    assert series_digest(pd.Series([None, None])) == {"count": 0}
+
+
+def test_chart_digest_keeps_numeric_ys_once():
+    df = pd.DataFrame({"x": [1, 2, 3], "y": [1.0, 2.0, 3.0], "name": ["a", "b", "c"]})
+    digest = chart_digest(df, "x", ["y", "name", "y", "missing"])
+    assert list(digest["y"]) == ["y"]
+    assert digest["x"] == {"name": "x", "kind": "numeric", "distinct": 3, "range": [1, 3]}
+    assert (digest["rows"], digest["columns"]) == (3, 3)
+
+
+def test_chart_digest_is_kept_with_the_dataset(monkeypatch):
+    cache = DatasetCache(max_entries=2)
+    monkeypatch.setattr(digest_module, "datasets", cache)
+    df = pd.DataFrame({"x": [1, 2], "y": [1.0, 2.0]})
+    cache.put("v1", df)
+    calls = []
+    original = digest_module.build_digest
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(digest_module, "build_digest", counting)
+    assert chart_digest(df, "x", ["y"]) == chart_digest(df, "x", ["y"])
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("rows", [10, 10_000])
+def test_digest_size_does_not_grow_with_rows(rows):
+    df = pd.DataFrame({"x": np.arange(rows), "y": np.random.default_rng(0).normal(size=rows)})
+    digest = build_digest(df, "x", ("y",), points=20)
+    assert len(digest["y"]["y"]["series"]) <= 20
@@ -0,0 +1,62 @@
+import pandas as pd
+import pytest
+
+from dashboard.datasets import DatasetCache
+from dashboard.kpis import collect_stat_requests, column_stats, compute_kpis, format_stat, stat_value
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"price": [1.0, 2.0, 2.0, None, 5.0], "name": ["a", "b", "b", None, "c"]})
+
+
+def test_collect_stat_requests_defaults_to_sum():
+    requests = collect_stat_requests([("price", "Mean"), ("price", None), ("name", "count"), (None, "sum")])
+    assert requests == {"price": {"mean", "sum"}, "name": {"count"}}
+
+
+def test_column_stats_numeric(df):
+    stats = column_stats(df["price"], {"sum", "mean", "median", "p50", "nunique", "max"})
+    assert stats["count"] == 4
+    assert stats["sum"] == 10.0
+    assert stats["mean"] == 2.5
+    assert stats["median"] == stats["p50"] == 2.0
+    assert stats["nunique"] == 3
+    assert stats["max"] == 5.0
+
+
+def test_column_stats_text(df):
+    stats = column_stats(df["name"], {"count", "nunique", "max", "sum"})
+    assert stats["count"] == 4
+    assert stats["nunique"] == 3
+    assert stats["max"] == "c"
+
+
+def test_other_pandas_aggregations(df):
+    assert stat_value(df, "price", "std") == pytest.approx(df["price"].std())
+    assert stat_value(df, "price", "var") == pytest.approx(df["price"].var())
+    # Not a reduction
+    assert stat_value(df, "price", "abs") is None
+    assert stat_value(df, "price", "no_such_agg") is None
+
+
+def test_compute_kpis_returns_a_copy_of_the_cache(df, monkeypatch):
+    cache = DatasetCache()
+    cache.put("v1", df)
+    monkeypatch.setattr("dashboard.kpis.datasets", cache)
+
+    first = compute_kpis(df, {"price": {"sum"}})
+    first["price"]["sum"] = -1
+    second = compute_kpis(df, {"price": {"sum", "max"}})["price"]
+    assert (second["sum"], second["max"]) == (10.0, 5.0)
+
+
+def test_compute_kpis_skips_unknown_columns(df):
+    assert compute_kpis(df, {"missing": {"sum"}}) == {}
+
+
+def test_format_stat():
+    assert format_stat(None) == "N/A"
+    assert format_stat(1234.0) == "1,234"
+    assert format_stat(1234.567) == "1,234.57"
+    assert format_stat(42) == "42"
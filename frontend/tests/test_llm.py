@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+import llm
+from dashboard.llm_router import Router
+from llm import parse_batch, summarize_charts
+
+IDS = ["0", "1"]
+
+
+def test_parse_batch():
+    answer = '{"dashboard": " Overview ", "charts": {"0": " First ", "1": "Second"}}'
+    assert parse_batch(answer, IDS) == {"dashboard": "Overview", "charts": {"0": "First", "1": "Second"}}
+
+
+def test_parse_batch_finds_the_object_in_the_text():
+    answer = 'Here you go:\n```json\n{"charts": {"0": "First"}}\n```\nHope it helps.'
+    assert parse_batch(answer, IDS) == {"dashboard": None, "charts": {"0": "First"}}
+
+
+def test_parse_batch_keeps_the_requested_charts_only():
+    answer = '{"dashboard": 3, "charts": {"0": "First", "1": "  ", "2": "Other", "3": null}}'
+    assert parse_batch(answer, IDS) == {"dashboard": None, "charts": {"0": "First"}}
+
+
+@pytest.mark.parametrize("answer", [
+    "Sorry, I cannot do that.",
+    '{"dashboard": "Overview", "charts": {"0": "First"',
+    '{"dashboard": "Overview"}',
+    '{"dashboard": "Overview", "charts": ["First"]}',
+    '{"dashboard": "Overview", "charts": {"5": "Other"}}',
+    "} {",
+])
+def test_parse_batch_rejects_other_answers(answer):
+    assert parse_batch(answer, IDS) is None
+
+
+class Prompts(list):
+    """Prompts sent to the provider, answered by ``answer(prompt)``."""
+    answer = None
+
+    def complete(self, prompt, provider, model, client=None, max_tokens=300):
+        self.append(prompt)
+        return self.answer(prompt)
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    sent = Prompts()
+    monkeypatch.setattr(llm, "complete", sent.complete)
+    monkeypatch.setattr(llm, "llm_cache", None)
+    monkeypatch.setattr(llm, "router", Router(fallback=[], rate_limits={}))
+    return sent
+
+
+CHARTS = [
+    {"id": 0, "chart_type": "bar", "x": "a", "y1": ["b"]},
+    {"id": 1, "chart_type": "line", "x": "a", "y1": ["b"]},
+]
+DF = pd.DataFrame({"a": [1, 2, 3], "b": [4.0, 5.0, 6.0]})
+
+
+def test_summarize_charts_in_one_call(prompts):
+    prompts.answer = lambda prompt: '{"dashboard": "Overview", "charts": {"0": "Bar", "1": "Line"}}'
+    assert summarize_charts(DF, CHARTS) == {"dashboard": "Overview", "charts": {"0": "Bar", "1": "Line"}}
+    assert len(prompts) == 1
+
+
+def test_summarize_charts_completes_missing_charts_one_by_one(prompts):
+    prompts.answer = lambda prompt: (
+        '{"dashboard": "Overview", "charts": {"0": "Bar"}}' if '"charts"' in prompt else "Single"
+    )
+    assert summarize_charts(DF, CHARTS) == {"dashboard": "Overview", "charts": {"0": "Bar", "1": "Single"}}
+    assert len(prompts) == 2
+
+
+def test_summarize_charts_falls_back_when_the_answer_is_not_json(prompts):
+    prompts.answer = lambda prompt: "Not JSON" if '"charts"' in prompt else "Single"
+    assert summarize_charts(DF, CHARTS) == {"dashboard": None, "charts": {"0": "Single", "1": "Single"}}
+    assert len(prompts) == 3
+
+
+class ChatClient:
+    """Chat completions client of OpenAI and Groq, recording the requests."""
+
+    def __init__(self):
+        self.requests = []
+        self.chat = self.completions = self
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = type("Message", (), {"content": "answer"})
+        return type("Response", (), {"choices": [type("Choice", (), {"message": message})]})
+
+
+@pytest.mark.parametrize("provider", ["openai", "groq"])
+def test_complete_limits_the_answer(provider):
+    client = ChatClient()
+    assert llm.complete("prompt", provider, "model", client=client, max_tokens=500) == "answer"
+    assert client.requests[0]["max_tokens"] == 500
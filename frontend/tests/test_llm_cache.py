@@ -0,0 +1,50 @@
+import time
+
+from dashboard.llm_cache import LLMCache, normalize_prompt
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  Summarize\n the   chart ") == "Summarize the chart"
+
+
+def test_answers_are_keyed_by_provider_model_and_prompt(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"))
+    cache.put("openai", "gpt", "Summarize  the chart", "answer")
+    assert cache.get("openai", "gpt", "Summarize the chart") == "answer"
+    assert cache.get("groq", "gpt", "Summarize the chart") is None
+    assert cache.get("openai", "other", "Summarize the chart") is None
+
+
+def test_counters_are_shared_by_the_processes(tmp_path):
+    path = str(tmp_path / "llm.db")
+    cache = LLMCache(path)
+    cache.put("openai", "gpt", "prompt", "answer")
+    cache.get("openai", "gpt", "prompt")
+    # Another worker or background job opening the same database
+    other = LLMCache(path)
+    other.get("openai", "gpt", "prompt")
+    other.get("openai", "gpt", "missing")
+    assert cache.stats() == other.stats() == {"hits": 2, "misses": 1, "entries": 1, "bytes": len("answer")}
+
+
+def test_expired_answers_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"), ttl=60)
+    cache.put("openai", "gpt", "prompt", "answer")
+    conn = cache._connection()
+    with conn:
+        conn.execute("UPDATE llm_answer SET created_at = ?", (time.time() - 120,))
+    assert cache.get("openai", "gpt", "prompt") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_answers_are_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.db"), max_bytes=10)
+    cache.put("p", "m", "first", "12345")
+    time.sleep(0.01)
+    cache.put("p", "m", "second", "12345")
+    time.sleep(0.01)
+    cache.get("p", "m", "first")
+    cache.put("p", "m", "third", "12345")
+    assert cache.get("p", "m", "second") is None
+    assert cache.get("p", "m", "first") == "12345"
+    assert cache.get("p", "m", "third") == "12345"
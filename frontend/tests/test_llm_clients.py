@@ -0,0 +1,42 @@
+import pytest
+
+from config import settings
+from dashboard import llm_clients
+from dashboard.llm_clients import ClientRegistry, create_pooled_client
+
+httpx = pytest.importorskip("httpx")
+
+
+@pytest.fixture(autouse=True)
+def api_keys(monkeypatch):
+    for name in ("OPEN_AI_KEY", "ANTHROPIC_API_KEY", "GROQ_API_KEY"):
+        monkeypatch.setattr(settings, name, "test-key")
+
+
+@pytest.mark.parametrize("provider", ["openai", "groq"])
+def test_clients_share_the_pool(provider):
+    pytest.importorskip(provider)
+    http_client = httpx.Client()
+    client = create_pooled_client(provider, http_client)
+    assert client._client is http_client
+
+
+def test_client_rejecting_the_pool_gets_its_own():
+    pytest.importorskip("anthropic")
+    from anthropic import Anthropic
+    assert isinstance(create_pooled_client("anthropic", httpx.Client()), Anthropic)
+
+
+def test_other_type_errors_are_raised(monkeypatch):
+    def create_client(provider, http_client=None):
+        raise TypeError("unexpected keyword argument 'max_retries'")
+
+    monkeypatch.setattr(llm_clients, "create_client", create_client)
+    with pytest.raises(TypeError):
+        create_pooled_client("openai", httpx.Client())
+
+
+def test_registry_reuses_clients():
+    pytest.importorskip("openai")
+    registry = ClientRegistry()
+    assert registry.get("openai") is registry.get("openai")
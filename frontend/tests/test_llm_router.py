@@ -0,0 +1,201 @@
+import time
+
+import pytest
+
+from config import settings
+from dashboard.llm_router import (
+    CircuitBreaker, LLMUnavailable, Router, SharedCircuitBreaker, SharedTokenBucket, TokenBucket, error_kind,
+)
+
+diskcache = pytest.importorskip("diskcache")
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRIES", 2)
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_S", 0)
+    monkeypatch.setattr(settings, "LLM_RATE_WAIT_S", 0)
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 2)
+    monkeypatch.setattr(settings, "LLM_BREAKER_RESET_S", 60)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=1000, capacity=2)
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire()
+    # Refilled at ``rate`` tokens per second
+    assert bucket.acquire(timeout=0.1)
+
+
+def test_token_bucket_gives_up_after_the_timeout():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    assert bucket.acquire()
+    start = time.monotonic()
+    assert not bucket.acquire(timeout=0.05)
+    assert time.monotonic() - start < 1
+
+
+def test_circuit_breaker_opens_after_failures():
+    breaker = CircuitBreaker(failures=2, reset=60)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open" and not breaker.allow()
+    # After ``reset``: a single trial call
+    breaker.opened_at -= 60
+    assert breaker.state == "half-open"
+    assert breaker.allow() and not breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+
+
+def test_circuit_breaker_trial():
+    breaker = CircuitBreaker(failures=1, reset=0)
+    breaker.failure()
+    assert breaker.allow()
+    # A trial given back can be taken again
+    breaker.release()
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed" and breaker.consecutive == 0
+
+
+@pytest.mark.parametrize("error, kind", [
+    (StatusError(429), "rate_limit"),
+    (RateLimitError(), "rate_limit"),
+    (TimeoutError(), "timeout"),
+    (StatusError(408), "timeout"),
+    (APIConnectionError(), "connection"),
+    (ConnectionResetError(), "connection"),
+    (StatusError(503), "server"),
+    (StatusError(599), "server"),
+    (StatusError(400), "client"),
+    (ValueError(), "client"),
+])
+def test_error_kind(error, kind):
+    assert error_kind(error) == kind
+
+
+def attempts(errors: dict):
+    """``attempt`` raising the next error of its provider in ``errors``, then answering its name."""
+    calls = []
+
+    def attempt(name):
+        calls.append(name)
+        if errors.get(name):
+            raise errors[name].pop(0)
+        return name
+
+    return attempt, calls
+
+
+def test_call_retries_then_answers():
+    router = Router(fallback=["openai"], rate_limits={})
+    attempt, calls = attempts({"groq": [StatusError(503), TimeoutError()]})
+    assert router.call("groq", attempt) == "groq"
+    assert calls == ["groq"] * 3
+
+
+def test_call_falls_back_on_client_errors():
+    router = Router(fallback=["openai", "anthropic"], rate_limits={})
+    attempt, calls = attempts({"groq": [StatusError(400)]})
+    assert router.call("groq", attempt) == "openai"
+    assert calls == ["groq", "openai"]
+
+
+def test_call_raises_when_every_provider_fails():
+    router = Router(fallback=["openai"], rate_limits={})
+    attempt, _ = attempts({"groq": [StatusError(400)], "openai": [StatusError(401)]})
+    with pytest.raises(LLMUnavailable) as info:
+        router.call("groq", attempt)
+    assert isinstance(info.value.__cause__, StatusError)
+
+
+def test_call_skips_open_circuits():
+    router = Router(fallback=["openai"], rate_limits={})
+    for _ in range(2):
+        attempt, _ = attempts({"groq": [StatusError(400)]})
+        router.call("groq", attempt)
+    attempt, calls = attempts({})
+    assert router.call("groq", attempt) == "openai"
+    assert calls == ["openai"]
+    assert 'llm_circuit_open{provider="groq"} 1' in router.render()
+
+
+def test_call_skips_rate_limited_providers():
+    router = Router(fallback=["openai"], rate_limits={"groq": 1})
+    assert router.call("groq", lambda name: name) == "groq"
+    assert router.call("groq", lambda name: name) == "openai"
+    assert 'llm_rejected_total{provider="groq",reason="rate_limited"} 1' in router.render()
+
+
+def test_rate_limited_retry_is_not_a_provider_failure(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 1)
+    router = Router(fallback=["openai"], rate_limits={"groq": 1})
+    attempt, calls = attempts({"groq": [StatusError(503)]})
+    # The retry finds the bucket empty: the call moves on without opening the circuit
+    assert router.call("groq", attempt) == "openai"
+    assert calls == ["groq", "openai"]
+    assert router.breaker("groq").state == "closed"
+
+
+def test_rate_limited_retry_gives_back_the_trial():
+    router = Router(fallback=["openai"], rate_limits={"groq": 1})
+    breaker = router.breaker("groq")
+    breaker.opened_at = time.monotonic() - settings.LLM_BREAKER_RESET_S
+    attempt, _ = attempts({"groq": [StatusError(503)]})
+    assert router.call("groq", attempt) == "openai"
+    assert not breaker.trial
+
+
+def test_shared_token_bucket(cache):
+    # Two processes (background jobs, web workers) drawing on the same bucket
+    first, second = (SharedTokenBucket(cache, "bucket", rate=0.1, capacity=2) for _ in range(2))
+    assert first.acquire() and second.acquire()
+    assert not first.acquire() and not second.acquire()
+
+
+def test_shared_circuit_breaker(cache):
+    first, second = (SharedCircuitBreaker(cache, "breaker", failures=2, reset=60) for _ in range(2))
+    first.failure()
+    second.failure()
+    assert first.state == second.state == "open"
+    assert not second.allow()
+    cache.set("breaker", (2, time.time() - 60, False))
+    # A single trial call between them
+    assert first.allow() and not second.allow()
+    second.success()
+    assert first.state == "closed"
+
+
+def test_routers_sharing_a_cache(cache, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 1)
+    first, second = (Router(fallback=["openai"], rate_limits={"groq": 1}, cache=cache) for _ in range(2))
+    assert first.call("groq", lambda name: name) == "groq"
+    # The token of the minute is spent by the first router
+    assert second.call("groq", lambda name: name) == "openai"
+    attempt, _ = attempts({"openai": [StatusError(400)]})
+    with pytest.raises(LLMUnavailable):
+        first.call("openai", attempt)
+    assert second.breaker("openai").state == "open"
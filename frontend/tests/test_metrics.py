@@ -0,0 +1,74 @@
+import math
+
+import dash
+from dash import MATCH, Input, Output, html
+
+from dashboard.metrics import CallbackMetrics, Summary, instrument, trigger_name
+
+
+def test_summary_quantiles():
+    summary = Summary(window=100)
+    assert all(math.isnan(value) for value in summary.quantiles().values())
+    for value in range(1, 101):
+        summary.observe(value)
+    assert summary.quantiles() == {0.5: 50, 0.95: 95, 0.99: 99}
+    assert (summary.sum, summary.count) == (5050, 100)
+
+
+def test_summary_keeps_a_window():
+    summary = Summary(window=2)
+    for value in (100, 1, 2):
+        summary.observe(value)
+    # The running sum and count cover every sample, the quantiles the window
+    assert summary.quantiles()[0.99] == 2
+    assert (summary.sum, summary.count) == (103, 3)
+
+
+def test_trigger_name():
+    assert trigger_name({}) == "initial"
+    assert trigger_name({"changedPropIds": ["upload-data.contents"]}) == "upload-data.contents"
+    # Pattern ids are reduced to their type
+    body = {
+        "changedPropIds": ['{"node":"0f3c","type":"remove-row-btn"}.n_clicks'],
+        "inputs": [[{"id": {"node": "0f3c", "type": "remove-row-btn"}, "property": "n_clicks", "value": 1}]],
+    }
+    assert trigger_name(body) == "remove-row-btn.n_clicks"
+    assert trigger_name({"changedPropIds": ['{"node":"0f3c"}.n_clicks']}) == "pattern.n_clicks"
+
+
+def test_render_escapes_labels():
+    metrics = CallbackMetrics(window=8)
+    metrics.observe('say "hi"', "initial", duration_seconds=0.5, request_bytes=None)
+    text = metrics.render()
+    assert 'dash_callback_duration_seconds_count{callback="say \\"hi\\"",trigger="initial"} 1' in text
+    assert 'dash_callback_request_bytes_count{callback="say \\"hi\\"",trigger="initial"} 0' in text
+
+
+def test_metrics_route():
+    app = dash.Dash(__name__)
+    app.layout = html.Div([html.Button(id={"type": "btn", "node": "a"}), html.Div(id={"type": "out", "node": "a"})])
+
+    @app.callback(Output({"type": "out", "node": MATCH}, "children"), Input({"type": "btn", "node": MATCH}, "n_clicks"))
+    def count_clicks(n_clicks):
+        return n_clicks
+
+    instrument(app, app.server, "/metrics", window=8, collectors=[lambda: "extra_metric 1\n"])
+    client = app.server.test_client()
+    (output,) = app.callback_map
+    for node in ("a", "b"):
+        trigger = {"node": node, "type": "btn"}
+        response = client.post("/_dash-update-component", json={
+            "output": output,
+            "outputs": {"id": {"node": node, "type": "out"}, "property": "children"},
+            "inputs": [{"id": trigger, "property": "n_clicks", "value": 1}],
+            "changedPropIds": [f'{{"node":"{node}","type":"btn"}}.n_clicks'],
+        })
+        assert response.status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    # Both nodes under one series
+    assert 'dash_callback_duration_seconds_count{callback="count_clicks",trigger="btn.n_clicks"} 2' in text
+    assert 'dash_callback_response_bytes_count{callback="count_clicks",trigger="btn.n_clicks"} 2' in text
+    assert text.endswith("extra_metric 1\n")
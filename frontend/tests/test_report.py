@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+from config import settings
+from dashboard import background
+from dashboard.datasets import datasets
+from schemas import report as report_module
+from schemas.report import Component, Report, layout_key, load_report
+
+
+def layout(title="Tab 1"):
+    return {"tabs": [{"title": title, "rows": [{"type": "row", "children": [{"type": "col", "children": [
+        {"type": "card", "component_type": "chart", "chart_type": "bar", "x_axis": "Name", "y_axis_1": "Age"},
+    ]}]}]}]}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(background, "cache", None)
+    report_module._reports.clear()
+    yield
+    report_module._reports.clear()
+
+
+def test_load_report_parses_the_layout():
+    report = load_report(layout())
+    assert isinstance(report, Report)
+    assert [tab.title for tab in report.children] == ["Tab 1"]
+    assert [card.x_axis for card in report.components()] == ["Name"]
+
+
+def test_load_report_is_cached_by_content():
+    # Exports run inline (BACKGROUND_CALLBACKS off) share the process cache
+    assert load_report(layout()) is load_report(layout())
+    assert load_report(layout()) is not load_report(layout("Other"))
+    assert layout_key(layout()) == layout_key(layout())
+
+
+def test_load_report_is_cached_by_key():
+    first = load_report(layout(), key=("session", 1))
+    # An explicit key identifies an immutable layout, its content is not hashed again
+    assert load_report(layout("Changed"), key=("session", 1)) is first
+    assert load_report(layout("Changed"), key=("session", 2)) is not first
+
+
+def test_load_report_evicts_the_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_CACHE_SIZE", 2)
+    first = load_report(layout(), key=1)
+    load_report(layout(), key=2)
+    load_report(layout(), key=1)
+    load_report(layout(), key=3)
+    assert load_report(layout(), key=1) is first
+    assert 2 not in report_module._reports
+
+
+def test_load_report_is_shared_with_the_background_jobs(monkeypatch, tmp_path):
+    diskcache = pytest.importorskip("diskcache")
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    monkeypatch.setattr(background, "cache", cache)
+    report = load_report(layout(), key=("session", 1))
+    assert cache.get(("report", ("session", 1))) == report
+    # A background job: a new process, with an empty cache of its own
+    report_module._reports.clear()
+    cache.set(("report", ("session", 1)), load_report(layout("Shared"), key=("session", 2)))
+    assert [tab.title for tab in load_report(layout(), key=("session", 1)).children] == ["Shared"]
+    cache.close()
+
+
+def test_flight_key_only_identifies_charts():
+    df = pd.DataFrame({"a": [1, 2]})
+    datasets.put("report-test", df)
+    chart = Component(component_type="chart", chart_type="bar", x_axis="a", y_axis_1="a")
+    stat = Component(component_type="stat", column="a", agg="sum")
+    assert chart.flight_key(df)[:3] == ("report-test", "chart", "bar")
+    # Stats keep the chart defaults: they must not share the image of a default chart
+    assert stat.flight_key(df) is None
+    assert chart.flight_key(pd.DataFrame({"a": [1]})) is None
+
+
+def test_summary_requests_cover_charts_only(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BATCH", "off")
+    cards = [
+        {"type": "card", "component_type": "chart", "chart_type": "bar", "x_axis": "a", "y_axis_1": "b"},
+        {"type": "card", "component_type": "stat", "column": "b", "agg": "sum"},
+        {"type": "card", "component_type": "table"},
+        # The same chart again
+        {"type": "card", "component_type": "chart", "chart_type": "bar", "x_axis": "a", "y_axis_1": "b"},
+    ]
+    report = Report(tabs=[{"rows": [{"children": [{"children": cards}]}]}])
+    df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+    requests = report.summary_requests(df)
+    assert [request.key for request in requests] == [("bar", "a", "b", "Y Axis 2")]
+
+    monkeypatch.setattr(settings, "LLM_BATCH", "tab")
+    (batch,) = report.summary_requests(df)
+    assert len(batch.charts) == 1
@@ -0,0 +1,90 @@
+import pytest
+
+from dashboard.sessions import MemorySessionStore, SessionStore, SqliteSessionStore, VersionConflict, is_ref
+from dashboard.state import DashboardTree, add_edit, empty_tab
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore(max_entries=8)
+    return SqliteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+    class Incomplete(SessionStore):
+        def get(self, key):
+            return 0, None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_save_and_resolve(store):
+    ref = store.save({"tabs": []})
+    assert is_ref(ref) and ref["version"] == 1
+    assert store.resolve(ref) == {"tabs": []}
+    # Inline values are returned unchanged
+    assert store.resolve({"tabs": [1]}) == {"tabs": [1]}
+
+
+def test_update_bumps_the_version(store):
+    ref = store.save({"tabs": []})
+    new_ref = store.update(ref, lambda layout: DashboardTree(layout).apply(add_edit("tab", None, empty_tab())))
+    assert new_ref == {"session": ref["session"], "version": 2}
+    assert [tab["title"] for tab in store.resolve(new_ref)["tabs"]] == ["Tab 1"]
+    # The stored value of the previous version is not modified in place
+    assert store.get(ref["session"])[1]["tabs"][0]["title"] == "Tab 1"
+
+
+def test_update_with_an_outdated_ref_conflicts(store):
+    ref = store.save({"tabs": []})
+    store.update(ref, lambda layout: layout["tabs"].append({}))
+    with pytest.raises(VersionConflict) as exc:
+        store.update(ref, lambda layout: layout["tabs"].append({}))
+    assert (exc.value.expected, exc.value.current) == (1, 2)
+
+
+def test_update_of_an_expired_session_conflicts_with_version_0(store):
+    ref = {"session": "expired", "version": 3}
+    assert store.resolve(ref) is None
+    with pytest.raises(VersionConflict) as exc:
+        store.update(ref, lambda layout: layout["tabs"].append({}))
+    assert exc.value.current == 0
+
+
+def test_sqlite_sessions_expire_on_read(tmp_path):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"), ttl=60)
+    ref = store.save({"tabs": []})
+    conn = store._connection()
+    with conn:
+        conn.execute("UPDATE session_state SET updated_at = updated_at - 120")
+    # Not purged yet (no insert since), but expired all the same
+    assert store.get(ref["session"]) == (0, None)
+    assert store.resolve(ref) is None
+    with pytest.raises(VersionConflict) as exc:
+        store.update(ref, lambda layout: layout["tabs"].append({}))
+    assert exc.value.current == 0
+
+
+def test_failed_update_stores_nothing(store):
+    ref = store.save({"tabs": []})
+
+    def fail(layout):
+        layout["tabs"].append({})
+        raise KeyError("gone")
+
+    with pytest.raises(KeyError):
+        store.update(ref, fail)
+    assert store.get(ref["session"]) == (1, {"tabs": []})
+
+
+def test_memory_store_evicts_the_oldest_session():
+    store = MemorySessionStore(max_entries=2)
+    first = store.save(1)
+    store.save(2)
+    store.save(3)
+    assert store.resolve(first) is None
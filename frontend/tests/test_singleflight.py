@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from dashboard.singleflight import SharedFlight, SingleFlight
+
+diskcache = pytest.importorskip("diskcache")
+
+
+def concurrent_calls(flight, n, func, key="key"):
+    """Start ``n`` identical calls while ``func`` blocks, and return their results."""
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def blocking():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return func()
+
+    results = [None] * n
+
+    def call(idx):
+        results[idx] = flight.do("group", key, blocking)
+
+    threads = [threading.Thread(target=call, args=(0,))]
+    threads[0].start()
+    assert started.wait(5)
+    threads += [threading.Thread(target=call, args=(idx,)) for idx in range(1, n)]
+    for thread in threads[1:]:
+        thread.start()
+    return threads, release, calls, results
+
+
+@pytest.fixture(params=["local", "shared"])
+def flight(request, tmp_path):
+    if request.param == "local":
+        yield SingleFlight()
+        return
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    yield SharedFlight(cache, expire=60)
+    cache.close()
+
+
+def test_concurrent_calls_share_one_run(flight):
+    threads, release, calls, results = concurrent_calls(flight, 4, lambda: "result")
+    # Let the waiters reach the flight before it lands
+    threading.Event().wait(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert flight.stats()["group"] == {"calls": 4, "coalesced": 3}
+
+
+def test_results_are_not_cached(flight):
+    calls = []
+    assert flight.do("group", "key", lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do("group", "key", lambda: calls.append(1) or len(calls)) == 2
+
+
+def test_none_key_is_not_coalesced(flight):
+    assert flight.do("group", None, lambda: 1) == 1
+    assert "group" not in flight.stats()
+
+
+def test_errors_are_not_kept(flight):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("group", "key", fail)
+    assert flight.do("group", "key", lambda: "ok") == "ok"
+
+
+def test_shared_flight_drops_the_result_once_read(tmp_path):
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    flight = SharedFlight(cache, expire=60)
+    threads, release, _, results = concurrent_calls(flight, 3, lambda: "result")
+    threading.Event().wait(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["result"] * 3
+    assert [key for key in cache.iterkeys() if str(key).endswith((":result", ":callers"))] == []
+    cache.close()
@@ -0,0 +1,96 @@
+import pytest
+
+from dashboard.state import DashboardTree, add_edit, empty_col, empty_row, empty_tab, find_node, remove_edit
+
+
+@pytest.fixture
+def tree():
+    tree = DashboardTree()
+    tab = tree.add_tab()
+    row = tree.add_row(tab["id"])
+    tree.add_card(row["children"][0]["id"], {"component_type": "chart"})
+    return tree
+
+
+def test_add_tab_stores_titles(tree):
+    assert [tab["title"] for tab in tree.state["tabs"]] == ["Tab 1"]
+    assert tree.add_tab()["title"] == "Tab 2"
+    assert tree.add_tab("Sales")["title"] == "Sales"
+
+
+def test_titles_survive_removals(tree):
+    second = tree.add_tab()
+    third = tree.add_tab()
+    tree.remove(second["id"], "tab")
+    assert third["title"] == "Tab 3"
+    assert tree.apply(add_edit("tab", None, empty_tab()))["title"] == "Tab 3"
+
+
+def test_apply_adds_by_node_id(tree):
+    tab = tree.state["tabs"][0]
+    row = tree.apply(add_edit("row", tab["id"], empty_row()))
+    col = tree.apply(add_edit("col", row["id"], empty_col()))
+    assert tab["rows"][-1] is row
+    assert row["children"][-1] is col
+    assert tree.get(col["id"], "col").parent_id == row["id"]
+
+
+def test_apply_removes_by_node_id(tree):
+    tab = tree.state["tabs"][0]
+    first = tab["rows"][0]
+    second = tree.add_row(tab["id"])
+    card_id = first["children"][0]["children"][0]["id"]
+    tree.apply(remove_edit("row", first["id"]))
+    assert tab["rows"] == [second]
+    assert tree.get(card_id) is None
+    # A second click on the removed row does not remove the row now at its position
+    with pytest.raises(KeyError):
+        tree.apply(remove_edit("row", first["id"]))
+    assert tab["rows"] == [second]
+
+
+def test_apply_rejects_stale_or_mismatched_targets(tree):
+    tab = tree.state["tabs"][0]
+    with pytest.raises(KeyError):
+        tree.apply(add_edit("col", "gone", empty_col()))
+    # A row id where a column is expected
+    with pytest.raises(KeyError):
+        tree.apply(remove_edit("col", tab["rows"][0]["id"]))
+    with pytest.raises(KeyError):
+        tree.apply(add_edit("row", None, empty_row()))
+
+
+def test_apply_copies_the_added_node(tree):
+    edit = add_edit("tab", None, empty_tab())
+    added = tree.apply(edit)
+    assert added is not edit["node"]
+    assert edit["node"]["title"] is None
+
+
+def test_normalize_legacy_layout():
+    tree = DashboardTree({"tabs": [
+        {"rows": [{"type": "row", "children": [{"type": "col", "children": []}]}]},
+        {"id": "dup", "title": "Kept", "rows": []},
+        {"id": "dup", "rows": []},
+    ]})
+    state = tree.normalize()
+    assert state["tabs"][0]["id"] == "tab-0"
+    assert state["tabs"][0]["rows"][0]["children"][0]["id"] == "col-0-0-0"
+    assert [tab["title"] for tab in state["tabs"]] == ["Tab 1", "Kept", "Tab 3"]
+    assert state["tabs"][2]["id"] != "dup"
+    assert tree.assigned
+
+
+def test_normalize_leaves_complete_layouts(tree):
+    tree = DashboardTree(tree.state)
+    tree.normalize()
+    assert tree.assigned == 0
+
+
+def test_find_node_leaves_the_layout_untouched():
+    state = {"tabs": [{"id": "t", "rows": [{"id": "r", "type": "row", "children": [{"type": "col"}]}]}]}
+    assert find_node(state, "r", "row")["id"] == "r"
+    assert find_node(state, "r", "col") is None
+    assert find_node(state, "missing") is None
+    assert "id" not in state["tabs"][0]["rows"][0]["children"][0]
+    assert "title" not in state["tabs"][0]
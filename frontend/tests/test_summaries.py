@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from config import settings
+from dashboard import background, summaries
+from dashboard.summaries import SummaryRequest, run_summaries
+
+diskcache = pytest.importorskip("diskcache")
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = diskcache.Cache(str(tmp_path / "cache"))
+    monkeypatch.setattr(background, "cache", cache)
+    monkeypatch.setattr(background, "SLOT_POLL_S", 0.01)
+    monkeypatch.setattr(settings, "BACKGROUND_EXPIRE_S", 60)
+    monkeypatch.setattr(summaries, "summarize", lambda request: f"summary {request.key}")
+    yield cache
+    cache.close()
+
+
+def request(key):
+    return SummaryRequest(key=key, df=pd.DataFrame(), chart_type="bar", provider="groq")
+
+
+def test_summaries_run_concurrently(cache):
+    assert run_summaries([request(1), request(2), request(1)], limits={"groq": 2}) == {
+        1: "summary 1", 2: "summary 2",
+    }
+    # Every slot is given back
+    assert list(cache.iterkeys()) == []
+
+
+def test_concurrency_is_shared_by_the_processes(cache):
+    # The only groq slot is held by another process
+    assert background.take_slot(["llm:groq:slot:0"], "other") is not None
+    results = run_summaries([request(1)], limits={"groq": 1}, timeout=0.2)
+    assert results == {1: "Error generating AI summary: no answer after 0.2s"}
+    cache.delete("llm:groq:slot:0")
+    assert run_summaries([request(1)], limits={"groq": 1}) == {1: "summary 1"}
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from config import settings
+from dashboard.datasets import datasets
+from dashboard.sessions import MemorySessionStore
+
+main = pytest.importorskip("main")
+
+CARD = {"type": "card", "id": "card-1", "component_type": "chart", "chart_type": "bar", "x_axis": "a", "y_axis_1": "b"}
+LAYOUT = {"tabs": [{"id": "tab-1", "rows": [{"id": "row-1", "children": [{"id": "col-1", "children": [CARD]}]}]}]}
+DF = pd.DataFrame({"a": [1, 2, 3], "b": [4.0, 5.0, 6.0]})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "sessions", None)
+    monkeypatch.setattr(main, "stream_summary", lambda req: iter([req.chart_type, f" of {len(req.df)} rows"]))
+    client = main.flask_server.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = session["email"] = "user@example.com"
+    return client
+
+
+def post(client, **body):
+    return client.post(settings.SUMMARY_STREAM_ROUTE, json={"node": CARD["id"], **body})
+
+
+def test_login_required(client):
+    with client.session_transaction() as session:
+        session.clear()
+    assert post(client, card=CARD, version="summary-route").status_code == 401
+
+
+def test_posted_card_of_a_cached_dataset(client):
+    datasets.put("summary-route", DF)
+    response = post(client, card=CARD, version="summary-route")
+    assert (response.status_code, response.get_data(as_text=True)) == (200, "bar of 3 rows")
+
+
+def test_card_must_be_the_requested_node(client):
+    datasets.put("summary-route", DF)
+    assert post(client, card={**CARD, "id": "other"}, version="summary-route").status_code == 404
+    assert post(client, version="summary-route").status_code == 404
+
+
+def test_missing_dataset_is_asked_for(client):
+    assert post(client, card=CARD, version="not-cached").status_code == 409
+    data = DF.to_json(date_format="iso", orient="split")
+    response = post(client, card=CARD, version="not-cached", data=data)
+    assert (response.status_code, response.get_data(as_text=True)) == (200, "bar of 3 rows")
+
+
+def test_card_of_the_session_state(client, monkeypatch):
+    store = MemorySessionStore()
+    monkeypatch.setattr(main, "sessions", store)
+    datasets.put("summary-route", DF)
+    state = store.save(LAYOUT)
+    # A posted card is ignored: the session state is authoritative
+    response = post(client, state=state, card={**CARD, "chart_type": "line"}, version="summary-route")
+    assert (response.status_code, response.get_data(as_text=True)) == (200, "bar of 3 rows")
+    missing = post(client, state=state, card=CARD, version="summary-route", node="card-2")
+    assert missing.status_code == 404
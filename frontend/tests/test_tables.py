@@ -0,0 +1,46 @@
+import pandas as pd
+
+from dashboard.datasets import DatasetCache, dataset_version, datasets
+from dashboard.payloads import encode_frame
+from dashboard.tables import filter_mask, split_filter_part, table_page
+
+
+def sample_frame():
+    return pd.DataFrame({"name": ["b", "a", "c", "d"], "price": [2.0, 1.0, 3.0, 4.0]})
+
+
+def test_split_filter_part():
+    assert split_filter_part("{price} ge 2") == ("price", "ge", 2.0)
+    assert split_filter_part('{name} contains "a b"') == ("name", "contains", "a b")
+
+
+def test_filter_mask():
+    df = sample_frame()
+    assert filter_mask(df, "{price} gt 1 && {name} ne d").tolist() == [True, False, True, False]
+    # Text compared against a numeric column matches nothing
+    assert filter_mask(df, "{price} gt abc").tolist() == [False] * 4
+
+
+def test_table_page_sorted_and_filtered():
+    payload = encode_frame(sample_frame())
+    version, _ = datasets.load(payload)
+
+    records, page_count = table_page(
+        version, page_current=0, page_size=2, sort_by=[{"column_id": "price", "direction": "desc"}],
+        filter_query="{price} lt 4",
+    )
+    assert [record["name"] for record in records] == ["c", "b"]
+    assert page_count == 2
+
+
+def test_load_caches_a_dataset_again():
+    cache = DatasetCache(max_entries=1)
+    payload = encode_frame(sample_frame())
+    version, df = cache.load(payload)
+    assert version == dataset_version(payload)
+
+    # Evicted, e.g. by another upload: loading the store payload caches it again
+    cache.put("other", pd.DataFrame())
+    assert cache.get(version) is None
+    assert cache.load(payload)[0] == version
+    assert cache.get(version).equals(df)